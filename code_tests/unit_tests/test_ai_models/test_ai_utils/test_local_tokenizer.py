@@ -0,0 +1,113 @@
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+
+from code_tests.unit_tests.test_ai_models.ai_mock_manager import (
+    AiModelMockManager,
+)
+from forecasting_tools.ai_models.ai_utils.local_tokenizer import LocalTokenizer
+from forecasting_tools.ai_models.ai_utils.response_types import (
+    TextTokenCostResponse,
+)
+from forecasting_tools.ai_models.claude35sonnet import Claude35Sonnet
+from forecasting_tools.ai_models.perplexity import Perplexity
+
+
+@pytest.fixture(autouse=True)
+def fresh_tokenizers(mocker: Mock) -> None:
+    mocker.patch.object(LocalTokenizer, "_tokenizers_by_family", {})
+
+
+def test_tokenizer_is_shared_within_a_model_family() -> None:
+    claude_tokenizer = LocalTokenizer.get_for_model_family("claude")
+    assert LocalTokenizer.get_for_model_family("claude") is claude_tokenizer
+    assert (
+        LocalTokenizer.get_for_model_family("perplexity")
+        is not claude_tokenizer
+    )
+    assert (
+        Claude35Sonnet()._local_tokenizer
+        is Claude35Sonnet(system_prompt="Hi")._local_tokenizer
+    )
+
+
+@pytest.mark.parametrize(
+    "text, expected_pieces",
+    [
+        ("", 0),
+        ("Hello world", 2),
+        ("Hello, world!", 4),
+        ("In 2024", 3),
+        ("antidisestablishmentarianism", 5),
+    ],
+)
+def test_pieces_are_counted(text: str, expected_pieces: int) -> None:
+    assert LocalTokenizer().count_pieces(text) == expected_pieces
+
+
+def test_piece_counts_are_cached(mocker: Mock) -> None:
+    tokenizer = LocalTokenizer()
+    pattern_spy = mocker.patch.object(
+        LocalTokenizer,
+        "_PIECE_PATTERN",
+        Mock(wraps=LocalTokenizer._PIECE_PATTERN),
+    )
+    prompt = "A long research prompt " * 1000
+
+    first_count = tokenizer.messages_to_tokens([prompt])
+    second_count = tokenizer.messages_to_tokens([prompt])
+
+    assert first_count == second_count
+    assert pattern_spy.findall.call_count == 1
+
+
+def test_usage_calibrates_tokens_per_piece() -> None:
+    tokenizer = LocalTokenizer(
+        initial_tokens_per_piece=1, tokens_per_message=4
+    )
+    message_texts = ["You are a forecaster", "Will it rain tomorrow?"]
+    pieces = sum(tokenizer.count_pieces(text) for text in message_texts)
+    actual_prompt_tokens = 2 * pieces + 4 * len(message_texts)
+
+    for _ in range(30):
+        tokenizer.record_usage(message_texts, actual_prompt_tokens)
+
+    assert tokenizer.tokens_per_piece == pytest.approx(2, abs=0.01)
+    assert tokenizer.messages_to_tokens(message_texts) == pytest.approx(
+        actual_prompt_tokens, abs=1
+    )
+
+
+def test_models_count_tokens_without_making_clients(mocker: Mock) -> None:
+    mocker.patch(
+        "forecasting_tools.ai_models.model_archetypes.anthropic_text_model.ChatAnthropic",
+        side_effect=AssertionError("A client should not be made"),
+    )
+    for model_class in [Claude35Sonnet, Perplexity]:
+        prompt_only_tokens = model_class().input_to_tokens("Hi")
+        with_system_prompt_tokens = model_class(
+            system_prompt="This is a system prompt"
+        ).input_to_tokens("Hi")
+        assert 0 < prompt_only_tokens < with_system_prompt_tokens
+
+
+def test_invoke_calibrates_with_reported_usage(mocker: Mock) -> None:
+    prompt = "Summarize the news about the election " * 20
+    tokenizer = Claude35Sonnet()._local_tokenizer
+    tokens_per_piece_before = tokenizer.tokens_per_piece
+    response = TextTokenCostResponse(
+        data="Hello",
+        prompt_tokens_used=3 * Claude35Sonnet().input_to_tokens(prompt),
+        completion_tokens_used=5,
+        total_tokens_used=0,
+        model=Claude35Sonnet.MODEL_NAME,
+        cost=0.01,
+    )
+    AiModelMockManager.mock_ai_model_direct_call_with_value(
+        mocker, Claude35Sonnet, response
+    )
+
+    asyncio.run(Claude35Sonnet().invoke(prompt))
+
+    assert tokenizer.tokens_per_piece > tokens_per_piece_before
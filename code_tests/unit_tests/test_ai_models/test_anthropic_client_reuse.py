@@ -0,0 +1,70 @@
+import asyncio
+import weakref
+from unittest.mock import Mock
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from forecasting_tools.ai_models.claude35sonnet import Claude35Sonnet
+from forecasting_tools.ai_models.model_archetypes.anthropic_text_model import (
+    AnthropicTextToTextModel,
+)
+
+
+@pytest.fixture
+def mock_chat_anthropic(mocker: Mock) -> Mock:
+    mocker.patch.object(
+        AnthropicTextToTextModel,
+        "_anthropic_clients",
+        weakref.WeakKeyDictionary(),
+    )
+
+    def make_client(*args, **kwargs) -> Mock:
+        client = Mock()
+        client.ainvoke = mocker.AsyncMock(
+            return_value=AIMessage(
+                content="Hello",
+                response_metadata={
+                    "usage": {"input_tokens": 10, "output_tokens": 5}
+                },
+            )
+        )
+        return client
+
+    return mocker.patch(
+        "forecasting_tools.ai_models.model_archetypes.anthropic_text_model.ChatAnthropic",
+        side_effect=make_client,
+    )
+
+
+async def test_requests_reuse_a_client_per_model_and_temperature(
+    mock_chat_anthropic: Mock,
+) -> None:
+    await asyncio.gather(
+        Claude35Sonnet(temperature=0.7)._call_online_model_using_api("Hi"),
+        Claude35Sonnet(temperature=0.7)._call_online_model_using_api("Hey"),
+    )
+    assert mock_chat_anthropic.call_count == 1
+
+    await Claude35Sonnet(temperature=0)._call_online_model_using_api("Hi")
+    assert mock_chat_anthropic.call_count == 2
+
+
+def test_each_event_loop_gets_its_own_client(
+    mock_chat_anthropic: Mock,
+) -> None:
+    async def get_client() -> Mock:
+        return AnthropicTextToTextModel._get_anthropic_client(
+            Claude35Sonnet.MODEL_NAME, 0, timeout=None
+        )
+
+    clients = []
+    for _ in range(2):
+        loop = asyncio.new_event_loop()
+        try:
+            clients.append(loop.run_until_complete(get_client()))
+            assert loop.run_until_complete(get_client()) is clients[-1]
+        finally:
+            loop.close()
+
+    assert clients[0] is not clients[1]
@@ -0,0 +1,92 @@
+from pathlib import Path
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from forecasting_tools.ai_models import embedding_providers
+from forecasting_tools.ai_models.embedding_providers import (
+    BatchedEmbeddingProvider,
+    FallbackEmbeddingProvider,
+    OpenAiEmbeddingProvider,
+)
+
+
+class CountingEmbeddingProvider(BatchedEmbeddingProvider):
+    def __init__(
+        self, cache_directory: str | None, should_fail: bool = False
+    ) -> None:
+        super().__init__("counting-model", cache_directory)
+        self.should_fail = should_fail
+        self.embedded_texts: list[str] = []
+
+    def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        if self.should_fail:
+            raise RuntimeError("Embedding service is down")
+        self.embedded_texts.extend(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+async def test_only_texts_missing_from_cache_are_embedded(
+    tmp_path: Path,
+) -> None:
+    provider = CountingEmbeddingProvider(str(tmp_path))
+    first_embeddings = await provider.embed(["a", "bb", "a"])
+    assert provider.embedded_texts == ["a", "bb"]
+
+    second_embeddings = await provider.embed(["bb", "ccc"])
+    assert provider.embedded_texts == ["a", "bb", "ccc"]
+    assert np.array_equal(first_embeddings[1], second_embeddings[0])
+    assert second_embeddings.shape == (2, 2)
+    assert second_embeddings.dtype == np.float32
+
+
+async def test_cache_persists_across_provider_instances(
+    tmp_path: Path,
+) -> None:
+    await CountingEmbeddingProvider(str(tmp_path)).embed(["a", "bb"])
+
+    provider_for_rerun = CountingEmbeddingProvider(str(tmp_path))
+    embeddings = await provider_for_rerun.embed(["bb", "a"])
+
+    assert provider_for_rerun.embedded_texts == []
+    assert embeddings.tolist() == [[2.0, 1.0], [1.0, 1.0]]
+
+
+async def test_fallback_embeds_whole_call_with_one_provider() -> None:
+    failing_provider = CountingEmbeddingProvider(None, should_fail=True)
+    working_provider = CountingEmbeddingProvider(None)
+    provider = FallbackEmbeddingProvider([failing_provider, working_provider])
+
+    embeddings = await provider.embed(["a", "bb"])
+
+    assert working_provider.embedded_texts == ["a", "bb"]
+    assert embeddings.shape == (2, 2)
+
+
+async def test_fallback_raises_when_all_providers_fail() -> None:
+    provider = FallbackEmbeddingProvider(
+        [CountingEmbeddingProvider(None, should_fail=True)]
+    )
+    with pytest.raises(RuntimeError):
+        await provider.embed(["a"])
+
+
+def test_openai_client_is_reused_across_batches(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "fake-key")
+    mock_openai = Mock()
+    mock_openai.return_value.embeddings.create.side_effect = (
+        lambda model, input: Mock(
+            data=[Mock(embedding=[1.0, 0.0]) for _ in input]
+        )
+    )
+    monkeypatch.setattr(embedding_providers, "OpenAI", mock_openai)
+    provider = OpenAiEmbeddingProvider(cache_directory=None)
+
+    provider._embed_batch(["a", "b"])
+    provider._embed_batch(["c"])
+
+    assert mock_openai.call_count == 1
+    assert mock_openai.return_value.embeddings.create.call_count == 2
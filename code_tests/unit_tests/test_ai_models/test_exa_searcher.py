@@ -0,0 +1,70 @@
+from datetime import datetime
+from unittest.mock import Mock
+
+from code_tests.unit_tests.test_ai_models.ai_mock_manager import (
+    AiModelMockManager,
+)
+from forecasting_tools.ai_models.exa_searcher import ExaSearcher, SearchInput
+from forecasting_tools.ai_models.resource_managers.monetary_cost_manager import (
+    MonetaryCostManager,
+)
+
+
+async def test_cached_search_is_not_requested_or_charged_again(
+    mocker: Mock,
+) -> None:
+    mock_direct_call = AiModelMockManager.mock_ai_model_direct_call_with_predefined_mock_value(
+        mocker, ExaSearcher
+    )
+    ExaSearcher._search_cache.clear()
+    search = SearchInput(
+        web_search_query="Will it rain in Tokyo tomorrow?",
+        highlight_query=None,
+        end_published_date=datetime(2024, 1, 1),
+    )
+
+    with MonetaryCostManager() as cost_manager:
+        searcher = ExaSearcher(cache_results=True)
+        first_results = await searcher.invoke(search)
+        cost_of_one_search = cost_manager.current_usage
+        second_results = await searcher.invoke(search)
+        await searcher.invoke(
+            search.model_copy(update={"end_published_date": None})
+        )
+
+    assert first_results == second_results
+    assert mock_direct_call.call_count == 2
+    assert cost_manager.current_usage == 2 * cost_of_one_search
+
+
+async def test_searches_are_not_cached_by_default(mocker: Mock) -> None:
+    mock_direct_call = AiModelMockManager.mock_ai_model_direct_call_with_predefined_mock_value(
+        mocker, ExaSearcher
+    )
+    searcher = ExaSearcher()
+    cheap_input = searcher._get_cheap_input_for_invoke()
+    await searcher.invoke(cheap_input)
+    await searcher.invoke(cheap_input)
+    assert mock_direct_call.call_count == 2
+
+
+async def test_editing_results_does_not_change_cached_results(
+    mocker: Mock,
+) -> None:
+    AiModelMockManager.mock_ai_model_direct_call_with_predefined_mock_value(
+        mocker, ExaSearcher
+    )
+    ExaSearcher._search_cache.clear()
+    searcher = ExaSearcher(cache_results=True)
+    search = searcher._get_cheap_input_for_invoke()
+
+    first_results = await searcher.invoke(search)
+    original_results = [
+        source.model_copy(deep=True) for source in first_results
+    ]
+    for results in [first_results, await searcher.invoke(search)]:
+        for source in results:
+            source.highlights.append("Edited by a caller")
+            source.text = "Edited by a caller"
+
+    assert await searcher.invoke(search) == original_results
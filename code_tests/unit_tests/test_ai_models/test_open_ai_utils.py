@@ -1,7 +1,13 @@
+from unittest.mock import Mock
+
+import pytest
+import tiktoken
+
 from forecasting_tools.ai_models.ai_utils.openai_utils import OpenAiUtils
 from forecasting_tools.ai_models.model_archetypes.openai_vision_model import (
     OpenAiVisionToTextModel,
 )
+from forecasting_tools.util.lru_cache_with_ttl import LruCacheWithTtl
 
 
 ################################## Message Creation Tests ##################################
@@ -47,3 +53,66 @@ def test_system_and_vision_message_creator_has_two_messages() -> None:
     assert (
         length_of_messages == 2
     ), "Length of system and vision message from prompt is not 2"
+
+
+################################## Token Counting Tests ##################################
+@pytest.fixture
+def mock_encoding(mocker: Mock) -> tuple[tiktoken.Encoding, Mock]:
+    """
+    A byte level encoding so the tests don't need to download one
+    """
+    encoding = tiktoken.Encoding(
+        name="test_bytes",
+        pat_str=r"\S+|\s+",
+        mergeable_ranks={bytes([i]): i for i in range(256)},
+        special_tokens={},
+    )
+    encoding_for_model = mocker.patch(
+        "tiktoken.encoding_for_model", return_value=encoding
+    )
+    mocker.patch.object(OpenAiUtils, "_encodings_by_model", {})
+    mocker.patch.object(
+        OpenAiUtils, "_token_counts", LruCacheWithTtl(ttl_seconds=None)
+    )
+    return encoding, encoding_for_model
+
+
+def test_encodings_and_token_counts_are_reused(
+    mocker: Mock, mock_encoding: tuple[tiktoken.Encoding, Mock]
+) -> None:
+    encoding, encoding_for_model = mock_encoding
+    encode_spy = mocker.spy(encoding, "encode")
+    messages = OpenAiUtils.create_system_and_user_message_from_prompt(
+        "A long research prompt " * 100, "You are a forecaster"
+    )
+
+    first_count = OpenAiUtils.messages_to_tokens(messages, "gpt-4o")
+    encodes_for_first_count = encode_spy.call_count
+    second_count = OpenAiUtils.messages_to_tokens(messages, "gpt-4o")
+
+    assert first_count == second_count
+    assert encoding_for_model.call_count == 1
+    assert encode_spy.call_count == encodes_for_first_count
+
+
+@pytest.mark.parametrize(
+    "prompt",
+    ["Hi", "A long research prompt " * 100, "Ünïcödé ✓ 天气 🙂"],
+)
+def test_token_upper_bound_is_never_below_exact_count(
+    mock_encoding: tuple[tiktoken.Encoding, Mock], prompt: str
+) -> None:
+    messages = OpenAiUtils.create_system_and_user_message_from_prompt(
+        prompt, "You are a forecaster"
+    )
+    upper_bound = OpenAiUtils.estimate_max_tokens_of_messages(messages)
+
+    assert upper_bound is not None
+    assert upper_bound >= OpenAiUtils.messages_to_tokens(messages, "gpt-4o")
+
+
+def test_token_upper_bound_is_not_given_for_images() -> None:
+    messages = OpenAiUtils.create_system_and_image_message_from_prompt(
+        OpenAiVisionToTextModel.CHEAP_VISION_MESSAGE_DATA, "Hi"
+    )
+    assert OpenAiUtils.estimate_max_tokens_of_messages(messages) is None
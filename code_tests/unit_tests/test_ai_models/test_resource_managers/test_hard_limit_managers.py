@@ -344,3 +344,71 @@ def test_error_raised_when_hard_limit_is_negative(
 
     with pytest.raises(AssertionError):
         hard_limit_subclass(negative_limit)
+
+
+@pytest.mark.parametrize("hard_limit_subclass", HARD_LIMIT_MANAGER_LIST)
+def test_reserved_usage_counts_against_limit_until_released(
+    hard_limit_subclass: type[HardLimitManager],
+) -> None:
+    max_cost = 100
+    estimated_cost = 40
+
+    with hard_limit_subclass(max_cost) as cost_manager:
+        first_reservation = (
+            hard_limit_subclass.reserve_usage_in_parent_managers(
+                estimated_cost
+            )
+        )
+        second_reservation = (
+            hard_limit_subclass.reserve_usage_in_parent_managers(
+                estimated_cost
+            )
+        )
+        assert cost_manager.amount_left == max_cost - 2 * estimated_cost
+        with pytest.raises(HardLimitExceededError):
+            hard_limit_subclass.reserve_usage_in_parent_managers(
+                estimated_cost
+            )
+
+        hard_limit_subclass.increase_current_usage_in_parent_managers(10)
+        hard_limit_subclass.release_reserved_usage(
+            first_reservation, estimated_cost
+        )
+        hard_limit_subclass.release_reserved_usage(
+            second_reservation, estimated_cost
+        )
+
+    assert cost_manager.reserved_usage == 0
+    assert cost_manager.current_usage == 10
+
+
+@pytest.mark.parametrize("hard_limit_subclass", HARD_LIMIT_MANAGER_LIST)
+async def test_reservations_stop_concurrent_calls_from_overshooting_limit(
+    hard_limit_subclass: type[HardLimitManager],
+) -> None:
+    max_cost = 1
+    cost_per_call = 0.1
+
+    async def call_that_incurs_cost() -> None:
+        reservation = hard_limit_subclass.reserve_usage_in_parent_managers(
+            cost_per_call
+        )
+        try:
+            await asyncio.sleep(0.05)
+            hard_limit_subclass.increase_current_usage_in_parent_managers(
+                cost_per_call
+            )
+        finally:
+            hard_limit_subclass.release_reserved_usage(
+                reservation, cost_per_call
+            )
+
+    with hard_limit_subclass(max_cost) as cost_manager:
+        results = await async_batching.await_coroutines_and_return_exceptions(
+            [call_that_incurs_cost() for _ in range(50)]
+        )
+
+    assert cost_manager.current_usage <= max_cost + 1e-9
+    assert any(
+        isinstance(result, HardLimitExceededError) for result in results
+    )
@@ -0,0 +1,224 @@
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+
+from code_tests.unit_tests.test_ai_models.ai_mock_manager import (
+    AiModelMockManager,
+)
+from forecasting_tools.ai_models.ai_utils.response_types import (
+    TextTokenCostResponse,
+)
+from forecasting_tools.ai_models.exa_searcher import ExaSearcher
+from forecasting_tools.ai_models.gpt4o import Gpt4o
+from forecasting_tools.ai_models.perplexity import Perplexity
+from forecasting_tools.ai_models.resource_managers.hard_limit_manager import (
+    HardLimitExceededError,
+)
+from forecasting_tools.ai_models.resource_managers.in_flight_call_coalescer import (
+    InFlightCallCoalescer,
+)
+from forecasting_tools.ai_models.resource_managers.monetary_cost_manager import (
+    MonetaryCostManager,
+)
+
+
+def mock_slow_direct_call(
+    mocker: Mock, response: TextTokenCostResponse
+) -> Mock:
+    async def slow_direct_call(*args, **kwargs) -> TextTokenCostResponse:
+        await asyncio.sleep(0.1)
+        return response
+
+    AiModelMockManager.mock_input_to_tokens_with_value(mocker, Gpt4o, 10)
+    return mocker.patch(
+        AiModelMockManager.get_direct_call_function_path_as_string(Gpt4o),
+        side_effect=slow_direct_call,
+    )
+
+
+def create_response() -> TextTokenCostResponse:
+    return TextTokenCostResponse(
+        data="Hello",
+        prompt_tokens_used=10,
+        completion_tokens_used=5,
+        total_tokens_used=15,
+        model=Gpt4o.MODEL_NAME,
+        cost=0.03,
+    )
+
+
+async def test_identical_calls_share_one_request_and_split_cost(
+    mocker: Mock,
+) -> None:
+    response = create_response()
+    mock_direct_call = mock_slow_direct_call(mocker, response)
+
+    async def invoke_in_own_cost_manager() -> tuple[str, float]:
+        with MonetaryCostManager() as cost_manager:
+            answer = await Gpt4o(temperature=0).invoke("Hi")
+        return answer, cost_manager.current_usage
+
+    with MonetaryCostManager() as outer_cost_manager:
+        results = await asyncio.gather(
+            *[invoke_in_own_cost_manager() for _ in range(3)]
+        )
+
+    assert mock_direct_call.call_count == 1
+    for answer, cost in results:
+        assert answer == "Hello"
+        assert cost == pytest.approx(response.cost / 3)
+    assert outer_cost_manager.current_usage == pytest.approx(response.cost)
+
+
+async def test_sampled_and_different_calls_are_not_shared(
+    mocker: Mock,
+) -> None:
+    mock_direct_call = mock_slow_direct_call(mocker, create_response())
+
+    await asyncio.gather(
+        Gpt4o(temperature=0.7).invoke("Hi"),
+        Gpt4o(temperature=0.7).invoke("Hi"),
+        Gpt4o(temperature=0).invoke("Hi"),
+        Gpt4o(temperature=0).invoke("Hello"),
+    )
+
+    assert mock_direct_call.call_count == 4
+
+
+async def test_call_is_made_again_once_finished() -> None:
+    number_of_calls = 0
+
+    async def make_call() -> int:
+        nonlocal number_of_calls
+        number_of_calls += 1
+        await asyncio.sleep(0.01)
+        return number_of_calls
+
+    key = InFlightCallCoalescer.make_key("search", {"query": "news"})
+    first_results = await asyncio.gather(
+        InFlightCallCoalescer.run(key, make_call),
+        InFlightCallCoalescer.run(key, make_call),
+    )
+    second_result = await InFlightCallCoalescer.run(key, make_call)
+
+    assert first_results == [1, 1]
+    assert second_result == 2
+
+
+async def test_cancelled_waiter_does_not_cancel_shared_call() -> None:
+    async def make_call() -> str:
+        await asyncio.sleep(0.05)
+        return "done"
+
+    key = InFlightCallCoalescer.make_key("cancel test")
+    cancelled_waiter = asyncio.create_task(
+        InFlightCallCoalescer.run(key, make_call)
+    )
+    remaining_waiter = asyncio.create_task(
+        InFlightCallCoalescer.run(key, make_call)
+    )
+    await asyncio.sleep(0.01)
+    cancelled_waiter.cancel()
+
+    assert await remaining_waiter == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled_waiter
+
+
+async def test_sampled_calls_are_shared_when_opted_in_or_search_backed(
+    mocker: Mock,
+) -> None:
+    mock_direct_call = mock_slow_direct_call(mocker, create_response())
+
+    with InFlightCallCoalescer.share_sampled_calls():
+        await asyncio.gather(
+            Gpt4o(temperature=0.7).invoke("Hi"),
+            Gpt4o(temperature=0.7).invoke("Hi"),
+        )
+    await asyncio.gather(
+        Perplexity(temperature=0.1).invoke("Hi"),
+        Perplexity(temperature=0.1).invoke("Hi"),
+    )
+
+    assert mock_direct_call.call_count == 2
+    assert not InFlightCallCoalescer.sampled_calls_are_shared()
+
+
+async def test_finished_call_is_not_joined_before_it_is_forgotten() -> None:
+    call_finished = asyncio.Event()
+    number_of_calls = 0
+
+    async def make_call() -> int:
+        nonlocal number_of_calls
+        number_of_calls += 1
+        await call_finished.wait()
+        MonetaryCostManager.increase_current_usage_in_parent_managers(0.03)
+        return number_of_calls
+
+    async def run_in_own_cost_manager(
+        wait_till_call_finishes: bool,
+    ) -> tuple[int, float]:
+        if wait_till_call_finishes:
+            await call_finished.wait()
+        with MonetaryCostManager() as cost_manager:
+            result = await InFlightCallCoalescer.run(key, make_call)
+        return result, cost_manager.current_usage
+
+    key = InFlightCallCoalescer.make_key("finished call")
+    first_waiter = asyncio.create_task(run_in_own_cost_manager(False))
+    await asyncio.sleep(0.01)
+    late_waiter = asyncio.create_task(run_in_own_cost_manager(True))
+    await asyncio.sleep(0.01)
+    call_finished.set()
+
+    assert await first_waiter == (1, pytest.approx(0.03))
+    assert await late_waiter == (2, pytest.approx(0.03))
+
+
+@pytest.mark.parametrize("searches_are_identical", [True, False])
+async def test_hard_limit_holds_for_concurrent_searches(
+    mocker: Mock, searches_are_identical: bool
+) -> None:
+    mock_sources = (
+        ExaSearcher._get_mock_return_for_direct_call_to_model_using_cheap_input()
+    )
+
+    async def slow_direct_call(*args, **kwargs) -> list:
+        await asyncio.sleep(0.1)
+        return mock_sources
+
+    mock_direct_call = mocker.patch(
+        AiModelMockManager.get_direct_call_function_path_as_string(
+            ExaSearcher
+        ),
+        side_effect=slow_direct_call,
+    )
+    searcher = ExaSearcher()
+    search = searcher._get_cheap_input_for_invoke()
+    searches = [
+        search.model_copy(
+            update={
+                "web_search_query": (
+                    search.web_search_query
+                    if searches_are_identical
+                    else f"{search.web_search_query} {i}"
+                )
+            }
+        )
+        for i in range(20)
+    ]
+    cost_of_one_search = searcher._estimate_cost_of_call(search)
+    hard_limit = 5 * cost_of_one_search
+
+    with MonetaryCostManager(hard_limit) as cost_manager:
+        results = await asyncio.gather(
+            *[searcher.invoke(search) for search in searches],
+            return_exceptions=True,
+        )
+
+    errors = [result for result in results if isinstance(result, Exception)]
+    assert all(isinstance(error, HardLimitExceededError) for error in errors)
+    assert mock_direct_call.call_count == (1 if searches_are_identical else 5)
+    assert cost_manager.current_usage <= hard_limit + 1e-9
+    assert cost_manager.reserved_usage == 0
@@ -0,0 +1,188 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from code_tests.unit_tests.test_ai_models.ai_mock_manager import (
+    AiModelMockManager,
+)
+from forecasting_tools.ai_models.ai_utils.response_types import (
+    TextTokenCostResponse,
+)
+from forecasting_tools.ai_models.gpt4o import Gpt4o
+from forecasting_tools.ai_models.resource_managers.llm_response_cache import (
+    LlmResponseCache,
+)
+from forecasting_tools.ai_models.resource_managers.monetary_cost_manager import (
+    MonetaryCostManager,
+)
+
+
+def test_values_round_trip_and_repeated_requests_get_different_keys(
+    tmp_path: Path,
+) -> None:
+    cache = LlmResponseCache(str(tmp_path / "cache.sqlite"))
+    first_key = cache.make_key("model", 0.5, ["Hi"])
+    second_key = cache.make_key("model", 0.5, ["Hi"])
+    assert first_key != second_key
+    assert cache.get(first_key) is None
+
+    cache.set(first_key, "first sample")
+    cache.set(second_key, "second sample")
+    assert cache.get(first_key) == "first sample"
+    assert cache.get(second_key) == "second sample"
+
+    cache_for_rerun = LlmResponseCache(str(tmp_path / "cache.sqlite"))
+    assert (
+        cache_for_rerun.get(cache_for_rerun.make_key("model", 0.5, ["Hi"]))
+        == "first sample"
+    )
+
+
+def test_entries_expire_after_ttl(tmp_path: Path) -> None:
+    cache = LlmResponseCache(str(tmp_path / "cache.sqlite"), ttl_seconds=0.1)
+    key = cache.make_key("prompt")
+    cache.set(key, "response")
+    assert cache.get(key) == "response"
+    time.sleep(0.2)
+    assert cache.get(key) is None
+
+
+def test_least_recently_used_entries_are_evicted_past_max_size(
+    tmp_path: Path,
+) -> None:
+    value = "a" * 1000
+    cache = LlmResponseCache(
+        str(tmp_path / "cache.sqlite"), max_size_in_mb=2500 / 1024 / 1024
+    )
+    first_key, second_key, third_key = [
+        cache.make_key(f"prompt {i}") for i in range(3)
+    ]
+    cache.set(first_key, value)
+    cache.set(second_key, value)
+    time.sleep(0.01)
+    cache.get(first_key)
+    cache.set(third_key, value)
+
+    assert cache.size_in_bytes <= 2500
+    assert cache.get(second_key) is None
+    assert cache.get(first_key) == value
+    assert cache.get(third_key) == value
+
+
+async def test_cached_model_response_is_not_charged_twice(
+    mocker: Mock, tmp_path: Path
+) -> None:
+    response = TextTokenCostResponse(
+        data="Hello",
+        prompt_tokens_used=10,
+        completion_tokens_used=5,
+        total_tokens_used=15,
+        model=Gpt4o.MODEL_NAME,
+        cost=0.01,
+    )
+    mock_direct_call = AiModelMockManager.mock_ai_model_direct_call_with_value(
+        mocker, Gpt4o, response
+    )
+    AiModelMockManager.mock_input_to_tokens_with_value(mocker, Gpt4o, 10)
+    cache_path = str(tmp_path / "cache.sqlite")
+
+    with MonetaryCostManager() as cost_manager:
+        with LlmResponseCache(cache_path):
+            first_answer = await Gpt4o().invoke("Hi")
+        with LlmResponseCache(cache_path) as cache_for_rerun:
+            second_answer = await Gpt4o().invoke("Hi")
+
+    assert first_answer == second_answer == "Hello"
+    assert mock_direct_call.call_count == 1
+    assert cache_for_rerun.hits == 1
+    assert cost_manager.current_usage == response.cost
+
+
+def test_hits_do_not_write_until_cache_is_closed(tmp_path: Path) -> None:
+    cache_path = str(tmp_path / "cache.sqlite")
+    with LlmResponseCache(cache_path) as cache:
+        key = cache.make_key("prompt")
+        cache.set(key, "response")
+        reader = sqlite3.connect(cache_path)
+        (stored_access_time,) = reader.execute(
+            "SELECT last_accessed_at FROM responses"
+        ).fetchone()
+        time.sleep(0.01)
+        assert cache.get(key) == "response"
+        assert reader.execute(
+            "SELECT last_accessed_at FROM responses"
+        ).fetchone() == (stored_access_time,)
+
+    (saved_access_time,) = reader.execute(
+        "SELECT last_accessed_at FROM responses"
+    ).fetchone()
+    reader.close()
+    assert saved_access_time > stored_access_time
+    with pytest.raises(sqlite3.ProgrammingError):
+        cache.get(key)
+
+
+async def test_model_reads_and_writes_cache_off_the_event_loop(
+    mocker: Mock, tmp_path: Path
+) -> None:
+    response = TextTokenCostResponse(
+        data="Hello",
+        prompt_tokens_used=10,
+        completion_tokens_used=5,
+        total_tokens_used=15,
+        model=Gpt4o.MODEL_NAME,
+        cost=0.01,
+    )
+    AiModelMockManager.mock_ai_model_direct_call_with_value(
+        mocker, Gpt4o, response
+    )
+    AiModelMockManager.mock_input_to_tokens_with_value(mocker, Gpt4o, 10)
+    cache_threads: list[threading.Thread] = []
+    original_get = LlmResponseCache.get
+    original_set = LlmResponseCache.set
+
+    def get_and_record_thread(self: LlmResponseCache, key: str) -> str | None:
+        cache_threads.append(threading.current_thread())
+        return original_get(self, key)
+
+    def set_and_record_thread(
+        self: LlmResponseCache, key: str, value: str
+    ) -> None:
+        cache_threads.append(threading.current_thread())
+        original_set(self, key, value)
+
+    mocker.patch.object(LlmResponseCache, "get", get_and_record_thread)
+    mocker.patch.object(LlmResponseCache, "set", set_and_record_thread)
+
+    with LlmResponseCache(str(tmp_path / "cache.sqlite")):
+        await Gpt4o().invoke("Hi")
+
+    assert len(cache_threads) == 2
+    assert threading.main_thread() not in cache_threads
+
+
+def test_size_is_tracked_without_summing_on_every_insert(
+    tmp_path: Path,
+) -> None:
+    cache_path = str(tmp_path / "cache.sqlite")
+    cache = LlmResponseCache(cache_path, ttl_seconds=0.1)
+    statements: list[str] = []
+    cache._LlmResponseCache__connection.set_trace_callback(  # type: ignore
+        statements.append
+    )
+    first_key, second_key = cache.make_key("first"), cache.make_key("second")
+    cache.set(first_key, "a" * 100)
+    cache.set(second_key, "b" * 50)
+    cache.set(first_key, "c" * 10)
+    assert cache.size_in_bytes == 60
+    assert not any("SUM(" in statement for statement in statements)
+
+    time.sleep(0.2)
+    assert cache.get(second_key) is None
+    assert cache.size_in_bytes == 10
+    cache.close()
+    assert LlmResponseCache(cache_path).size_in_bytes == 10
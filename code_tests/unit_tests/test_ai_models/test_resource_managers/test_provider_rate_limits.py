@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from forecasting_tools.ai_models.resource_managers.provider_rate_limits import (
+    ProviderRateLimits,
+)
+
+
+def test_openai_headers_are_parsed() -> None:
+    headers = {
+        "x-ratelimit-limit-requests": "5000",
+        "x-ratelimit-remaining-requests": "4999",
+        "x-ratelimit-reset-requests": "12ms",
+        "x-ratelimit-limit-tokens": "800000",
+        "x-ratelimit-remaining-tokens": "799000",
+        "x-ratelimit-reset-tokens": "6m0s",
+    }
+    limits = ProviderRateLimits.from_headers(headers)
+    assert limits.request_limit == 5000
+    assert limits.requests_remaining == 4999
+    assert limits.seconds_till_requests_reset == pytest.approx(0.012)
+    assert limits.token_limit == 800000
+    assert limits.tokens_remaining == 799000
+    assert limits.seconds_till_tokens_reset == pytest.approx(360)
+    assert limits.retry_after_seconds is None
+
+
+def test_anthropic_headers_are_parsed() -> None:
+    reset_time = datetime.now(timezone.utc) + timedelta(seconds=30)
+    headers = {
+        "Anthropic-RateLimit-Requests-Limit": "50",
+        "anthropic-ratelimit-requests-remaining": "0",
+        "anthropic-ratelimit-requests-reset": reset_time.isoformat().replace(
+            "+00:00", "Z"
+        ),
+        "anthropic-ratelimit-tokens-limit": "40000",
+        "anthropic-ratelimit-tokens-remaining": "39000",
+        "retry-after": "7",
+    }
+    limits = ProviderRateLimits.from_headers(headers)
+    assert limits.request_limit == 50
+    assert limits.requests_remaining == 0
+    assert limits.seconds_till_requests_reset == pytest.approx(30, abs=2)
+    assert limits.token_limit == 40000
+    assert limits.tokens_remaining == 39000
+    assert limits.retry_after_seconds == 7
+
+
+def test_missing_or_malformed_headers_are_none() -> None:
+    limits = ProviderRateLimits.from_headers(
+        {"x-ratelimit-limit-requests": "not a number", "other": "1"}
+    )
+    assert limits == ProviderRateLimits()
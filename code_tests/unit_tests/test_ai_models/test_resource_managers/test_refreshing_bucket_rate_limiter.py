@@ -2,6 +2,7 @@ import asyncio
 import logging
 import random
 import time
+from datetime import datetime, timedelta
 
 import pytest
 
@@ -428,3 +429,164 @@ def assert_whether_rate_limit_is_respected_and_resources_tracked_right(
         over_rate_allowed=1.2,
         under_rate_allowed=0.9,
     )
+
+
+async def test_waiters_are_served_in_arrival_order() -> None:
+    refresh_rate = 10
+    capacity = 5
+    limiter = RefreshingBucketRateLimiter(capacity, refresh_rate)
+    limiter.zero_out_resources()
+    order_served: list[int] = []
+
+    async def acquire_and_record(waiter_number: int, resources: int) -> None:
+        await limiter.wait_till_able_to_acquire_resources(resources)
+        order_served.append(waiter_number)
+
+    tasks = []
+    for waiter_number, resources in enumerate([3, 1, 2, 1]):
+        tasks.append(
+            asyncio.create_task(acquire_and_record(waiter_number, resources))
+        )
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+
+    assert order_served == [0, 1, 2, 3]
+
+
+def test_resource_history_counts_every_acquisition_by_time_bucket() -> None:
+    limiter = RefreshingBucketRateLimiter(100000, 0)
+    start_time = datetime.now()
+    for _ in range(20000):
+        assert limiter.acquire_resources_if_available_now(1)
+    end_time = datetime.now()
+
+    assert (
+        limiter.calculate_resources_passed_into_acquire_in_time_range(
+            start_time, end_time
+        )
+        == 20000
+    )
+    assert (
+        limiter.calculate_resources_passed_into_acquire_in_time_range(
+            start_time - timedelta(days=365), end_time
+        )
+        == 20000
+    )
+    assert (
+        limiter.calculate_resources_passed_into_acquire_in_time_range(
+            end_time + timedelta(seconds=2), end_time + timedelta(days=1)
+        )
+        == 0
+    )
+
+
+def test_resource_history_only_keeps_the_newest_buckets() -> None:
+    limiter = RefreshingBucketRateLimiter(
+        100, 0, history_bucket_seconds=0.05, max_history_buckets=4
+    )
+    start_time = datetime.now()
+    assert limiter.acquire_resources_if_available_now(10)
+    time.sleep(0.3)
+    assert limiter.acquire_resources_if_available_now(5)
+
+    assert (
+        limiter.calculate_resources_passed_into_acquire_in_time_range(
+            start_time, datetime.now()
+        )
+        == 5
+    )
+
+
+def test_retune_rejects_refresh_rate_of_zero() -> None:
+    limiter = RefreshingBucketRateLimiter(10, 1)
+    with pytest.raises(ValueError):
+        limiter.retune(10, 0)
+    assert limiter.refresh_rate == 1
+
+
+def test_retune_changes_capacity_and_refresh_rate() -> None:
+    limiter = RefreshingBucketRateLimiter(10, 1)
+    limiter.retune(100, 50)
+    assert limiter.capacity == 100
+    assert limiter.refresh_rate == 50
+
+    asyncio.run(limiter.wait_till_able_to_acquire_resources(60))
+    assert limiter.refresh_and_then_get_available_resources() <= 100
+
+    limiter.retune(5, 1)
+    assert limiter.refresh_and_then_get_available_resources() <= 5
+
+
+def test_lower_available_resources_never_raises_them() -> None:
+    limiter = RefreshingBucketRateLimiter(10, 0)
+    limiter.lower_available_resources_to(4)
+    assert limiter.refresh_and_then_get_available_resources() == 4
+    limiter.lower_available_resources_to(8)
+    assert limiter.refresh_and_then_get_available_resources() == 4
+
+
+def test_pause_blocks_acquisitions_until_it_ends() -> None:
+    limiter = RefreshingBucketRateLimiter(10, 10)
+    pause_in_seconds = 1
+    limiter.pause_for(pause_in_seconds)
+
+    start_time = time.time()
+    asyncio.run(limiter.wait_till_able_to_acquire_resources(1))
+    duration = time.time() - start_time
+
+    assert abs(duration - pause_in_seconds) < 0.2
+
+
+def test_settle_acquisition_refunds_and_debits_the_difference() -> None:
+    limiter = RefreshingBucketRateLimiter(100, 0)
+    asyncio.run(limiter.wait_till_able_to_acquire_resources(50))
+    limiter.settle_acquisition(50, 20)
+    assert limiter.refresh_and_then_get_available_resources() == 80
+
+    asyncio.run(limiter.wait_till_able_to_acquire_resources(10))
+    limiter.settle_acquisition(10, 40)
+    assert limiter.refresh_and_then_get_available_resources() == 40
+    assert limiter.calculate_resources_passed_into_acquire_in_time_range(
+        datetime.now() - timedelta(minutes=1), datetime.now()
+    ) == (50 - 30 + 10 + 30)
+
+    limiter.settle_acquisition(0, 1000)
+    assert limiter.refresh_and_then_get_available_resources() == 0
+    limiter.settle_acquisition(1000, 0)
+    assert limiter.refresh_and_then_get_available_resources() == 100
+
+
+async def test_refund_from_settling_wakes_waiters() -> None:
+    limiter = RefreshingBucketRateLimiter(100, 0.001)
+    await limiter.wait_till_able_to_acquire_resources(100)
+    waiter = asyncio.create_task(
+        limiter.wait_till_able_to_acquire_resources(50)
+    )
+    await asyncio.sleep(0.1)
+    assert not waiter.done()
+
+    limiter.settle_acquisition(100, 0)
+    await asyncio.wait_for(waiter, timeout=1)
+
+
+async def test_refund_of_cancelled_waiter_is_taken_out_of_history() -> None:
+    limiter = RefreshingBucketRateLimiter(100, 0.001)
+    start_time = datetime.now()
+    await limiter.wait_till_able_to_acquire_resources(100)
+    waiter = asyncio.create_task(
+        limiter.wait_till_able_to_acquire_resources(60)
+    )
+    await asyncio.sleep(0.01)
+
+    limiter.settle_acquisition(100, 0)
+    asyncio.get_running_loop().call_later(0, waiter.cancel)
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert limiter.refresh_and_then_get_available_resources() == 100
+    assert (
+        limiter.calculate_resources_passed_into_acquire_in_time_range(
+            start_time, datetime.now()
+        )
+        == 0
+    )
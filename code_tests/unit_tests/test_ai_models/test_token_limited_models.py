@@ -7,13 +7,25 @@ from code_tests.unit_tests.test_ai_models.ai_mock_manager import (
     AiModelMockManager,
 )
 from code_tests.unit_tests.test_ai_models.models_to_test import ModelsToTest
+from forecasting_tools.ai_models.ai_utils.response_types import (
+    TextTokenCostResponse,
+    TextTokenResponse,
+)
 from forecasting_tools.ai_models.basic_model_interfaces.ai_model import AiModel
 from forecasting_tools.ai_models.basic_model_interfaces.token_limited_model import (
     TokenLimitedModel,
 )
+from forecasting_tools.ai_models.gpt4o import Gpt4o
+from forecasting_tools.ai_models.resource_managers.monetary_cost_manager import (
+    MonetaryCostManager,
+)
+from forecasting_tools.ai_models.resource_managers.refreshing_bucket_rate_limiter import (
+    RefreshingBucketRateLimiter,
+)
 
 logger = logging.getLogger(__name__)
 import asyncio
+import threading
 
 from forecasting_tools.util import async_batching
 
@@ -58,6 +70,171 @@ def test_token_amount_past_burst_doesnt_happen_instantly(
         async_batching.run_coroutines(timed_coroutines)
 
 
+@pytest.mark.parametrize("subclass", ModelsToTest.TOKEN_LIMITED_LIST)
+def test_token_reservation_is_settled_to_actual_usage(
+    mocker: Mock, subclass: type[AiModel]
+) -> None:
+    if not issubclass(subclass, TokenLimitedModel):
+        raise ValueError(TOKEN_LIMITED_ERROR_MESSAGE)
+    mock_response = (
+        subclass._get_mock_return_for_direct_call_to_model_using_cheap_input()
+    )
+    if not isinstance(mock_response, TextTokenResponse):
+        pytest.skip("Model does not report token usage")
+
+    AiModelMockManager.mock_ai_model_direct_call_with_predefined_mock_value(
+        mocker, subclass
+    )
+    AiModelMockManager.mock_input_to_tokens_with_value(
+        mocker, subclass, mock_response.prompt_tokens_used
+    )
+    AiModelMockManager.reinitialize_limiters(subclass)
+    model = subclass()
+    asyncio.run(model.invoke(subclass._get_cheap_input_for_invoke()))
+
+    tokens_taken_from_bucket = (
+        subclass._token_limiter.capacity
+        - subclass._token_limiter.refresh_and_then_get_available_resources()
+    )
+    assert tokens_taken_from_bucket <= mock_response.total_tokens_used
+    assert subclass._average_completion_tokens is not None
+
+
+@pytest.mark.parametrize("max_tokens_of_prompt", [None, 20, 5000])
+def test_upper_bound_reservation_is_settled_to_exact_count_counted_in_thread(
+    mocker: Mock, max_tokens_of_prompt: int | None
+) -> None:
+    response = TextTokenCostResponse(
+        data="Hello",
+        prompt_tokens_used=100,
+        completion_tokens_used=5,
+        total_tokens_used=105,
+        model=Gpt4o.MODEL_NAME,
+        cost=0.01,
+    )
+    AiModelMockManager.mock_ai_model_direct_call_with_value(
+        mocker, Gpt4o, response
+    )
+    counting_threads: list[threading.Thread] = []
+
+    def count_tokens_and_record_thread(*args, **kwargs) -> int:
+        counting_threads.append(threading.current_thread())
+        return 100
+
+    mocker.patch.object(
+        Gpt4o, "input_to_tokens", side_effect=count_tokens_and_record_thread
+    )
+    mocker.patch.object(
+        Gpt4o, "estimate_max_input_tokens", return_value=max_tokens_of_prompt
+    )
+    AiModelMockManager.reinitialize_limiters(Gpt4o)
+    wait_spy = mocker.spy(
+        Gpt4o._token_limiter, "wait_till_able_to_acquire_resources"
+    )
+    acquire_now_spy = mocker.spy(
+        Gpt4o._token_limiter, "acquire_resources_if_available_now"
+    )
+    settle_spy = mocker.spy(Gpt4o._token_limiter, "settle_acquisition")
+    asyncio.run(Gpt4o().invoke("Hi"))
+
+    tokens_acquired = sum(
+        call.args[0] for call in wait_spy.call_args_list
+    ) + sum(
+        call.args[0]
+        for call, acquired in zip(
+            acquire_now_spy.call_args_list, acquire_now_spy.spy_return_list
+        )
+        if acquired
+    )
+    tokens_settled = sum(
+        call.args[1] - call.args[0] for call in settle_spy.call_args_list
+    )
+    assert tokens_acquired >= 100
+    assert tokens_acquired + tokens_settled == 105
+    assert counting_threads[0] is not threading.main_thread()
+
+
+def test_cost_is_estimated_once_per_call_in_thread(mocker: Mock) -> None:
+    response = TextTokenCostResponse(
+        data="Hello",
+        prompt_tokens_used=100,
+        completion_tokens_used=5,
+        total_tokens_used=105,
+        model=Gpt4o.MODEL_NAME,
+        cost=0.01,
+    )
+    mock_direct_call = mocker.patch(
+        AiModelMockManager.get_direct_call_function_path_as_string(Gpt4o),
+        side_effect=[Exception("Mock Exception"), response],
+    )
+    original_sleep = asyncio.sleep
+
+    async def skip_retry_wait(*args, **kwargs) -> None:
+        await original_sleep(0)
+
+    mocker.patch("asyncio.sleep", skip_retry_wait)
+    counting_threads: list[threading.Thread] = []
+
+    def count_tokens_and_record_thread(*args, **kwargs) -> int:
+        counting_threads.append(threading.current_thread())
+        return 100
+
+    mocker.patch.object(
+        Gpt4o, "input_to_tokens", side_effect=count_tokens_and_record_thread
+    )
+    AiModelMockManager.reinitialize_limiters(Gpt4o)
+    estimate_spy = mocker.spy(Gpt4o, "_estimate_cost_of_call")
+
+    async def invoke_with_cost_limit() -> None:
+        with MonetaryCostManager(1) as cost_manager:
+            await Gpt4o(temperature=0.7).invoke("Hi")
+        assert cost_manager.current_usage == pytest.approx(0.01)
+        assert cost_manager.reserved_usage == 0
+
+    asyncio.run(invoke_with_cost_limit())
+
+    assert mock_direct_call.call_count == 2
+    assert estimate_spy.call_count == 1
+    assert threading.main_thread() not in counting_threads
+
+
+@pytest.mark.parametrize("bucket_is_full", [True, False])
+def test_upper_bound_over_capacity_does_not_block_prompt_that_fits(
+    mocker: Mock, bucket_is_full: bool
+) -> None:
+    capacity = 1000
+    response = TextTokenCostResponse(
+        data="Hello",
+        prompt_tokens_used=100,
+        completion_tokens_used=5,
+        total_tokens_used=105,
+        model=Gpt4o.MODEL_NAME,
+        cost=0.01,
+    )
+    AiModelMockManager.mock_ai_model_direct_call_with_value(
+        mocker, Gpt4o, response
+    )
+    AiModelMockManager.mock_input_to_tokens_with_value(mocker, Gpt4o, 100)
+    mocker.patch.object(Gpt4o, "estimate_max_input_tokens", return_value=5000)
+    mocker.patch.object(
+        Gpt4o,
+        "_token_limiter",
+        RefreshingBucketRateLimiter(capacity, capacity * 100),
+    )
+    mocker.patch.object(Gpt4o, "_average_completion_tokens", 5)
+    if not bucket_is_full:
+        Gpt4o._token_limiter.settle_acquisition(0, capacity - 50)
+    wait_spy = mocker.spy(
+        Gpt4o._token_limiter, "wait_till_able_to_acquire_resources"
+    )
+
+    assert asyncio.run(Gpt4o().invoke("Hi")) == "Hello"
+    if bucket_is_full:
+        assert wait_spy.call_count == 0
+    else:
+        assert [call.args[0] for call in wait_spy.call_args_list] == [105]
+
+
 def get_number_of_tokens_to_deplete_burst(
     subclass: type[TokenLimitedModel],
 ) -> int:
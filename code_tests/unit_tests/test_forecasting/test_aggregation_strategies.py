@@ -0,0 +1,186 @@
+import numpy as np
+import pytest
+
+from forecasting_tools.forecasting.forecast_bots.template_bot import (
+    TemplateBot,
+)
+from forecasting_tools.forecasting.helpers.aggregation_strategies import (
+    AggregationStrategy,
+    ExtremizedLogOddsAggregationStrategy,
+    PerformanceWeightedAggregationStrategy,
+    TrimmedMeanAggregationStrategy,
+)
+from forecasting_tools.forecasting.questions_and_reports.binary_report import (
+    BinaryReport,
+)
+from forecasting_tools.forecasting.questions_and_reports.multiple_choice_report import (
+    PredictedOption,
+    PredictedOptionList,
+)
+from forecasting_tools.forecasting.questions_and_reports.numeric_report import (
+    NumericDistribution,
+    Percentile,
+)
+from forecasting_tools.forecasting.questions_and_reports.questions import (
+    BinaryQuestion,
+    MultipleChoiceQuestion,
+    NumericQuestion,
+    QuestionState,
+)
+
+
+def create_binary_question() -> BinaryQuestion:
+    return BinaryQuestion(
+        question_text="Will it happen?",
+        id_of_post=1,
+        state=QuestionState.OPEN,
+    )
+
+
+def create_numeric_question() -> NumericQuestion:
+    return NumericQuestion(
+        question_text="How many?",
+        id_of_post=1,
+        state=QuestionState.OPEN,
+        upper_bound=100.0,
+        lower_bound=0.0,
+        open_upper_bound=False,
+        open_lower_bound=False,
+    )
+
+
+def create_numeric_prediction(median: float) -> NumericDistribution:
+    return NumericDistribution(
+        declared_percentiles=[
+            Percentile(value=median - 10, percentile=0.1),
+            Percentile(value=median, percentile=0.5),
+            Percentile(value=median + 10, percentile=0.9),
+        ],
+        open_upper_bound=False,
+        open_lower_bound=False,
+        upper_bound=100.0,
+        lower_bound=0.0,
+        zero_point=None,
+    )
+
+
+def test_default_strategies_are_registered() -> None:
+    for name in [
+        "mean",
+        "median",
+        "trimmed_mean",
+        "log_pool",
+        "extremized_log_odds",
+    ]:
+        assert AggregationStrategy.get_strategy(name).name == name
+    with pytest.raises(ValueError):
+        AggregationStrategy.get_strategy("not a strategy")
+
+
+@pytest.mark.parametrize(
+    "strategy, predictions, expected",
+    [
+        (AggregationStrategy.get_strategy("mean"), [0.1, 0.2, 0.9], 0.4),
+        (AggregationStrategy.get_strategy("median"), [0.1, 0.2, 0.9], 0.2),
+        (
+            TrimmedMeanAggregationStrategy(trim_proportion=0.25),
+            [0.0, 0.3, 0.4, 1.0],
+            0.35,
+        ),
+    ],
+)
+def test_binary_aggregation(
+    strategy: AggregationStrategy, predictions: list[float], expected: float
+) -> None:
+    aggregated = strategy.aggregate_predictions(
+        predictions, create_binary_question()
+    )
+    assert aggregated == pytest.approx(expected)
+
+
+def test_extremized_log_odds_pushes_away_from_half() -> None:
+    question = create_binary_question()
+    unextremized = ExtremizedLogOddsAggregationStrategy(extremizing_factor=1)
+    extremized = ExtremizedLogOddsAggregationStrategy(extremizing_factor=2)
+
+    assert unextremized.aggregate_predictions(
+        [0.8, 0.8], question
+    ) == pytest.approx(0.8)
+    assert extremized.aggregate_predictions(
+        [0.8, 0.8], question
+    ) == pytest.approx(16 / 17)
+    assert extremized.aggregate_predictions(
+        [0.2, 0.2], question
+    ) == pytest.approx(1 / 17)
+
+
+def test_performance_weighted_strategy() -> None:
+    question = create_binary_question()
+    strategy = PerformanceWeightedAggregationStrategy.from_inversed_expected_log_scores(
+        [0.5, 1.0]
+    )
+
+    assert strategy.aggregate_predictions(
+        [0.9, 0.3], question
+    ) == pytest.approx(0.7)
+    assert strategy.aggregate_predictions(
+        [0.9, 0.3, 0.3], question
+    ) == pytest.approx(0.5)
+
+
+def test_multiple_choice_aggregation_is_renormalized() -> None:
+    question = MultipleChoiceQuestion(
+        question_text="Which one?",
+        id_of_post=1,
+        state=QuestionState.OPEN,
+        options=["A", "B", "C"],
+    )
+    predictions = [
+        PredictedOptionList(
+            predicted_options=[
+                PredictedOption(option_name=name, probability=probability)
+                for name, probability in zip(["A", "B", "C"], probabilities)
+            ]
+        )
+        for probabilities in [[0.6, 0.3, 0.1], [0.2, 0.3, 0.5]]
+    ]
+
+    for strategy_name in AggregationStrategy.get_registered_strategy_names():
+        strategy = AggregationStrategy.get_strategy(strategy_name)
+        aggregated = strategy.aggregate_predictions(predictions, question)
+        probabilities = [
+            option.probability for option in aggregated.predicted_options
+        ]
+        assert [
+            option.option_name for option in aggregated.predicted_options
+        ] == ["A", "B", "C"]
+        assert sum(probabilities) == pytest.approx(1)
+
+
+def test_numeric_aggregation_keeps_cdf_increasing() -> None:
+    question = create_numeric_question()
+    predictions = [create_numeric_prediction(median) for median in [30, 50]]
+
+    for strategy_name in AggregationStrategy.get_registered_strategy_names():
+        strategy = AggregationStrategy.get_strategy(strategy_name)
+        aggregated = strategy.aggregate_predictions(predictions, question)
+        cdf_probabilities = aggregated.cdf_probabilities
+        assert np.all(np.diff(cdf_probabilities) >= 0)
+        assert len(cdf_probabilities) == len(predictions[0].cdf_probabilities)
+
+
+async def test_bot_uses_configured_strategy() -> None:
+    question = create_binary_question()
+    default_bot = TemplateBot()
+    configured_bot = TemplateBot(aggregation_strategy="mean")
+
+    default_aggregation = await default_bot._aggregate_predictions(
+        [0.1, 0.2, 0.9], question, BinaryReport
+    )
+    configured_aggregation = await configured_bot._aggregate_predictions(
+        [0.1, 0.2, 0.9], question, BinaryReport
+    )
+
+    assert default_aggregation == pytest.approx(0.2)
+    assert configured_aggregation == pytest.approx(0.4)
+    assert configured_bot.get_config()["aggregation_strategy"] == "mean"
@@ -0,0 +1,198 @@
+import random
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from forecasting_tools.ai_models.embedding_providers import (
+    BatchedEmbeddingProvider,
+)
+from forecasting_tools.forecasting.sub_question_researchers.deduplicator import (
+    Deduplicator,
+)
+
+EMBEDDINGS_BY_TEXT = {
+    "Hiroshima was bombed in 1945": [1.0, 0.0, 0.0],
+    "In 1945 Hiroshima was hit by a nuclear bomb": [0.95, 0.05, 0.0],
+    "Nagasaki was bombed in 1945": [0.0, 1.0, 0.0],
+    "The war in the Pacific ended in 1945": [0.0, 0.0, 2.0],
+}
+
+
+class FakeEmbeddingProvider(BatchedEmbeddingProvider):
+    BATCH_SIZE = 3
+
+    def __init__(self) -> None:
+        super().__init__("fake-model", cache_directory=None)
+        self.embedded_batches: list[list[str]] = []
+
+    def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        self.embedded_batches.append(texts)
+        return [EMBEDDINGS_BY_TEXT[text] for text in texts]
+
+
+@pytest.mark.parametrize("exact_similarity_search_limit", [0, 500])
+async def test_semantic_deduplication_embeds_list_in_batches(
+    mocker: Mock, exact_similarity_search_limit: int
+) -> None:
+    provider = FakeEmbeddingProvider()
+    mocker.patch.object(Deduplicator, "EMBEDDING_PROVIDER", provider)
+    mocker.patch.object(
+        Deduplicator,
+        "EXACT_SIMILARITY_SEARCH_LIMIT",
+        exact_similarity_search_limit,
+    )
+    mock_llm_deduplication = mocker.patch.object(
+        Deduplicator, "_Deduplicator__deduplicate_list_in_batch"
+    )
+    items = list(EMBEDDINGS_BY_TEXT.keys()) + ["Nagasaki was bombed in 1945"]
+
+    deduplicated_items = await Deduplicator.deduplicate_list_in_batches(
+        items, "Events of 1945"
+    )
+
+    assert deduplicated_items == [
+        "Hiroshima was bombed in 1945",
+        "Nagasaki was bombed in 1945",
+        "The war in the Pacific ended in 1945",
+    ]
+    assert len(provider.embedded_batches) == 2
+    assert mock_llm_deduplication.call_count == 0
+
+
+async def test_semantic_duplicate_is_found_without_asking_llm(
+    mocker: Mock,
+) -> None:
+    mocker.patch.object(
+        Deduplicator, "EMBEDDING_PROVIDER", FakeEmbeddingProvider()
+    )
+    is_duplicate = await Deduplicator.determine_if_item_is_duplicate(
+        "In 1945 Hiroshima was hit by a nuclear bomb",
+        ["Nagasaki was bombed in 1945", "Hiroshima was bombed in 1945"],
+    )
+    assert is_duplicate
+
+
+async def test_embeddings_are_normalized(mocker: Mock) -> None:
+    mocker.patch.object(
+        Deduplicator, "EMBEDDING_PROVIDER", FakeEmbeddingProvider()
+    )
+    embeddings = await Deduplicator._Deduplicator__get_normalized_embeddings(  # type: ignore
+        ["The war in the Pacific ended in 1945"]
+    )
+    assert np.allclose(np.linalg.norm(embeddings, axis=1), 1.0)
+
+
+async def test_only_ambiguous_clusters_are_sent_to_llm(mocker: Mock) -> None:
+    embeddings_by_text = {
+        "Hiroshima was bombed": [1.0, 0.0, 0.0],
+        "Hiroshima was nuked": [0.99, 0.1, 0.0],
+        "Japan was bombed": [0.8, 0.6, 0.0],
+        "Atomic bombs were used on Japan": [0.75, 0.66, 0.0],
+        "The Pacific war ended": [0.0, 0.0, 1.0],
+    }
+    provider = FakeEmbeddingProvider()
+    mocker.patch.object(
+        provider,
+        "_embed_batch",
+        side_effect=lambda texts: [embeddings_by_text[t] for t in texts],
+    )
+    mocker.patch.object(Deduplicator, "EMBEDDING_PROVIDER", provider)
+    mocker.patch.object(Deduplicator, "EXACT_SIMILARITY_SEARCH_LIMIT", 0)
+    mock_llm_deduplication = mocker.patch.object(
+        Deduplicator,
+        "_Deduplicator__deduplicate_list_in_batch",
+        side_effect=lambda batch, context: batch[:1],
+    )
+
+    deduplicated_items = await Deduplicator.deduplicate_list_in_batches(
+        list(embeddings_by_text.keys()), "Events of 1945"
+    )
+
+    assert mock_llm_deduplication.call_count == 1
+    assert mock_llm_deduplication.call_args.args[0] == [
+        "Hiroshima was bombed",
+        "Japan was bombed",
+    ]
+    assert deduplicated_items == [
+        "Hiroshima was bombed",
+        "The Pacific war ended",
+    ]
+
+
+async def test_duplicates_in_large_chained_cluster_are_compared(
+    mocker: Mock,
+) -> None:
+    """
+    Neighbours in the chain share 2 of 3 dimensions (similarity 2/3), so all
+    items form one cluster bigger than a batch. The duplicate is only similar
+    to the first item and comes last in the list.
+    """
+    chain_length = 12
+    number_of_dimensions = chain_length + 3
+    embeddings_by_text = {}
+    for i in range(chain_length):
+        embedding = [0.0] * number_of_dimensions
+        embedding[i : i + 3] = [1.0, 1.0, 1.0]
+        embeddings_by_text[f"Event {i}"] = embedding
+    duplicate_embedding = [0.0] * number_of_dimensions
+    duplicate_embedding[0:3] = [1.0, 1.0, 1.0]
+    duplicate_embedding[-1] = 1.2
+    embeddings_by_text["Event 0 (again)"] = duplicate_embedding
+
+    provider = FakeEmbeddingProvider()
+    mocker.patch.object(
+        provider,
+        "_embed_batch",
+        side_effect=lambda texts: [embeddings_by_text[t] for t in texts],
+    )
+    mocker.patch.object(Deduplicator, "EMBEDDING_PROVIDER", provider)
+
+    def remove_repeated_event(batch: list[str], context: str) -> list[str]:
+        assert len(batch) <= Deduplicator.LLM_BATCH_SIZE
+        if "Event 0" in batch:
+            return [item for item in batch if item != "Event 0 (again)"]
+        return batch
+
+    mock_llm_deduplication = mocker.patch.object(
+        Deduplicator,
+        "_Deduplicator__deduplicate_list_in_batch",
+        side_effect=remove_repeated_event,
+    )
+
+    deduplicated_items = await Deduplicator.deduplicate_list_in_batches(
+        list(embeddings_by_text.keys()), "Events"
+    )
+
+    assert deduplicated_items == [f"Event {i}" for i in range(chain_length)]
+    assert mock_llm_deduplication.call_count <= 4
+
+
+@pytest.mark.parametrize("seed", range(5))
+async def test_parallel_one_at_a_time_matches_serial_result(
+    mocker: Mock, seed: int
+) -> None:
+    random_generator = random.Random(seed)
+    items = [str(i) for i in range(30)]
+    random_generator.shuffle(items)
+
+    async def is_adjacent_to_any(item: str, list_to_check: list[str], *args):
+        return any(abs(int(item) - int(other)) == 1 for other in list_to_check)
+
+    mock_duplicate_check = mocker.patch.object(
+        Deduplicator,
+        "determine_if_item_is_duplicate",
+        side_effect=is_adjacent_to_any,
+    )
+    serial_result = await Deduplicator.deduplicate_list_one_item_at_a_time(
+        items
+    )
+    serial_calls = mock_duplicate_check.call_count
+    mock_duplicate_check.reset_mock()
+
+    parallel_result = await Deduplicator.deduplicate_list_one_item_at_a_time(
+        items, check_items_in_parallel=True
+    )
+
+    assert parallel_result == serial_result
+    assert serial_calls == len(items)
@@ -0,0 +1,289 @@
+import asyncio
+import time
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from code_tests.unit_tests.test_forecasting.forecasting_test_manager import (
+    ForecastingTestManager,
+)
+from forecasting_tools.forecasting.forecast_bots.template_bot import (
+    TemplateBot,
+)
+from forecasting_tools.forecasting.questions_and_reports.binary_report import (
+    BinaryReport,
+)
+from forecasting_tools.forecasting.questions_and_reports.forecast_report import (
+    ReasonedPrediction,
+)
+from forecasting_tools.forecasting.questions_and_reports.questions import (
+    MetaculusQuestion,
+)
+from forecasting_tools.util import file_manipulation
+
+
+def mock_individual_question_with_wait_times(
+    mocker: Mock, wait_times: list[float]
+) -> list[MetaculusQuestion]:
+    questions = [
+        ForecastingTestManager.get_fake_binary_questions() for _ in wait_times
+    ]
+    wait_time_for_question = {
+        id(question): wait_time
+        for question, wait_time in zip(questions, wait_times)
+    }
+
+    async def run_individual_question(
+        self: TemplateBot, question: MetaculusQuestion
+    ) -> BinaryReport:
+        await asyncio.sleep(wait_time_for_question[id(question)])
+        return ForecastingTestManager.get_fake_forecast_report(
+            prediction=wait_time_for_question[id(question)]
+        )
+
+    mocker.patch.object(
+        TemplateBot, "_run_individual_question", run_individual_question
+    )
+    return questions
+
+
+async def test_forecast_questions_iter_yields_reports_as_they_complete(
+    mocker: Mock,
+) -> None:
+    wait_times = [0.9, 0.1, 0.5]
+    questions = mock_individual_question_with_wait_times(mocker, wait_times)
+    bot = TemplateBot()
+
+    start_time = time.time()
+    yielded_predictions = []
+    time_of_first_report = None
+    async for report in bot.forecast_questions_iter(questions):
+        if time_of_first_report is None:
+            time_of_first_report = time.time() - start_time
+        yielded_predictions.append(report.prediction)
+
+    assert yielded_predictions == sorted(wait_times)
+    assert time_of_first_report is not None and time_of_first_report < 0.5
+
+
+async def test_forecast_questions_keeps_question_order(mocker: Mock) -> None:
+    wait_times = [0.3, 0.1, 0.2]
+    questions = mock_individual_question_with_wait_times(mocker, wait_times)
+    bot = TemplateBot()
+
+    reports = await bot.forecast_questions(questions)
+
+    assert [report.prediction for report in reports] == wait_times
+
+
+async def test_forecast_questions_respects_max_concurrent_questions(
+    mocker: Mock,
+) -> None:
+    wait_times = [0.2] * 6
+    questions = mock_individual_question_with_wait_times(mocker, wait_times)
+    bot = TemplateBot(max_concurrent_questions=2)
+
+    start_time = time.time()
+    reports = await bot.forecast_questions(questions)
+    duration = time.time() - start_time
+
+    assert len(reports) == len(questions)
+    assert duration >= 0.6, "More questions ran at once than allowed"
+
+
+def mock_research_and_binary_forecasts(
+    mocker: Mock, predictions: list[float]
+) -> list[float]:
+    """
+    Returns the list of predictions that were made, in order
+    """
+    made_predictions: list[float] = []
+
+    async def run_research(
+        self: TemplateBot, question: MetaculusQuestion
+    ) -> str:
+        return "research"
+
+    async def run_forecast_on_binary(
+        self: TemplateBot, question: MetaculusQuestion, research: str
+    ) -> ReasonedPrediction[float]:
+        prediction = predictions[len(made_predictions)]
+        made_predictions.append(prediction)
+        return ReasonedPrediction(prediction_value=prediction, reasoning="")
+
+    mocker.patch.object(TemplateBot, "run_research", run_research)
+    mocker.patch.object(
+        TemplateBot, "_run_forecast_on_binary", run_forecast_on_binary
+    )
+    return made_predictions
+
+
+@pytest.mark.parametrize(
+    "predictions, expected_number_of_predictions",
+    [
+        ([0.5, 0.52, 0.9, 0.1, 0.5, 0.5], 2),
+        ([0.4, 0.65, 0.5, 0.5, 0.5, 0.5], 4),
+        ([0.1, 0.9, 0.2, 0.8, 0.3, 0.7], 6),
+    ],
+)
+async def test_early_stopping_stops_once_predictions_agree(
+    mocker: Mock,
+    predictions: list[float],
+    expected_number_of_predictions: int,
+) -> None:
+    made_predictions = mock_research_and_binary_forecasts(mocker, predictions)
+    bot = TemplateBot(
+        predictions_per_research_report=6,
+        early_stopping_dispersion_threshold=0.1,
+        predictions_per_wave=2,
+    )
+
+    report = await bot._run_individual_question(
+        ForecastingTestManager.get_fake_binary_questions()
+    )
+
+    assert len(made_predictions) == expected_number_of_predictions
+    number_of_skipped_predictions = 6 - expected_number_of_predictions
+    if number_of_skipped_predictions > 0:
+        assert report.other_notes is not None
+        assert f"skipped {number_of_skipped_predictions} of 6" in (
+            report.other_notes
+        )
+    else:
+        assert report.other_notes is None
+
+
+async def test_predictions_are_not_stopped_early_by_default(
+    mocker: Mock,
+) -> None:
+    made_predictions = mock_research_and_binary_forecasts(mocker, [0.5] * 5)
+    bot = TemplateBot(predictions_per_research_report=5)
+
+    report = await bot._run_individual_question(
+        ForecastingTestManager.get_fake_binary_questions()
+    )
+
+    assert len(made_predictions) == 5
+    assert report.other_notes is None
+
+
+async def test_research_variants_are_shared_between_research_reports(
+    mocker: Mock,
+) -> None:
+    made_predictions = mock_research_and_binary_forecasts(mocker, [0.5] * 4)
+    research_variants: list[int] = []
+
+    async def run_research_variant(
+        self: TemplateBot, question: MetaculusQuestion, variant_index: int
+    ) -> str:
+        research_variants.append(variant_index)
+        return f"research {variant_index}"
+
+    mocker.patch.object(
+        TemplateBot, "run_research_variant", run_research_variant
+    )
+    bot = TemplateBot(
+        research_reports_per_question=4, research_variants_per_question=2
+    )
+
+    report = await bot._run_individual_question(
+        ForecastingTestManager.get_fake_binary_questions()
+    )
+
+    assert sorted(research_variants) == [0, 1]
+    assert len(made_predictions) == 4
+    assert report.explanation.count("research 0") >= 2
+    assert report.explanation.count("research 1") >= 2
+
+
+async def test_research_units_are_limited_across_questions(
+    mocker: Mock,
+) -> None:
+    mock_research_and_binary_forecasts(mocker, [0.5] * 9)
+    running_research_units = 0
+    most_research_units_running_at_once = 0
+    number_of_research_calls = 0
+
+    async def run_research(
+        self: TemplateBot, question: MetaculusQuestion
+    ) -> str:
+        nonlocal running_research_units, most_research_units_running_at_once
+        nonlocal number_of_research_calls
+        running_research_units += 1
+        number_of_research_calls += 1
+        most_research_units_running_at_once = max(
+            most_research_units_running_at_once, running_research_units
+        )
+        await asyncio.sleep(0.05)
+        running_research_units -= 1
+        return "research"
+
+    mocker.patch.object(TemplateBot, "run_research", run_research)
+    bot = TemplateBot(
+        research_reports_per_question=3,
+        max_concurrent_questions=3,
+        max_concurrent_research_units=2,
+    )
+
+    reports = await bot.forecast_questions(
+        [ForecastingTestManager.get_fake_binary_questions() for _ in range(3)]
+    )
+
+    assert len(reports) == 3
+    assert number_of_research_calls == 9
+    assert most_research_units_running_at_once == 2
+
+
+async def test_research_variants_research_with_different_focuses(
+    mocker: Mock,
+) -> None:
+    researched_background_infos: list[str | None] = []
+
+    async def run_research(
+        self: TemplateBot, question: MetaculusQuestion
+    ) -> str:
+        researched_background_infos.append(question.background_info)
+        return "research"
+
+    mocker.patch.object(TemplateBot, "run_research", run_research)
+    bot = TemplateBot()
+    question = ForecastingTestManager.get_fake_binary_questions()
+
+    for variant_index in range(3):
+        await bot.run_research_variant(question, variant_index)
+
+    assert researched_background_infos[0] == question.background_info
+    assert len(set(researched_background_infos)) == 3
+    assert all(
+        "Research focus" in background_info
+        for background_info in researched_background_infos[1:]
+    )
+
+
+async def test_reports_are_appended_as_completed_and_saved_once(
+    mocker: Mock, tmp_path: Path
+) -> None:
+    wait_times = [0.2, 0.1, 0.3]
+    questions = mock_individual_question_with_wait_times(mocker, wait_times)
+    bot = TemplateBot(folder_to_save_reports_to=str(tmp_path))
+    write_json_spy = mocker.spy(file_manipulation, "write_json_file")
+
+    async for _ in bot.forecast_questions_iter(questions):
+        in_progress_files = list(tmp_path.glob("*/*.jsonl"))
+        assert len(in_progress_files) == 1
+        assert write_json_spy.call_count == 0
+
+    appended_reports = file_manipulation.load_jsonl_file(
+        str(in_progress_files[0])
+    )
+    saved_reports = BinaryReport.load_json_from_file_path(
+        str(in_progress_files[0].with_suffix(".json"))
+    )
+    assert [report["prediction"] for report in appended_reports] == sorted(
+        wait_times
+    )
+    assert [report.prediction for report in saved_reports] == sorted(
+        wait_times
+    )
+    assert write_json_spy.call_count == 1
@@ -0,0 +1,47 @@
+import pytest
+
+from code_tests.unit_tests.test_forecasting.forecasting_test_manager import (
+    ForecastingTestManager,
+)
+from forecasting_tools.forecasting.helpers.prediction_dispersion import (
+    PredictionDispersion,
+)
+from forecasting_tools.forecasting.questions_and_reports.multiple_choice_report import (
+    PredictedOption,
+    PredictedOptionList,
+)
+from forecasting_tools.forecasting.questions_and_reports.questions import (
+    MultipleChoiceQuestion,
+    QuestionState,
+)
+
+
+def test_binary_dispersion_is_standard_deviation() -> None:
+    question = ForecastingTestManager.get_fake_binary_questions()
+
+    assert PredictionDispersion.calculate([0.3], question) == 0
+    assert PredictionDispersion.calculate(
+        [0.3, 0.5], question
+    ) == pytest.approx(0.1)
+
+
+def test_multiple_choice_dispersion_uses_most_spread_option() -> None:
+    question = MultipleChoiceQuestion(
+        question_text="Which one?",
+        id_of_post=1,
+        state=QuestionState.OPEN,
+        options=["A", "B", "C"],
+    )
+    predictions = [
+        PredictedOptionList(
+            predicted_options=[
+                PredictedOption(option_name=name, probability=probability)
+                for name, probability in zip(["A", "B", "C"], probabilities)
+            ]
+        )
+        for probabilities in [[0.2, 0.3, 0.5], [0.6, 0.3, 0.1]]
+    ]
+
+    assert PredictionDispersion.calculate(
+        predictions, question
+    ) == pytest.approx(0.2)
@@ -1,6 +1,14 @@
+import numpy as np
 import pytest
 from pydantic import ValidationError
 
+from forecasting_tools.forecasting.helpers.aggregation_strategies import (
+    AggregationStrategy,
+    LogPoolAggregationStrategy,
+    MeanAggregationStrategy,
+    MedianAggregationStrategy,
+    TrimmedMeanAggregationStrategy,
+)
 from forecasting_tools.forecasting.questions_and_reports.multiple_choice_report import (
     MultipleChoiceReport,
     PredictedOption,
@@ -97,3 +105,82 @@ async def test_aggregate_predictions_with_different_options() -> None:
     question = create_test_mc_question()
     with pytest.raises(Exception):
         await MultipleChoiceReport.aggregate_predictions(predictions, question)
+
+
+def create_predictions(
+    probabilities_of_each_prediction: list[list[float]],
+) -> list[PredictedOptionList]:
+    return [
+        PredictedOptionList(
+            predicted_options=[
+                PredictedOption(option_name=name, probability=probability)
+                for name, probability in zip(
+                    ["Option A", "Option B", "Option C"], probabilities
+                )
+            ]
+        )
+        for probabilities in probabilities_of_each_prediction
+    ]
+
+
+@pytest.mark.parametrize(
+    "aggregation_strategy, expected_probabilities",
+    [
+        (MeanAggregationStrategy(), [0.27, 0.37, 0.36]),
+        (MedianAggregationStrategy(), [0.2, 0.4, 0.4]),
+        (TrimmedMeanAggregationStrategy(), [0.2, 0.4, 0.4]),
+    ],
+)
+def test_aggregation_strategies(
+    aggregation_strategy: AggregationStrategy,
+    expected_probabilities: list[float],
+) -> None:
+    predictions = create_predictions(
+        [
+            [0.1, 0.5, 0.4],
+            [0.2, 0.4, 0.4],
+            [0.2, 0.4, 0.4],
+            [0.2, 0.4, 0.4],
+            [0.2, 0.4, 0.4],
+            [0.2, 0.4, 0.4],
+            [0.2, 0.4, 0.4],
+            [0.2, 0.4, 0.4],
+            [0.2, 0.4, 0.4],
+            [1.0, 0.0, 0.0],
+        ]
+    )
+    result = aggregation_strategy.aggregate_predictions(
+        predictions, create_test_mc_question()
+    )
+    assert [
+        option.probability for option in result.predicted_options
+    ] == pytest.approx(expected_probabilities)
+
+
+def test_log_pool_is_renormalized_geometric_mean() -> None:
+    probabilities = np.array([[0.5, 0.25, 0.25], [0.125, 0.5, 0.375]])
+    result = LogPoolAggregationStrategy().aggregate_predictions(
+        create_predictions(probabilities.tolist()), create_test_mc_question()
+    )
+    aggregated = np.array(
+        [option.probability for option in result.predicted_options]
+    )
+    geometric_mean = np.sqrt(probabilities[0] * probabilities[1])
+    assert aggregated == pytest.approx(geometric_mean / geometric_mean.sum())
+    assert aggregated.sum() == pytest.approx(1.0)
+
+
+async def test_aggregate_predictions_with_repeated_option_name() -> None:
+    predictions = create_predictions([[0.3, 0.5, 0.2]]) + [
+        PredictedOptionList(
+            predicted_options=[
+                PredictedOption(option_name="Option A", probability=0.3),
+                PredictedOption(option_name="Option A", probability=0.5),
+                PredictedOption(option_name="Option C", probability=0.2),
+            ]
+        )
+    ]
+    with pytest.raises(AssertionError):
+        await MultipleChoiceReport.aggregate_predictions(
+            predictions, create_test_mc_question()
+        )
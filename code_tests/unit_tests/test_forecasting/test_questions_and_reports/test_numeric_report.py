@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 
 from forecasting_tools.forecasting.questions_and_reports.numeric_report import (
@@ -222,3 +223,79 @@ def test_close_bound_distribution(percentiles: list[Percentile]) -> None:
         assert (
             distribution.cdf[i + 1].value - distribution.cdf[i].value > 0.00001
         )
+
+
+@pytest.mark.parametrize("zero_point", [None, -1.0])
+def test_cdf_arrays_match_cdf_percentiles(zero_point: float | None) -> None:
+    distribution = NumericDistribution(
+        declared_percentiles=[
+            Percentile(value=10.0, percentile=0.1),
+            Percentile(value=20.0, percentile=0.5),
+            Percentile(value=60.0, percentile=0.9),
+        ],
+        open_upper_bound=True,
+        open_lower_bound=False,
+        upper_bound=100.0,
+        lower_bound=0.0,
+        zero_point=zero_point,
+    )
+
+    x_axis = distribution.cdf_x_axis
+    probabilities = distribution.cdf_probabilities
+    cdf = distribution.cdf
+
+    assert x_axis.shape == probabilities.shape == (201,)
+    assert x_axis.tolist() == [percentile.value for percentile in cdf]
+    assert probabilities.tolist() == [
+        percentile.percentile for percentile in cdf
+    ]
+    assert np.all(np.diff(probabilities) >= 0)
+    assert x_axis[0] == pytest.approx(0.0)
+    assert x_axis[-1] == pytest.approx(100.0)
+    if zero_point is not None:
+        assert x_axis[100] < 50.0
+
+
+def test_cdf_is_cached_until_fields_change() -> None:
+    distribution = NumericDistribution(
+        declared_percentiles=[
+            Percentile(value=10.0, percentile=0.1),
+            Percentile(value=20.0, percentile=0.5),
+            Percentile(value=60.0, percentile=0.9),
+        ],
+        open_upper_bound=False,
+        open_lower_bound=False,
+        upper_bound=100.0,
+        lower_bound=0.0,
+        zero_point=None,
+    )
+    first_probabilities = distribution.cdf_probabilities
+    assert distribution.cdf_probabilities is first_probabilities
+    assert not first_probabilities.flags.writeable
+
+    distribution.declared_percentiles[1].value = 30.0
+    changed_probabilities = distribution.cdf_probabilities
+    assert changed_probabilities is not first_probabilities
+    assert changed_probabilities[40] < first_probabilities[40]
+
+    distribution.upper_bound = 200.0
+    assert distribution.cdf_x_axis[-1] == pytest.approx(200.0)
+    assert not np.array_equal(
+        distribution.cdf_probabilities, changed_probabilities
+    )
+
+
+def test_cdf_x_axis_is_shared_between_distributions_with_same_bounds() -> None:
+    distributions = [
+        NumericDistribution(
+            declared_percentiles=[Percentile(value=value, percentile=0.5)],
+            open_upper_bound=False,
+            open_lower_bound=False,
+            upper_bound=100.0,
+            lower_bound=0.0,
+            zero_point=-1.0,
+        )
+        for value in [20.0, 40.0]
+    ]
+    assert distributions[0].cdf_x_axis is distributions[1].cdf_x_axis
+    assert not distributions[0].cdf_x_axis.flags.writeable
@@ -0,0 +1,188 @@
+import numpy as np
+import pytest
+
+from code_tests.unit_tests.test_forecasting.forecasting_test_manager import (
+    ForecastingTestManager,
+)
+from forecasting_tools.forecasting.questions_and_reports.forecast_report import (
+    ScoreType,
+)
+from forecasting_tools.forecasting.questions_and_reports.multiple_choice_report import (
+    MultipleChoiceReport,
+    PredictedOption,
+    PredictedOptionList,
+)
+from forecasting_tools.forecasting.questions_and_reports.numeric_report import (
+    NumericDistribution,
+    NumericReport,
+    Percentile,
+)
+from forecasting_tools.forecasting.questions_and_reports.questions import (
+    MultipleChoiceQuestion,
+    NumericQuestion,
+    QuestionState,
+)
+from forecasting_tools.forecasting.questions_and_reports.report_scorer import (
+    ReportScorer,
+)
+
+EXPLANATION = "# Summary\nTest\n# Research\nTest\n# Forecast\nTest"
+
+
+def make_multiple_choice_report(
+    probabilities: list[float], community_prediction: list[float] | None
+) -> MultipleChoiceReport:
+    options = ["A", "B", "C"]
+    return MultipleChoiceReport(
+        question=MultipleChoiceQuestion(
+            question_text="Which option?",
+            id_of_post=0,
+            state=QuestionState.OPEN,
+            options=options,
+            community_prediction_at_access_time=community_prediction,
+        ),
+        prediction=PredictedOptionList(
+            predicted_options=[
+                PredictedOption(option_name=option, probability=probability)
+                for option, probability in zip(options, probabilities)
+            ]
+        ),
+        explanation=EXPLANATION,
+    )
+
+
+def make_numeric_report(
+    community_prediction: list[float] | None,
+) -> NumericReport:
+    question = NumericQuestion(
+        question_text="How many?",
+        id_of_post=0,
+        state=QuestionState.OPEN,
+        upper_bound=100.0,
+        lower_bound=0.0,
+        open_upper_bound=False,
+        open_lower_bound=False,
+        community_prediction_at_access_time=community_prediction,
+    )
+    return NumericReport(
+        question=question,
+        prediction=NumericDistribution(
+            declared_percentiles=[
+                Percentile(value=20.0, percentile=0.1),
+                Percentile(value=50.0, percentile=0.5),
+                Percentile(value=80.0, percentile=0.9),
+            ],
+            open_upper_bound=False,
+            open_lower_bound=False,
+            upper_bound=100.0,
+            lower_bound=0.0,
+            zero_point=None,
+        ),
+        explanation=EXPLANATION,
+    )
+
+
+def test_binary_scores_match_per_report_scores() -> None:
+    reports = [
+        ForecastingTestManager.get_fake_forecast_report(
+            prediction=prediction, community_prediction=community
+        )
+        for prediction, community in [(0.6, 0.7), (0.3, 0.4), (0.9, 0.1)]
+    ]
+    scores = ReportScorer.calculate_scores(reports)
+
+    assert scores[ScoreType.INVERSED_EXPECTED_LOG_SCORE] == pytest.approx(
+        [report.inversed_expected_log_score for report in reports]
+    )
+    assert scores[ScoreType.DEVIATION_POINTS] == pytest.approx(
+        [report.deviation_points for report in reports]
+    )
+    assert scores[ScoreType.EXPECTED_BRIER_SCORE][0] == pytest.approx(
+        0.7 * 0.4**2 + 0.3 * 0.6**2
+    )
+    assert scores[ScoreType.EXPECTED_BASELINE_SCORE] == pytest.approx(
+        100 * (1 - scores[ScoreType.INVERSED_EXPECTED_LOG_SCORE])
+    )
+
+
+def test_multiple_choice_scores() -> None:
+    report = make_multiple_choice_report([0.5, 0.25, 0.25], [1.0, 0.0, 0.0])
+    scores = ReportScorer.calculate_scores([report])
+
+    assert report.inversed_expected_log_score == pytest.approx(1.0)
+    assert scores[ScoreType.EXPECTED_BRIER_SCORE][0] == pytest.approx(
+        0.5**2 + 0.25**2 + 0.25**2
+    )
+    assert scores[ScoreType.EXPECTED_BASELINE_SCORE][0] == pytest.approx(
+        100 * (1 - 1 / np.log2(3))
+    )
+    assert scores[ScoreType.DEVIATION_POINTS][0] == pytest.approx(1 / 3)
+
+
+def test_numeric_scores_are_best_when_matching_community() -> None:
+    matching_report = make_numeric_report(None)
+    community_cdf = matching_report.prediction.cdf_probabilities.tolist()
+    matching_report = make_numeric_report(community_cdf)
+    shifted_cdf = np.clip(np.array(community_cdf) + 0.1, 0, 1).tolist()
+    shifted_report = make_numeric_report(shifted_cdf)
+
+    scores = ReportScorer.calculate_scores([matching_report, shifted_report])
+
+    assert scores[ScoreType.DEVIATION_POINTS][0] == pytest.approx(0)
+    for score_type in [
+        ScoreType.INVERSED_EXPECTED_LOG_SCORE,
+        ScoreType.EXPECTED_BRIER_SCORE,
+    ]:
+        assert scores[score_type][0] < scores[score_type][1]
+    assert (
+        scores[ScoreType.EXPECTED_BASELINE_SCORE][0]
+        > scores[ScoreType.EXPECTED_BASELINE_SCORE][1]
+    )
+    assert matching_report.inversed_expected_log_score == pytest.approx(
+        scores[ScoreType.INVERSED_EXPECTED_LOG_SCORE][0]
+    )
+
+
+def test_mixed_reports_keep_order_and_missing_community_is_nan() -> None:
+    reports = [
+        make_numeric_report(None),
+        ForecastingTestManager.get_fake_forecast_report(
+            prediction=0.6, community_prediction=0.7
+        ),
+        make_multiple_choice_report([0.5, 0.25, 0.25], [1.0, 0.0, 0.0]),
+        ForecastingTestManager.get_fake_forecast_report(
+            prediction=0.6, community_prediction=None
+        ),
+    ]
+    log_scores = ReportScorer.calculate_scores(reports)[
+        ScoreType.INVERSED_EXPECTED_LOG_SCORE
+    ]
+
+    assert np.isnan(log_scores[0])
+    assert log_scores[1] == pytest.approx(
+        reports[1].inversed_expected_log_score
+    )
+    assert log_scores[2] == pytest.approx(1.0)
+    assert np.isnan(log_scores[3])
+
+    summary = ReportScorer.summarize_scores(reports)[
+        ScoreType.INVERSED_EXPECTED_LOG_SCORE
+    ]
+    assert summary.number_of_scored_reports == 2
+    assert summary.average == pytest.approx(np.nanmean(log_scores))
+
+
+def test_bootstrap_confidence_interval() -> None:
+    scores = np.random.default_rng(0).normal(1.0, 0.5, size=2000)
+
+    lower_bound, upper_bound = (
+        ReportScorer.calculate_bootstrap_confidence_interval(scores)
+    )
+    assert lower_bound < scores.mean() < upper_bound
+    assert upper_bound - lower_bound == pytest.approx(
+        2 * 1.96 * 0.5 / np.sqrt(2000), rel=0.2
+    )
+    assert ReportScorer.calculate_bootstrap_confidence_interval(scores) == (
+        lower_bound,
+        upper_bound,
+    )
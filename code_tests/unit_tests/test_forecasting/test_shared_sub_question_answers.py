@@ -0,0 +1,41 @@
+import asyncio
+
+from forecasting_tools.forecasting.sub_question_researchers.shared_sub_question_answers import (
+    SharedSubQuestionAnswers,
+)
+
+
+async def test_identical_sub_questions_are_answered_once() -> None:
+    answered_questions: list[str] = []
+
+    def make_answerer(question: str):
+        async def answer() -> str:
+            answered_questions.append(question)
+            await asyncio.sleep(0.01)
+            return f"Answer to {question}"
+
+        return answer
+
+    assert SharedSubQuestionAnswers.get_active() is None
+    with SharedSubQuestionAnswers() as shared_answers:
+        assert SharedSubQuestionAnswers.get_active() is shared_answers
+        questions = [
+            ("What is X?", "GeneralResearcher"),
+            ("what  is x? ", "GeneralResearcher"),
+            ("What is X?", "BaseRateResearcher"),
+            ("What is Y?", "GeneralResearcher"),
+        ]
+        answers = await asyncio.gather(
+            *[
+                shared_answers.get_or_create_answer(
+                    make_answerer(question), question, responder
+                )
+                for question, responder in questions
+            ]
+        )
+    assert SharedSubQuestionAnswers.get_active() is None
+
+    assert answers[0] == answers[1] == "Answer to What is X?"
+    assert answered_questions == ["What is X?", "What is X?", "What is Y?"]
+    assert shared_answers.hits == 1
+    assert shared_answers.misses == 3
@@ -325,3 +325,146 @@ def test__run_coroutines_with_action_called_on_exception__handles_no_matching_in
         [isinstance(result, int) for result in results]
     ), "Not all results were integers"
     assert all(inputs == None for inputs in inputs), "Not all inputs were None"
+
+
+async def test_await_coroutines_does_not_block_other_tasks_on_loop() -> None:
+    progress_of_other_task: list[float] = []
+
+    async def other_task() -> None:
+        for _ in range(3):
+            progress_of_other_task.append(time.time())
+            await asyncio.sleep(0.5)
+
+    async def batch() -> list[int]:
+        coroutines = create_set_time_coroutines(5, 1)
+        return await async_batching.await_coroutines(coroutines)
+
+    start_time = time.time()
+    _, results = await asyncio.gather(other_task(), batch())
+    duration = time.time() - start_time
+
+    assert results == [i + 1 for i in range(5)]
+    assert (
+        len(progress_of_other_task) == 3
+    ), "The other task did not progress while the batch was running"
+    assert (
+        duration < 2
+    ), f"The batch and other task did not overlap. Duration was {duration}"
+
+
+async def test_await_coroutines_cancels_remaining_tasks_on_exception() -> None:
+    finished_coroutines: list[int] = []
+
+    async def slow_coroutine() -> int:
+        await asyncio.sleep(2)
+        finished_coroutines.append(1)
+        return 1
+
+    async def failing_coroutine() -> int:
+        raise RuntimeError("Test exception")
+
+    with pytest.raises(RuntimeError):
+        await async_batching.await_coroutines(
+            [slow_coroutine(), failing_coroutine(), slow_coroutine()]
+        )
+    await asyncio.sleep(2.5)
+    assert (
+        len(finished_coroutines) == 0
+    ), "Remaining tasks were not cancelled after an exception"
+
+
+async def test_await_coroutines_while_removing_exceptions_pairs_inputs() -> (
+    None
+):
+    async def fail_on_odd(input: int) -> int:
+        if input % 2 == 1:
+            raise RuntimeError("Test exception")
+        return input * 10
+
+    inputs = [i for i in range(6)]
+    errored_inputs: list[int] = []
+    results, passing_inputs = (
+        await async_batching.await_coroutines_while_removing_and_logging_exceptions(
+            [fail_on_odd(input) for input in inputs],
+            inputs,
+            lambda e, input: errored_inputs.append(input),
+        )
+    )
+
+    assert results == [0, 20, 40]
+    assert passing_inputs == [0, 2, 4]
+    assert errored_inputs == [1, 3, 5]
+
+
+async def test_worker_pool_respects_max_concurrent_and_streams_results() -> (
+    None
+):
+    currently_running = 0
+    max_seen_running = 0
+
+    async def track_concurrency(seconds_to_wait: float) -> float:
+        nonlocal currently_running, max_seen_running
+        currently_running += 1
+        max_seen_running = max(max_seen_running, currently_running)
+        await asyncio.sleep(seconds_to_wait)
+        currently_running -= 1
+        return seconds_to_wait
+
+    inputs = [0.5, 0.1, 0.5, 0.1, 0.5, 0.1]
+    completed_indexes = []
+    async for (
+        index,
+        result,
+    ) in async_batching.run_function_with_worker_pool_as_completed(
+        track_concurrency, inputs, max_concurrent=2
+    ):
+        assert result == inputs[index]
+        completed_indexes.append(index)
+
+    assert max_seen_running == 2
+    assert sorted(completed_indexes) == list(range(len(inputs)))
+    assert completed_indexes[0] == 1, "Results were not yielded as completed"
+
+
+async def test_worker_pool_returns_exceptions_and_cancels_on_close() -> None:
+    started_inputs: list[int] = []
+
+    async def fail_on_first(input: int) -> int:
+        started_inputs.append(input)
+        if input == 0:
+            raise RuntimeError("Test exception")
+        await asyncio.sleep(1)
+        return input
+
+    generator = async_batching.run_function_with_worker_pool_as_completed(
+        fail_on_first, [0, 1, 2, 3], max_concurrent=2
+    )
+    index, result = await generator.__anext__()
+    assert index == 0
+    assert isinstance(result, RuntimeError)
+    await generator.aclose()
+    await asyncio.sleep(1.5)
+    assert (
+        len(started_inputs) < 4
+    ), "Workers kept running after the generator was closed"
+
+
+async def test_worker_pool_raises_instead_of_hanging_when_worker_stops() -> (
+    None
+):
+    async def cancel_on_second_input(input: int) -> int:
+        if input == 1:
+            raise asyncio.CancelledError()
+        await asyncio.sleep(0.01)
+        return input
+
+    async def collect_results() -> list[int]:
+        return [
+            result
+            async for _, result in async_batching.run_function_with_worker_pool_as_completed(
+                cancel_on_second_input, [0, 1, 2], max_concurrent=1
+            )
+        ]
+
+    with pytest.raises(asyncio.CancelledError):
+        await asyncio.wait_for(collect_results(), timeout=1)
@@ -0,0 +1,31 @@
+import asyncio
+
+from forecasting_tools.util.http_session_pool import HttpSessionPool
+
+
+async def test_async_session_is_shared_within_a_loop() -> None:
+    first_session = await HttpSessionPool.get_async_session()
+    second_session = await HttpSessionPool.get_async_session()
+    assert first_session is second_session
+
+    await HttpSessionPool.close_async_session()
+    assert first_session.closed
+    assert await HttpSessionPool.get_async_session() is not first_session
+    await HttpSessionPool.close_async_session()
+
+
+def test_idle_loops_have_their_sessions_closed() -> None:
+    loop = asyncio.new_event_loop()
+    try:
+        session = loop.run_until_complete(HttpSessionPool.get_async_session())
+        HttpSessionPool._close_async_sessions_of_idle_loops()
+        assert session.closed
+    finally:
+        loop.close()
+
+
+def test_sync_session_is_shared() -> None:
+    assert (
+        HttpSessionPool.get_sync_session()
+        is HttpSessionPool.get_sync_session()
+    )
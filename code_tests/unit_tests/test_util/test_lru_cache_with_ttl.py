@@ -0,0 +1,26 @@
+import time
+
+from forecasting_tools.util.lru_cache_with_ttl import LruCacheWithTtl
+
+
+def test_least_recently_used_entry_is_evicted() -> None:
+    cache: LruCacheWithTtl[str, int] = LruCacheWithTtl(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_entries_expire_after_ttl() -> None:
+    cache: LruCacheWithTtl[str, int] = LruCacheWithTtl(ttl_seconds=0.1)
+    cache.set("short", 1)
+    cache.set("long", 2, ttl_seconds=10)
+    time.sleep(0.2)
+
+    assert cache.get("short") is None
+    assert cache.get("long") == 2
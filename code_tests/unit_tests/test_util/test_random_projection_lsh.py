@@ -0,0 +1,28 @@
+import numpy as np
+
+from forecasting_tools.util.random_projection_lsh import RandomProjectionLsh
+
+
+def test_near_duplicates_become_candidates_and_most_pairs_do_not() -> None:
+    rng = np.random.default_rng(1)
+    vectors = rng.standard_normal((200, 32))
+    near_duplicates = vectors[:20] + 0.05 * rng.standard_normal((20, 32))
+    all_vectors = np.vstack([vectors, near_duplicates])
+    all_vectors /= np.linalg.norm(all_vectors, axis=1, keepdims=True)
+
+    first_indexes, second_indexes = RandomProjectionLsh().find_candidate_pairs(
+        all_vectors
+    )
+    candidate_pairs = set(zip(first_indexes, second_indexes))
+
+    assert all((i, 200 + i) in candidate_pairs for i in range(20))
+    assert all(first < second for first, second in candidate_pairs)
+    number_of_pairs = len(all_vectors) * (len(all_vectors) - 1) / 2
+    assert len(candidate_pairs) < 0.5 * number_of_pairs
+
+
+def test_no_candidates_for_single_vector() -> None:
+    first_indexes, second_indexes = RandomProjectionLsh().find_candidate_pairs(
+        np.ones((1, 4))
+    )
+    assert len(first_indexes) == len(second_indexes) == 0
@@ -11,6 +11,9 @@ from forecasting_tools.ai_models.metaculus4o import (
     Gpt4oMetaculusProxy as Gpt4oMetaculusProxy,
 )
 from forecasting_tools.ai_models.perplexity import Perplexity as Perplexity
+from forecasting_tools.ai_models.resource_managers.llm_response_cache import (
+    LlmResponseCache as LlmResponseCache,
+)
 from forecasting_tools.ai_models.resource_managers.monetary_cost_manager import (
     MonetaryCostManager as MonetaryCostManager,
 )
@@ -26,6 +29,27 @@ from forecasting_tools.forecasting.forecast_bots.template_bot import (
 from forecasting_tools.forecasting.forecast_bots.template_v1_bot import (
     TemplateBot_v1 as TemplateBot_v1,
 )
+from forecasting_tools.forecasting.helpers.aggregation_strategies import (
+    AggregationStrategy as AggregationStrategy,
+)
+from forecasting_tools.forecasting.helpers.aggregation_strategies import (
+    ExtremizedLogOddsAggregationStrategy as ExtremizedLogOddsAggregationStrategy,
+)
+from forecasting_tools.forecasting.helpers.aggregation_strategies import (
+    LogPoolAggregationStrategy as LogPoolAggregationStrategy,
+)
+from forecasting_tools.forecasting.helpers.aggregation_strategies import (
+    MeanAggregationStrategy as MeanAggregationStrategy,
+)
+from forecasting_tools.forecasting.helpers.aggregation_strategies import (
+    MedianAggregationStrategy as MedianAggregationStrategy,
+)
+from forecasting_tools.forecasting.helpers.aggregation_strategies import (
+    PerformanceWeightedAggregationStrategy as PerformanceWeightedAggregationStrategy,
+)
+from forecasting_tools.forecasting.helpers.aggregation_strategies import (
+    TrimmedMeanAggregationStrategy as TrimmedMeanAggregationStrategy,
+)
 from forecasting_tools.forecasting.helpers.benchmarker import (
     Benchmarker as Benchmarker,
 )
@@ -50,6 +74,9 @@ from forecasting_tools.forecasting.questions_and_reports.forecast_report import
 from forecasting_tools.forecasting.questions_and_reports.forecast_report import (
     ReasonedPrediction as ReasonedPrediction,
 )
+from forecasting_tools.forecasting.questions_and_reports.forecast_report import (
+    ScoreType as ScoreType,
+)
 from forecasting_tools.forecasting.questions_and_reports.multiple_choice_report import (
     MultipleChoiceReport as MultipleChoiceReport,
 )
@@ -80,6 +107,12 @@ from forecasting_tools.forecasting.questions_and_reports.questions import (
 from forecasting_tools.forecasting.questions_and_reports.questions import (
     QuestionState as QuestionState,
 )
+from forecasting_tools.forecasting.questions_and_reports.report_scorer import (
+    ReportScorer as ReportScorer,
+)
+from forecasting_tools.forecasting.questions_and_reports.report_scorer import (
+    ScoreSummary as ScoreSummary,
+)
 from forecasting_tools.forecasting.sub_question_researchers.base_rate_researcher import (
     BaseRateResearcher as BaseRateResearcher,
 )
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import math
+import threading
+
+import regex
+
+from forecasting_tools.util.lru_cache_with_ttl import LruCacheWithTtl
+
+logger = logging.getLogger(__name__)
+
+
+class LocalTokenizer:
+    """
+    Counts tokens offline for model families whose real tokenizer is only
+    available through an API call or a download (e.g. Claude and Perplexity).
+
+    Text is split into the pieces that BPE tokenizers start merging from
+    (words, numbers of up to 3 digits, runs of punctuation and whitespace).
+    Each model family converts pieces to tokens at its own rate, which starts
+    as a guess and is then calibrated from the prompt token usage the
+    provider reports in its responses.
+
+    Use get_for_model_family so every model of a family shares one tokenizer
+    (and so one calibration).
+    """
+
+    CHARACTERS_PER_LONG_WORD_TOKEN = 6
+    _WEIGHT_OF_NEWEST_USAGE = 0.2
+    _MIN_TOKENS_PER_PIECE = 0.25
+    _MAX_TOKENS_PER_PIECE = 4.0
+    _PIECE_PATTERN = regex.compile(
+        r" ?\p{L}+| ?\p{N}{1,3}| ?[^\s\p{L}\p{N}]+|\s+"
+    )
+    _tokenizers_by_family: dict[str, LocalTokenizer] = {}
+    _tokenizers_lock = threading.Lock()
+
+    def __init__(
+        self,
+        initial_tokens_per_piece: float = 1.0,
+        tokens_per_message: int = 0,
+        max_cached_counts: int = 10000,
+    ) -> None:
+        assert (
+            self._MIN_TOKENS_PER_PIECE
+            <= initial_tokens_per_piece
+            <= self._MAX_TOKENS_PER_PIECE
+        )
+        assert tokens_per_message >= 0
+        self.tokens_per_piece = initial_tokens_per_piece
+        self.tokens_per_message = tokens_per_message
+        self.__piece_counts: LruCacheWithTtl[str, int] = LruCacheWithTtl(
+            max_entries=max_cached_counts, ttl_seconds=None
+        )
+
+    @classmethod
+    def get_for_model_family(
+        cls,
+        model_family: str,
+        initial_tokens_per_piece: float = 1.0,
+        tokens_per_message: int = 0,
+    ) -> LocalTokenizer:
+        """
+        The settings are only used the first time a family is asked for
+        """
+        tokenizer = cls._tokenizers_by_family.get(model_family)
+        if tokenizer is not None:
+            return tokenizer
+        with cls._tokenizers_lock:
+            if model_family not in cls._tokenizers_by_family:
+                cls._tokenizers_by_family[model_family] = cls(
+                    initial_tokens_per_piece, tokens_per_message
+                )
+            return cls._tokenizers_by_family[model_family]
+
+    def text_to_tokens(self, text: str) -> int:
+        return math.ceil(self.tokens_per_piece * self.count_pieces(text))
+
+    def messages_to_tokens(self, message_texts: list[str]) -> int:
+        pieces = sum(self.count_pieces(text) for text in message_texts)
+        return math.ceil(self.tokens_per_piece * pieces) + (
+            self.tokens_per_message * len(message_texts)
+        )
+
+    def count_pieces(self, text: str) -> int:
+        """
+        Counts are cached by a hash of the text, since the same long prompt
+        is counted again on every retry and cost check
+        """
+        key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        piece_count = self.__piece_counts.get(key)
+        if piece_count is None:
+            piece_count = sum(
+                self.__pieces_in_match(piece)
+                for piece in self._PIECE_PATTERN.findall(text)
+            )
+            self.__piece_counts.set(key, piece_count)
+        return piece_count
+
+    def record_usage(
+        self, message_texts: list[str], prompt_tokens_used: int
+    ) -> None:
+        """
+        Moves tokens_per_piece towards the rate seen in a real response
+        """
+        pieces = sum(self.count_pieces(text) for text in message_texts)
+        content_tokens = prompt_tokens_used - self.tokens_per_message * len(
+            message_texts
+        )
+        if pieces == 0 or content_tokens <= 0:
+            return
+        observed_tokens_per_piece = min(
+            max(content_tokens / pieces, self._MIN_TOKENS_PER_PIECE),
+            self._MAX_TOKENS_PER_PIECE,
+        )
+        self.tokens_per_piece = (
+            1 - self._WEIGHT_OF_NEWEST_USAGE
+        ) * self.tokens_per_piece + (
+            self._WEIGHT_OF_NEWEST_USAGE * observed_tokens_per_piece
+        )
+
+    @classmethod
+    def __pieces_in_match(cls, piece: str) -> int:
+        """
+        Common words are one token, but long or rare ones get split up
+        """
+        return max(
+            1,
+            math.ceil(len(piece.strip()) / cls.CHARACTERS_PER_LONG_WORD_TOKEN),
+        )
@@ -1,7 +1,9 @@
 import base64
+import hashlib
 import logging
 import math
 import re
+import threading
 from io import BytesIO
 from typing import Literal
 from urllib import request
@@ -19,6 +21,8 @@ from PIL import Image
 from pydantic import BaseModel
 from tiktoken import Encoding
 
+from forecasting_tools.util.lru_cache_with_ttl import LruCacheWithTtl
+
 logger = logging.getLogger(__name__)
 
 
@@ -32,23 +36,75 @@ class VisionMessageData(BaseModel):
 
 
 class OpenAiUtils:
+    # Every message is wrapped in <|start|>{role/name}\n{content}<|end|>\n
+    TOKENS_PER_MESSAGE = 3
+    TOKENS_PER_NAME = 1
+    # Every reply is primed with <|start|>assistant<|message|>
+    TOKENS_PER_REPLY = 3
+    _encodings_by_model: dict[str, Encoding] = {}
+    _encodings_lock = threading.Lock()
+    _token_counts: LruCacheWithTtl[tuple[str, str], int] = LruCacheWithTtl(
+        max_entries=10000, ttl_seconds=None
+    )
 
     @staticmethod
     def text_to_tokens_direct(text_to_tokenize: str, model: str) -> int:
         encoding = OpenAiUtils.__get_encoding_for_model(model)
-        token_num = len(encoding.encode(text_to_tokenize))
-        return token_num
+        return OpenAiUtils.__count_tokens(text_to_tokenize, encoding)
 
-    @staticmethod
-    def __get_encoding_for_model(model: str) -> Encoding:
-        try:
-            encoding = tiktoken.encoding_for_model(model)
-        except KeyError:
-            logger.warning(
-                "Warning: model not found. Using o200k_base encoding."
-            )
-            encoding = tiktoken.get_encoding("o200k_base")
-        return encoding
+    @classmethod
+    def __get_encoding_for_model(cls, model: str) -> Encoding:
+        """
+        Looking up an encoding is slow, so each model's encoding is kept for
+        the life of the process (encodings are safe to share between threads)
+        """
+        encoding = cls._encodings_by_model.get(model)
+        if encoding is not None:
+            return encoding
+        with cls._encodings_lock:
+            if model not in cls._encodings_by_model:
+                try:
+                    encoding = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    logger.warning(
+                        "Warning: model not found. Using o200k_base encoding."
+                    )
+                    encoding = tiktoken.get_encoding("o200k_base")
+                cls._encodings_by_model[model] = encoding
+            return cls._encodings_by_model[model]
+
+    @classmethod
+    def __count_tokens(cls, text: str, encoding: Encoding) -> int:
+        """
+        Long prompts are counted again on every retry and cost check, so
+        counts are cached by a hash of the text
+        """
+        key = (encoding.name, hashlib.sha256(text.encode("utf-8")).hexdigest())
+        token_count = cls._token_counts.get(key)
+        if token_count is None:
+            token_count = len(encoding.encode(text))
+            cls._token_counts.set(key, token_count)
+        return token_count
+
+    @classmethod
+    def estimate_max_tokens_of_messages(
+        cls, messages: list[ChatCompletionMessageParam]
+    ) -> int | None:
+        """
+        A quick upper bound on messages_to_tokens that doesn't tokenize.
+        Every token is at least one byte, so a text never has more tokens
+        than utf-8 bytes. Returns None for image messages.
+        """
+        num_tokens = cls.TOKENS_PER_REPLY
+        for message in messages:
+            num_tokens += cls.TOKENS_PER_MESSAGE
+            for key, value in message.items():
+                if not isinstance(value, str):
+                    return None
+                num_tokens += len(value.encode("utf-8"))
+                if key == "name":
+                    num_tokens += cls.TOKENS_PER_NAME
+        return num_tokens
 
     @staticmethod
     def messages_to_tokens(
@@ -67,9 +123,7 @@ class OpenAiUtils:
             num_tokens += OpenAiUtils.__message_to_tokens(
                 message, model, encoding
             )
-        num_tokens += (
-            3  # every reply is primed with <|start|>assistant<|message|>
-        )
+        num_tokens += OpenAiUtils.TOKENS_PER_REPLY
         return num_tokens
 
     @staticmethod
@@ -102,9 +156,7 @@ class OpenAiUtils:
         cls, message: ChatCompletionMessageParam, encoding: Encoding
     ) -> int:
         # NOTE: The hardcoded values might change for future models, but applies to all models past gpt3.5 as of Oct 15 2024
-        tokens_per_message = 3
-        tokens_per_name = 1
-        num_tokens = tokens_per_message
+        num_tokens = cls.TOKENS_PER_MESSAGE
         for key, value in message.items():
             content = value
             assert isinstance(content, str)
@@ -113,9 +165,9 @@ class OpenAiUtils:
                 for item in value:
                     if isinstance(item, dict) and item.get("type") in ["text"]:
                         content = item.get("text", "")
-            num_tokens += len(encoding.encode(content))
+            num_tokens += cls.__count_tokens(content, encoding)
             if key == "name":
-                num_tokens += tokens_per_name
+                num_tokens += cls.TOKENS_PER_NAME
         return num_tokens
 
     @staticmethod
@@ -134,11 +186,13 @@ class OpenAiUtils:
                     item: dict
                     num_tokens += len(encoding.encode(item["type"]))
                     if item["type"] == "text":
-                        num_tokens += len(encoding.encode(item["text"]))
+                        num_tokens += OpenAiUtils.__count_tokens(
+                            item["text"], encoding
+                        )
                     elif item["type"] == "image_url":
                         num_tokens += OpenAiUtils.__calculate_tokens_of_image(item["image_url"]["url"], item["image_url"]["detail"])  # type: ignore
             elif isinstance(value, str):
-                num_tokens += len(encoding.encode(value))
+                num_tokens += OpenAiUtils.__count_tokens(value, encoding)
 
         return num_tokens
 
@@ -1,7 +1,15 @@
+import functools
 import os
 from abc import ABC, abstractmethod
 from contextvars import ContextVar
-from typing import Any
+from typing import Any, Callable, Coroutine
+
+from forecasting_tools.ai_models.basic_model_interfaces.incurs_cost import (
+    IncursCost,
+)
+from forecasting_tools.ai_models.resource_managers.in_flight_call_coalescer import (
+    InFlightCallCoalescer,
+)
 
 
 class AiModel(ABC):
@@ -43,6 +51,39 @@ class AiModel(ABC):
         """
         pass
 
+    def _get_coalescing_key(self, *args, **kwargs) -> str | None:
+        """
+        Identical in-flight calls with the same key share one request.
+        Returns None (the default) if the call should never be shared.
+        """
+        return None
+
+    @staticmethod
+    def _coalesce_identical_in_flight_calls(
+        func: Callable[..., Coroutine[Any, Any, Any]]
+    ) -> Callable[..., Coroutine[Any, Any, Any]]:
+        """
+        Put this outside the rate limiting and cost tracking decorators so
+        calls that join an in-flight call don't wait for capacity or get
+        charged for a request they didn't make
+        """
+
+        @functools.wraps(func)
+        async def wrapper(self: AiModel, *args, **kwargs) -> Any:
+            key = self._get_coalescing_key(*args, **kwargs)
+            if key is None:
+                return await func(self, *args, **kwargs)
+            estimated_cost = (
+                await self._estimate_cost_to_reserve(*args, **kwargs)
+                if isinstance(self, IncursCost)
+                else 0
+            )
+            return await InFlightCallCoalescer.run(
+                key, lambda: func(self, *args, **kwargs), estimated_cost
+            )
+
+        return wrapper
+
     def _everything_special_to_call_before_direct_call(self) -> Any:
         """
         This function is called before the direct call to the model.
@@ -1,3 +1,4 @@
+import asyncio
 import functools
 from abc import ABC, abstractmethod
 from typing import Any, Callable, Coroutine, TypeVar
@@ -20,19 +21,53 @@ class IncursCost(ABC):
     ) -> None:
         pass
 
+    def _estimate_cost_of_call(self, *args, **kwargs) -> float:
+        """
+        Cost reserved in the cost manager while a call is running.
+        Takes the same arguments as the wrapped function.
+        """
+        return 0
+
+    async def _estimate_cost_to_reserve(self, *args, **kwargs) -> float:
+        """
+        Nothing needs reserving if no active cost manager has a limit.
+        Otherwise the estimate is made in a worker thread, since it can
+        involve tokenizing a long prompt, which would stall other coroutines.
+        """
+        if not MonetaryCostManager.an_active_manager_has_a_limit():
+            return 0
+        return await asyncio.to_thread(
+            self._estimate_cost_of_call, *args, **kwargs
+        )
+
     @staticmethod
     def _wrap_in_cost_limiting_and_tracking(
         func: Callable[..., Coroutine[Any, Any, T]]
     ) -> Callable[..., Coroutine[Any, Any, T]]:
+        """
+        Put this outside the retry decorator so the cost is estimated once
+        per call and stays reserved between tries
+        """
+
         @functools.wraps(func)
         async def wrapper(self: IncursCost, *args, **kwargs) -> T:
-            MonetaryCostManager.raise_error_if_limit_would_be_reached()
-
-            direct_call_response = await func(self, *args, **kwargs)
-
-            await self._track_cost_in_manager_using_model_response(
-                direct_call_response
+            estimated_cost = await self._estimate_cost_to_reserve(
+                *args, **kwargs
+            )
+            reserving_managers = (
+                MonetaryCostManager.reserve_usage_in_parent_managers(
+                    estimated_cost
+                )
             )
+            try:
+                direct_call_response = await func(self, *args, **kwargs)
+                await self._track_cost_in_manager_using_model_response(
+                    direct_call_response
+                )
+            finally:
+                MonetaryCostManager.release_reserved_usage(
+                    reserving_managers, estimated_cost
+                )
             return direct_call_response
 
         return wrapper
@@ -6,6 +6,9 @@ from abc import ABC
 from typing import Any, Callable, Coroutine, TypeVar
 
 from forecasting_tools.ai_models.basic_model_interfaces.ai_model import AiModel
+from forecasting_tools.ai_models.resource_managers.provider_rate_limits import (
+    ProviderRateLimits,
+)
 from forecasting_tools.ai_models.resource_managers.refreshing_bucket_rate_limiter import (
     RefreshingBucketRateLimiter,
 )
@@ -44,6 +47,33 @@ class RequestLimitedModel(AiModel, ABC):
             cls.REQUESTS_PER_PERIOD_LIMIT / cls.REQUEST_PERIOD_IN_SECONDS,
         )
 
+    @classmethod
+    def _adapt_request_limiter_to_provider_limits(
+        cls, limits: ProviderRateLimits
+    ) -> None:
+        """
+        REQUESTS_PER_PERIOD_LIMIT is only a starting guess.
+        Once the provider tells us our real budget, follow that instead.
+        """
+        if limits.request_limit is not None and limits.request_limit > 0:
+            cls._request_limiter.retune(
+                limits.request_limit,
+                limits.request_limit / cls.REQUEST_PERIOD_IN_SECONDS,
+            )
+        if limits.requests_remaining is not None:
+            cls._request_limiter.lower_available_resources_to(
+                limits.requests_remaining
+            )
+            if (
+                limits.requests_remaining == 0
+                and limits.seconds_till_requests_reset is not None
+            ):
+                cls._request_limiter.pause_for(
+                    limits.seconds_till_requests_reset
+                )
+        if limits.retry_after_seconds is not None:
+            cls._request_limiter.pause_for(limits.retry_after_seconds)
+
     @staticmethod
     def _wait_till_request_capacity_available(
         func: Callable[..., Coroutine[Any, Any, T]]
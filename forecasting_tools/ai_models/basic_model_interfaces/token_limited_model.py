@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 from abc import ABC
 
+from forecasting_tools.ai_models.ai_utils.response_types import (
+    TextTokenResponse,
+)
 from forecasting_tools.ai_models.basic_model_interfaces.ai_model import AiModel
 
 logger = logging.getLogger(__name__)
@@ -12,6 +16,9 @@ from typing import Any, Callable, Coroutine, TypeVar
 from forecasting_tools.ai_models.basic_model_interfaces.tokens_are_calculatable import (
     TokensAreCalculatable,
 )
+from forecasting_tools.ai_models.resource_managers.provider_rate_limits import (
+    ProviderRateLimits,
+)
 from forecasting_tools.ai_models.resource_managers.refreshing_bucket_rate_limiter import (
     RefreshingBucketRateLimiter,
 )
@@ -46,21 +53,134 @@ class TokenLimitedModel(AiModel, TokensAreCalculatable, ABC):
             cls.TOKENS_PER_PERIOD_LIMIT / cls.TOKEN_PERIOD_IN_SECONDS,
         )
 
+    @classmethod
+    def _adapt_token_limiter_to_provider_limits(
+        cls, limits: ProviderRateLimits
+    ) -> None:
+        """
+        TOKENS_PER_PERIOD_LIMIT is only a starting guess.
+        Once the provider tells us our real budget, follow that instead.
+        """
+        if limits.token_limit is not None and limits.token_limit > 0:
+            cls._token_limiter.retune(
+                limits.token_limit,
+                limits.token_limit / cls.TOKEN_PERIOD_IN_SECONDS,
+            )
+        if limits.tokens_remaining is not None:
+            cls._token_limiter.lower_available_resources_to(
+                limits.tokens_remaining
+            )
+            if (
+                limits.tokens_remaining == 0
+                and limits.seconds_till_tokens_reset is not None
+            ):
+                cls._token_limiter.pause_for(limits.seconds_till_tokens_reset)
+        if limits.retry_after_seconds is not None:
+            cls._token_limiter.pause_for(limits.retry_after_seconds)
+
     @staticmethod
     def _wait_till_token_capacity_available(
         func: Callable[..., Coroutine[Any, Any, T]]
     ) -> Callable[..., Coroutine[Any, Any, T]]:
         @functools.wraps(func)
         async def wrapper(self: TokenLimitedModel, *args, **kwargs) -> T:
-            tokens_of_prompt = self.input_to_tokens(*args, **kwargs)
-            await self._token_limiter.wait_till_able_to_acquire_resources(
-                tokens_of_prompt
+            tokens_of_prompt, tokens_reserved = (
+                await self.__reserve_tokens_for_prompt(*args, **kwargs)
             )
-            result = await func(self, *args, **kwargs)
+            try:
+                result = await func(self, *args, **kwargs)
+            except BaseException:
+                self._token_limiter.settle_acquisition(
+                    tokens_reserved, tokens_of_prompt
+                )
+                raise
+            self._settle_token_reservation(tokens_reserved, result)
+            if isinstance(result, TextTokenResponse):
+                self._calibrate_input_to_tokens(
+                    result.prompt_tokens_used, *args, **kwargs
+                )
             return result
 
         return wrapper
 
+    async def __reserve_tokens_for_prompt(
+        self, *args, **kwargs
+    ) -> tuple[int, int]:
+        """
+        The exact count is made in a thread. If the quick upper bound on the
+        prompt's tokens (if the model has one) can be taken from the bucket
+        right away, the call goes ahead without waiting for the count, and
+        the reservation is settled to the exact count afterwards. Otherwise
+        the call queues with the exact count, so it never waits for tokens
+        it won't use.
+        Returns the tokens of the prompt and the tokens reserved.
+        """
+        exact_count = asyncio.ensure_future(
+            self.input_to_tokens_off_event_loop(*args, **kwargs)
+        )
+        max_tokens_of_prompt = self.estimate_max_input_tokens(*args, **kwargs)
+        upper_bound_reserved = (
+            min(
+                self._estimate_tokens_to_reserve(max_tokens_of_prompt),
+                int(self._token_limiter.capacity),
+            )
+            if max_tokens_of_prompt is not None
+            else None
+        )
+        if (
+            upper_bound_reserved is not None
+            and self._token_limiter.acquire_resources_if_available_now(
+                upper_bound_reserved
+            )
+        ):
+            try:
+                tokens_of_prompt = await exact_count
+            except BaseException:
+                self._token_limiter.settle_acquisition(upper_bound_reserved, 0)
+                raise
+            tokens_reserved = self._estimate_tokens_to_reserve(
+                tokens_of_prompt
+            )
+            if tokens_reserved <= upper_bound_reserved:
+                self._token_limiter.settle_acquisition(
+                    upper_bound_reserved, tokens_reserved
+                )
+                return tokens_of_prompt, tokens_reserved
+            self._token_limiter.settle_acquisition(upper_bound_reserved, 0)
+        else:
+            tokens_of_prompt = await exact_count
+            tokens_reserved = self._estimate_tokens_to_reserve(
+                tokens_of_prompt
+            )
+
+        await self._token_limiter.wait_till_able_to_acquire_resources(
+            tokens_reserved
+        )
+        return tokens_of_prompt, tokens_reserved
+
+    def _estimate_tokens_to_reserve(self, tokens_of_prompt: int) -> int:
+        """
+        Completion tokens count against provider limits too, so reserve an estimate
+        of them up front (capped at the bucket size so large prompts can still run)
+        """
+        tokens_with_expected_completion = (
+            tokens_of_prompt + self._get_expected_completion_tokens()
+        )
+        capped_tokens = min(
+            tokens_with_expected_completion, int(self._token_limiter.capacity)
+        )
+        return max(tokens_of_prompt, capped_tokens)
+
+    def _settle_token_reservation(
+        self, tokens_reserved: int, response: Any
+    ) -> None:
+        if not isinstance(response, TextTokenResponse):
+            return
+        self._token_limiter.settle_acquisition(
+            tokens_reserved, response.total_tokens_used
+        )
+        self._record_completion_tokens(response.completion_tokens_used)
+
     @classmethod
     def _make_token_limiter_have_large_rate(cls) -> None:
         """
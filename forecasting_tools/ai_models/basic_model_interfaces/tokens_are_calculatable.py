@@ -1,8 +1,54 @@
+import asyncio
 from abc import ABC, abstractmethod
 
 
 class TokensAreCalculatable(ABC):
+    # Starting guess. Replaced by a running average of real completions
+    EXPECTED_COMPLETION_TOKENS: int = 1000
+    _average_completion_tokens: float | None = None
 
     @abstractmethod
     def input_to_tokens(self, *args, **kwargs) -> int:
         pass
+
+    def estimate_max_input_tokens(self, *args, **kwargs) -> int | None:
+        """
+        A quick upper bound on input_to_tokens (e.g. from the length of the
+        input) for when waiting on an exact count would slow things down.
+        Returns None if the model has no such bound.
+        """
+        return None
+
+    def _calibrate_input_to_tokens(
+        self, prompt_tokens_used: int, *args, **kwargs
+    ) -> None:
+        """
+        Called with the prompt tokens a provider reported for an input, for
+        models that estimate their token counts locally
+        """
+
+    async def input_to_tokens_off_event_loop(self, *args, **kwargs) -> int:
+        """
+        Tokenizing long prompts takes long enough to stall other coroutines,
+        so the exact count is made in a worker thread
+        """
+        return await asyncio.to_thread(self.input_to_tokens, *args, **kwargs)
+
+    @classmethod
+    def _get_expected_completion_tokens(cls) -> int:
+        """
+        Completion length isn't known until a call finishes, so budgets that
+        are checked beforehand (rate limits, cost limits) use this estimate
+        """
+        if cls._average_completion_tokens is None:
+            return cls.EXPECTED_COMPLETION_TOKENS
+        return round(cls._average_completion_tokens)
+
+    @classmethod
+    def _record_completion_tokens(cls, completion_tokens: int) -> None:
+        weight_of_newest_completion = 0.2
+        cls._average_completion_tokens = (
+            1 - weight_of_newest_completion
+        ) * cls._get_expected_completion_tokens() + (
+            weight_of_newest_completion * completion_tokens
+        )
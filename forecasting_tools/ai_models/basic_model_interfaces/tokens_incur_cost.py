@@ -38,6 +38,12 @@ class TokensIncurCost(TokensAreCalculatable, IncursCost, ABC):
             )
         MonetaryCostManager.increase_current_usage_in_parent_managers(cost)
 
+    def _estimate_cost_of_call(self, *args, **kwargs) -> float:
+        return self.calculate_cost_from_tokens(
+            prompt_tkns=self.input_to_tokens(*args, **kwargs),
+            completion_tkns=self._get_expected_completion_tokens(),
+        )
+
     @property
     def cost_per_token_completion(self) -> float:
         return self.calculate_cost_from_tokens(
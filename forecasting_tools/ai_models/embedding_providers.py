@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import re
+import threading
+from abc import ABC, abstractmethod
+from typing import Any
+
+import numpy as np
+from openai import OpenAI
+
+from forecasting_tools.ai_models.resource_managers.embedding_cache import (
+    EmbeddingCache,
+)
+from forecasting_tools.util.http_session_pool import HttpSessionPool
+from forecasting_tools.util.misc import raise_for_status_with_additional_info
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingProvider(ABC):
+    """
+    Turns texts into embedding vectors
+    """
+
+    def __init__(self, model_name: str) -> None:
+        self.model_name = model_name
+
+    @abstractmethod
+    async def embed(self, texts: list[str]) -> np.ndarray:
+        """
+        Returns a float32 matrix with one row per text
+        """
+
+
+class BatchedEmbeddingProvider(EmbeddingProvider):
+    """
+    Texts that were embedded before are read from a persistent cache (one per
+    provider and model) and the rest are embedded in batches. All of this runs
+    on a worker thread so the event loop is never blocked.
+    """
+
+    DEFAULT_CACHE_DIRECTORY = "logs/embedding_cache"
+    BATCH_SIZE = 100
+
+    def __init__(
+        self,
+        model_name: str,
+        cache_directory: str | None = DEFAULT_CACHE_DIRECTORY,
+    ) -> None:
+        super().__init__(model_name)
+        if cache_directory is None:
+            self.cache: EmbeddingCache | None = None
+        else:
+            cache_folder_name = re.sub(
+                r"[^A-Za-z0-9_.-]", "_", f"{type(self).__name__}_{model_name}"
+            )
+            self.cache = EmbeddingCache(
+                os.path.join(cache_directory, cache_folder_name)
+            )
+
+    async def embed(self, texts: list[str]) -> np.ndarray:
+        """
+        Returns a float32 matrix with one row per text
+        """
+        if len(texts) == 0:
+            return np.zeros((0, 0), dtype=np.float32)
+        return await asyncio.to_thread(self.__embed_using_cache, texts)
+
+    def __embed_using_cache(self, texts: list[str]) -> np.ndarray:
+        cached_vectors = (
+            self.cache.get_vectors(texts)
+            if self.cache is not None
+            else [None] * len(texts)
+        )
+        vector_of_text: dict[str, np.ndarray] = {
+            text: vector
+            for text, vector in zip(texts, cached_vectors)
+            if vector is not None
+        }
+        texts_to_embed = list(
+            dict.fromkeys(text for text in texts if text not in vector_of_text)
+        )
+
+        if len(texts_to_embed) > 0:
+            new_vectors = self.__embed_in_batches(texts_to_embed)
+            if self.cache is not None:
+                self.cache.add_vectors(texts_to_embed, new_vectors)
+            vector_of_text.update(zip(texts_to_embed, new_vectors))
+            logger.debug(
+                f"Embedded {len(texts_to_embed)} new texts with {self.model_name} ({len(texts) - len(texts_to_embed)} were cached)"
+            )
+
+        return np.stack([vector_of_text[text] for text in texts])
+
+    def __embed_in_batches(self, texts: list[str]) -> np.ndarray:
+        embeddings: list[list[float]] = []
+        for start in range(0, len(texts), self.BATCH_SIZE):
+            batch = texts[start : start + self.BATCH_SIZE]
+            embeddings.extend(self._embed_batch(batch))
+        return np.asarray(embeddings, dtype=np.float32)
+
+    @abstractmethod
+    def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        """
+        Blocking call that embeds one batch
+        """
+
+
+class HuggingFaceApiEmbeddingProvider(BatchedEmbeddingProvider):
+
+    def __init__(
+        self,
+        model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+        cache_directory: (
+            str | None
+        ) = BatchedEmbeddingProvider.DEFAULT_CACHE_DIRECTORY,
+    ) -> None:
+        super().__init__(model_name, cache_directory)
+
+    def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        api_url = f"https://api-inference.huggingface.co/pipeline/feature-extraction/{self.model_name}"
+        api_key = os.getenv("HUGGINGFACE_API_KEY")
+        assert api_key is not None, "HUGGINGFACE_API_KEY is not set"
+        response = HttpSessionPool.get_sync_session().post(
+            api_url,
+            headers={"Authorization": f"Bearer {api_key}"},
+            json={"inputs": texts, "options": {"wait_for_model": True}},
+        )
+        raise_for_status_with_additional_info(response)
+        return response.json()
+
+
+class OpenAiEmbeddingProvider(BatchedEmbeddingProvider):
+
+    def __init__(
+        self,
+        model_name: str = "text-embedding-3-small",
+        cache_directory: (
+            str | None
+        ) = BatchedEmbeddingProvider.DEFAULT_CACHE_DIRECTORY,
+    ) -> None:
+        super().__init__(model_name, cache_directory)
+        self.__client: OpenAI | None = None
+        self.__client_lock = threading.Lock()
+
+    def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        # TODO: Track costs from this in llm cost tracker
+        response = self.__get_client().embeddings.create(
+            model=self.model_name, input=texts
+        )
+        return [embedding.embedding for embedding in response.data]
+
+    def __get_client(self) -> OpenAI:
+        with self.__client_lock:
+            if self.__client is None:
+                api_key = os.getenv("OPENAI_API_KEY")
+                assert api_key is not None, "OPENAI_API_KEY is not set"
+                self.__client = OpenAI(api_key=api_key)
+            return self.__client
+
+
+class SentenceTransformerEmbeddingProvider(BatchedEmbeddingProvider):
+    """
+    Runs the model locally on the CPU, so no network is needed once the model
+    has been downloaded. Requires `pip install sentence-transformers`.
+    """
+
+    _loaded_models: dict[str, Any] = {}
+    _model_loading_lock = threading.Lock()
+
+    def __init__(
+        self,
+        model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+        cache_directory: (
+            str | None
+        ) = BatchedEmbeddingProvider.DEFAULT_CACHE_DIRECTORY,
+    ) -> None:
+        super().__init__(model_name, cache_directory)
+
+    def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        model = self.__get_model()
+        embeddings = model.encode(texts, convert_to_numpy=True)
+        return embeddings.tolist()
+
+    def __get_model(self) -> Any:
+        with self._model_loading_lock:
+            if self.model_name not in self._loaded_models:
+                try:
+                    from sentence_transformers import SentenceTransformer
+                except ImportError as e:
+                    raise ImportError(
+                        "sentence-transformers is needed for local embeddings. Install it with `pip install sentence-transformers`"
+                    ) from e
+                self._loaded_models[self.model_name] = SentenceTransformer(
+                    self.model_name, device="cpu"
+                )
+            return self._loaded_models[self.model_name]
+
+
+class FallbackEmbeddingProvider(EmbeddingProvider):
+    """
+    Tries each provider in order. All texts of a call are embedded by the
+    same provider, since vectors from different models can't be compared.
+    """
+
+    def __init__(self, providers: list[EmbeddingProvider]) -> None:
+        assert len(providers) > 0, "At least one provider is needed"
+        super().__init__(
+            " or ".join(provider.model_name for provider in providers)
+        )
+        self.providers = providers
+
+    async def embed(self, texts: list[str]) -> np.ndarray:
+        for provider in self.providers[:-1]:
+            try:
+                return await provider.embed(texts)
+            except Exception as e:
+                logger.warning(
+                    f"Could not get embeddings using {provider.model_name}. Trying the next provider. Error: {e}"
+                )
+        return await self.providers[-1].embed(texts)
@@ -1,12 +1,15 @@
 from __future__ import annotations
 
+import json
 import logging
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 
-import aiohttp
 from pydantic import BaseModel, Field
 
+from forecasting_tools.ai_models.basic_model_interfaces.ai_model import (
+    AiModel,
+)
 from forecasting_tools.ai_models.basic_model_interfaces.incurs_cost import (
     IncursCost,
 )
@@ -19,10 +22,18 @@ from forecasting_tools.ai_models.basic_model_interfaces.retryable_model import (
 from forecasting_tools.ai_models.basic_model_interfaces.time_limited_model import (
     TimeLimitedModel,
 )
+from forecasting_tools.ai_models.resource_managers.in_flight_call_coalescer import (
+    InFlightCallCoalescer,
+)
 from forecasting_tools.ai_models.resource_managers.monetary_cost_manager import (
     MonetaryCostManager,
 )
+from forecasting_tools.ai_models.resource_managers.provider_rate_limits import (
+    ProviderRateLimits,
+)
+from forecasting_tools.util.http_session_pool import HttpSessionPool
 from forecasting_tools.util.jsonable import Jsonable
+from forecasting_tools.util.lru_cache_with_ttl import LruCacheWithTtl
 
 logger = logging.getLogger(__name__)
 
@@ -96,6 +107,11 @@ class ExaSearcher(
     COST_PER_REQUEST = 0.005
     COST_PER_HIGHLIGHT = 0.001
     COST_PER_TEXT = 0.001
+    CACHE_TTL_IN_SECONDS = 60 * 60
+    HISTORICAL_SEARCH_CACHE_TTL_IN_SECONDS = 60 * 60 * 24
+    _search_cache: LruCacheWithTtl[str, list[ExaSource]] = LruCacheWithTtl(
+        max_entries=2000, ttl_seconds=CACHE_TTL_IN_SECONDS
+    )
 
     def __init__(
         self,
@@ -103,14 +119,20 @@ class ExaSearcher(
         include_text: bool = False,
         include_highlights: bool = True,
         num_results: int = 5,
+        cache_results: bool = False,
         **kwargs,
     ) -> None:
+        """
+        cache_results: Reuse the results of identical searches (same payload)
+        made by any ExaSearcher in this process. A cached result costs nothing.
+        """
         super().__init__(*args, **kwargs)
         self.include_text = include_text
         self.include_highlights = include_highlights
         self.num_highlights_per_url = 10
         self.num_sentences_per_highlight = 4
         self.num_results = num_results
+        self.cache_results = cache_results
 
     async def invoke_for_highlights_in_relevance_order(
         self,
@@ -150,11 +172,63 @@ class ExaSearcher(
         if end_published_date is not None:
             search_strategy.end_published_date = end_published_date
 
-        return await self.__retryable_timed_cost_request_limited_invoke(search_strategy)
+        if not self.cache_results:
+            return await self.__retryable_timed_cost_request_limited_invoke(
+                search_strategy
+            )
+
+        cache_key = json.dumps(
+            self._prepare_request_payload(search_strategy), sort_keys=True
+        )
+        cached_sources = self._search_cache.get(cache_key)
+        if cached_sources is not None:
+            logger.debug(
+                f"Using cached Exa results for query: {search_strategy.web_search_query}"
+            )
+            return self.__copy_sources(cached_sources)
+
+        sources = await self.__retryable_timed_cost_request_limited_invoke(
+            search_strategy
+        )
+        self._search_cache.set(
+            cache_key,
+            self.__copy_sources(sources),
+            ttl_seconds=self.__get_cache_ttl(search_strategy),
+        )
+        return sources
+
+    @staticmethod
+    def __copy_sources(sources: list[ExaSource]) -> list[ExaSource]:
+        """
+        Callers may edit the sources they get (e.g. their highlights), so the
+        cache never shares its sources with them
+        """
+        return [source.model_copy(deep=True) for source in sources]
+
+    def __get_cache_ttl(self, search: SearchInput) -> float:
+        """
+        Searches that end well in the past (e.g. in benchmarks) won't gain new
+        results, so they can be kept longer
+        """
+        search_is_historical = (
+            search.end_published_date is not None
+            and search.end_published_date
+            < datetime.now(search.end_published_date.tzinfo)
+            - timedelta(days=2)
+        )
+        if search_is_historical:
+            return self.HISTORICAL_SEARCH_CACHE_TTL_IN_SECONDS
+        return self.CACHE_TTL_IN_SECONDS
+
+    def _get_coalescing_key(self, search: SearchInput) -> str:
+        return InFlightCallCoalescer.make_key(
+            self.__class__.__name__, self._prepare_request_payload(search)
+        )
 
+    @AiModel._coalesce_identical_in_flight_calls
+    @IncursCost._wrap_in_cost_limiting_and_tracking
     @RetryableModel._retry_according_to_model_allowed_tries
     @RequestLimitedModel._wait_till_request_capacity_available
-    @IncursCost._wrap_in_cost_limiting_and_tracking
     @TimeLimitedModel._wrap_in_model_defined_timeout
     async def __retryable_timed_cost_request_limited_invoke(
         self, search_query_or_strategy: SearchInput
@@ -184,7 +258,10 @@ class ExaSearcher(
             "content-type": "application/json",
             "x-api-key": api_key,
         }
+        payload = self._prepare_request_payload(search)
+        return url, headers, payload
 
+    def _prepare_request_payload(self, search: SearchInput) -> dict:
         payload = {
             "query": search.web_search_query,
             "type": "auto",
@@ -216,7 +293,7 @@ class ExaSearcher(
         # if search.include_text:
             # payload["includeText"] = [search.include_text]
 
-        return url, headers, payload
+        return payload
 
     @classmethod
     def __get_default_search_strategy(cls, search_query: str) -> SearchInput:
@@ -239,13 +316,16 @@ class ExaSearcher(
     async def _make_api_request(
         self, url: str, headers: dict, payload: dict
     ) -> dict:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                url, json=payload, headers=headers
-            ) as response:
-                response.raise_for_status()
-                result: dict = await response.json()
-                return result
+        session = await HttpSessionPool.get_async_session()
+        async with session.post(
+            url, json=payload, headers=headers
+        ) as response:
+            self._adapt_request_limiter_to_provider_limits(
+                ProviderRateLimits.from_headers(response.headers)
+            )
+            response.raise_for_status()
+            result: dict = await response.json()
+            return result
 
     def _process_response(
         self, response_data: dict, search_query: SearchInput
@@ -289,10 +369,20 @@ class ExaSearcher(
     ##################################### Cost Calculation #####################################
 
     def _calculate_cost_for_request(self, results: list[ExaSource]) -> float:
+        return self.__calculate_cost_for_number_of_results(len(results))
+
+    def _estimate_cost_of_call(
+        self, search_query_or_strategy: SearchInput
+    ) -> float:
+        return self.__calculate_cost_for_number_of_results(self.num_results)
+
+    def __calculate_cost_for_number_of_results(
+        self, number_of_results: int
+    ) -> float:
         cost = self.COST_PER_REQUEST
-        cost += self.COST_PER_TEXT * len(results) if self.include_text else 0
+        cost += self.COST_PER_TEXT * number_of_results if self.include_text else 0
         cost += (
-            self.COST_PER_HIGHLIGHT * len(results)
+            self.COST_PER_HIGHLIGHT * number_of_results
             if self.include_highlights
             else 0
         )
@@ -1,7 +1,10 @@
+import asyncio
 import logging
 import os
+import weakref
 from abc import ABC
 
+import anthropic
 from langchain_anthropic import ChatAnthropic
 from langchain_community.callbacks.bedrock_anthropic_callback import (
     MODEL_COST_PER_1K_INPUT_TOKENS,
@@ -10,6 +13,7 @@ from langchain_community.callbacks.bedrock_anthropic_callback import (
 from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
 from pydantic import SecretStr
 
+from forecasting_tools.ai_models.ai_utils.local_tokenizer import LocalTokenizer
 from forecasting_tools.ai_models.ai_utils.response_types import (
     TextTokenCostResponse,
 )
@@ -28,6 +32,11 @@ class AnthropicTextToTextModel(TraditionalOnlineLlm, ABC):
         else "fake-api-key-so-tests-dont-fail-to-initialize"
     )
 
+    _anthropic_clients: weakref.WeakKeyDictionary[
+        asyncio.AbstractEventLoop,
+        dict[tuple[str, float, float | None], ChatAnthropic],
+    ] = weakref.WeakKeyDictionary()
+
     async def invoke(self, prompt: str) -> str:
         response: TextTokenCostResponse = (
             await self._invoke_with_request_cost_time_and_token_limits_and_retry(
@@ -48,16 +57,21 @@ class AnthropicTextToTextModel(TraditionalOnlineLlm, ABC):
     async def _call_online_model_using_api(
         self, prompt: str
     ) -> TextTokenCostResponse:
-        anthropic_llm = ChatAnthropic(
-            model_name=self.MODEL_NAME,
-            temperature=self.temperature,
-            timeout=None,
-            stop=None,
-            base_url=None,
-            api_key=self.ANTHROPIC_API_KEY,
+        """
+        LangChain doesn't expose the headers of successful responses, so the
+        rate limiters only adapt to the limits Anthropic reports when a
+        request fails (e.g. with a 429), unlike the OpenAI models which adapt
+        on every response
+        """
+        anthropic_llm = self._get_anthropic_client(
+            self.MODEL_NAME, self.temperature, timeout=None
         )
         messages = self._turn_model_input_into_messages(prompt)
-        answer_message = await anthropic_llm.ainvoke(messages)
+        try:
+            answer_message = await anthropic_llm.ainvoke(messages)
+        except anthropic.APIStatusError as e:
+            self._adapt_rate_limiters_to_response_headers(e.response.headers)
+            raise
         answer = answer_message.content
 
         response_metadata = answer_message.response_metadata
@@ -82,6 +96,32 @@ class AnthropicTextToTextModel(TraditionalOnlineLlm, ABC):
             cost=cost,
         )
 
+    @classmethod
+    def _get_anthropic_client(
+        cls, model_name: str, temperature: float, timeout: float | None
+    ) -> ChatAnthropic:
+        """
+        Making a client per request throws away its open connections, so
+        clients are kept and reused. A client's connections can only be used
+        on the event loop they were opened on, so each loop gets its own.
+        """
+        clients_of_loop = cls._anthropic_clients.setdefault(
+            asyncio.get_running_loop(), {}
+        )
+        client_key = (model_name, temperature, timeout)
+        client = clients_of_loop.get(client_key)
+        if client is None:
+            client = ChatAnthropic(
+                model_name=model_name,
+                temperature=temperature,
+                timeout=timeout,
+                stop=None,
+                base_url=None,
+                api_key=cls.ANTHROPIC_API_KEY,
+            )
+            clients_of_loop[client_key] = client
+        return client
+
     def _turn_model_input_into_messages(
         self, prompt: str
     ) -> list[BaseMessage]:
@@ -100,22 +140,9 @@ class AnthropicTextToTextModel(TraditionalOnlineLlm, ABC):
         probable_output = "Hello! How can I assist you today? Feel free to ask any questions or let me know if you need help with anything."
 
         model = cls()
-        prompt_tokens = (
-            model.input_to_tokens(cheap_input)
-            if not cls.API_KEY_MISSING
-            else 13
-        )
-        anthropic_llm = ChatAnthropic(
-            model_name=model.MODEL_NAME,
-            timeout=None,
-            stop=None,
-            base_url=None,
-            api_key=cls.ANTHROPIC_API_KEY,
-        )
-        completion_tokens = (
-            anthropic_llm.get_num_tokens(probable_output)
-            if not cls.API_KEY_MISSING
-            else 26
+        prompt_tokens = model.input_to_tokens(cheap_input)
+        completion_tokens = model._local_tokenizer.text_to_tokens(
+            probable_output
         )
         total_cost = model.calculate_cost_from_tokens(
             prompt_tkns=prompt_tokens, completion_tkns=completion_tokens
@@ -136,17 +163,33 @@ class AnthropicTextToTextModel(TraditionalOnlineLlm, ABC):
 
     ############################# Cost and Token Tracking Methods #############################
 
+    @property
+    def _local_tokenizer(self) -> LocalTokenizer:
+        """
+        Anthropic only counts tokens through an API call, so admission
+        uses a local estimate that is calibrated from usage instead
+        """
+        return LocalTokenizer.get_for_model_family(
+            "claude", initial_tokens_per_piece=1.1, tokens_per_message=4
+        )
+
     def input_to_tokens(self, prompt: str) -> int:
-        llm = ChatAnthropic(
-            model_name=self.MODEL_NAME,
-            timeout=None,
-            stop=None,
-            base_url=None,
-            api_key=self.ANTHROPIC_API_KEY,
+        return self._local_tokenizer.messages_to_tokens(
+            self.__get_message_texts(prompt)
         )
-        messages = self._turn_model_input_into_messages(prompt)
-        tokens = llm.get_num_tokens_from_messages(messages)
-        return tokens
+
+    def _calibrate_input_to_tokens(
+        self, prompt_tokens_used: int, prompt: str
+    ) -> None:
+        self._local_tokenizer.record_usage(
+            self.__get_message_texts(prompt), prompt_tokens_used
+        )
+
+    def __get_message_texts(self, prompt: str) -> list[str]:
+        return [
+            str(message.content)
+            for message in self._turn_model_input_into_messages(prompt)
+        ]
 
     def calculate_cost_from_tokens(
         self, prompt_tkns: int, completion_tkns: int
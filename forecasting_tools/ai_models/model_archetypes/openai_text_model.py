@@ -6,7 +6,7 @@ from langchain_community.callbacks.openai_info import (
     TokenType,
     get_openai_token_cost_for_model,
 )
-from openai import AsyncOpenAI
+from openai import APIStatusError, AsyncOpenAI
 from openai._types import NOT_GIVEN, NotGiven
 from openai.types.chat import ChatCompletionMessageParam
 
@@ -69,12 +69,20 @@ class OpenAiTextToTextModel(TraditionalOnlineLlm, ABC):
     ) -> TextTokenCostResponse:
         client = self._OPENAI_ASYNC_CLIENT
 
-        response = await client.chat.completions.create(
-            model=self.MODEL_NAME,
-            messages=messages,
-            temperature=temperature,
-            max_tokens=max_tokens,
-        )
+        try:
+            raw_response = (
+                await client.chat.completions.with_raw_response.create(
+                    model=self.MODEL_NAME,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                )
+            )
+        except APIStatusError as e:
+            self._adapt_rate_limiters_to_response_headers(e.response.headers)
+            raise
+        self._adapt_rate_limiters_to_response_headers(raw_response.headers)
+        response = raw_response.parse()
         if response.choices[0].message.content is None:
             raise RuntimeError(
                 "The model failed to give an answer. response.choices[0].message.content is None"
@@ -140,6 +148,10 @@ class OpenAiTextToTextModel(TraditionalOnlineLlm, ABC):
         tokens = OpenAiUtils.messages_to_tokens(messages, self.MODEL_NAME)
         return tokens
 
+    def estimate_max_input_tokens(self, prompt: str) -> int | None:
+        messages = self._turn_model_input_into_messages(prompt)
+        return OpenAiUtils.estimate_max_tokens_of_messages(messages)
+
     def calculate_cost_from_tokens(
         self, prompt_tkns: int, completion_tkns: int
     ) -> float:
@@ -4,11 +4,10 @@ import logging
 import os
 from abc import ABC
 
-from langchain_community.chat_models.perplexity import ChatPerplexity
-from langchain_core.messages.utils import convert_to_messages
 from openai import AsyncOpenAI
 from openai.types.chat import ChatCompletionMessageParam
 
+from forecasting_tools.ai_models.ai_utils.local_tokenizer import LocalTokenizer
 from forecasting_tools.ai_models.ai_utils.response_types import (
     TextTokenCostResponse,
 )
@@ -34,6 +33,9 @@ class PerplexityTextModel(OpenAiTextToTextModel, PricedPerRequest, ABC):
         base_url="https://api.perplexity.ai",
         max_retries=0,  # Retry is implemented locally
     )
+    _SHARE_CALLS_AT_ANY_TEMPERATURE = (
+        True  # Answers come from the same search results at any temperature
+    )
 
     def __init_subclass__(cls: type[PerplexityTextModel], **kwargs) -> None:
         super().__init_subclass__(**kwargs)
@@ -47,26 +49,31 @@ class PerplexityTextModel(OpenAiTextToTextModel, PricedPerRequest, ABC):
                     "You forgot to define PRICE_PER_REQUEST"
                 )
 
+    @property
+    def _local_tokenizer(self) -> LocalTokenizer:
+        """
+        Perplexity's tokenizer isn't available offline, so admission uses a
+        local estimate that is calibrated from usage instead
+        """
+        return LocalTokenizer.get_for_model_family("perplexity")
+
     def input_to_tokens(self, prompt: str) -> int:
+        return self._local_tokenizer.messages_to_tokens(
+            self.__get_message_texts(prompt)
+        )
+
+    def _calibrate_input_to_tokens(
+        self, prompt_tokens_used: int, prompt: str
+    ) -> None:
+        self._local_tokenizer.record_usage(
+            self.__get_message_texts(prompt), prompt_tokens_used
+        )
+
+    def __get_message_texts(self, prompt: str) -> list[str]:
         messages: list[ChatCompletionMessageParam] = (
             self._turn_model_input_into_messages(prompt)
         )
-        chat = ChatPerplexity(
-            client=self._OPENAI_ASYNC_CLIENT,
-            api_key=self.PERPLEXITY_API_KEY,
-            timeout=self.TIMEOUT_TIME,
-        )
-        langchain_messages = convert_to_messages(messages)  # type: ignore
-        tokens = chat.get_num_tokens_from_messages(langchain_messages)
-        adjustment = -2 * len(
-            messages
-        )  # Experimentally the actual tokens always seem to be 2 less more than the tokens calculated (it used to be 47 more)
-        adjusted_tokens = tokens + adjustment
-        if adjusted_tokens < 0:
-            raise ValueError(
-                f"adjusted_tokens is less than 0. tokens: {tokens}, adjustment: {adjustment}"
-            )
-        return adjusted_tokens
+        return [str(message["content"]) for message in messages]
 
     def calculate_cost_from_tokens(
         self, prompt_tkns: int, completion_tkns: int
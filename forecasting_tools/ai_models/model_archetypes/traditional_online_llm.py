@@ -1,7 +1,16 @@
+from __future__ import annotations
+
+import asyncio
+import functools
 import logging
 from abc import ABC
-from typing import Any
+from collections.abc import Mapping
+from typing import Any, Callable, Coroutine
 
+from forecasting_tools.ai_models.ai_utils.response_types import (
+    TextTokenCostResponse,
+)
+from forecasting_tools.ai_models.basic_model_interfaces.ai_model import AiModel
 from forecasting_tools.ai_models.basic_model_interfaces.named_model import (
     NamedModel,
 )
@@ -23,6 +32,15 @@ from forecasting_tools.ai_models.basic_model_interfaces.token_limited_model impo
 from forecasting_tools.ai_models.basic_model_interfaces.tokens_incur_cost import (
     TokensIncurCost,
 )
+from forecasting_tools.ai_models.resource_managers.in_flight_call_coalescer import (
+    InFlightCallCoalescer,
+)
+from forecasting_tools.ai_models.resource_managers.llm_response_cache import (
+    LlmResponseCache,
+)
+from forecasting_tools.ai_models.resource_managers.provider_rate_limits import (
+    ProviderRateLimits,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +55,7 @@ class TraditionalOnlineLlm(
     NamedModel,
     ABC,
 ):
+    _SHARE_CALLS_AT_ANY_TEMPERATURE: bool = False
 
     def __init__(
         self,
@@ -58,10 +77,74 @@ class TraditionalOnlineLlm(
         )
         return result
 
+    @staticmethod
+    def _use_cached_response_if_cache_active(
+        func: Callable[..., Coroutine[Any, Any, Any]]
+    ) -> Callable[..., Coroutine[Any, Any, Any]]:
+        """
+        Put this outside the rate limiting and cost tracking decorators so a
+        cached response is returned instantly and isn't charged a second time
+        """
+
+        @functools.wraps(func)
+        async def wrapper(self: TraditionalOnlineLlm, *args, **kwargs) -> Any:
+            cache = LlmResponseCache.get_active_cache()
+            if cache is None:
+                return await func(self, *args, **kwargs)
+
+            key = cache.make_key(
+                self.__class__.__name__,
+                self.MODEL_NAME,
+                self.temperature,
+                self.system_prompt,
+                args,
+                kwargs,
+            )
+            cached_response = await asyncio.to_thread(cache.get, key)
+            if cached_response is not None:
+                logger.debug(f"Using cached response for {self.MODEL_NAME}")
+                response = TextTokenCostResponse.model_validate_json(
+                    cached_response
+                )
+                return response.model_copy(update={"cost": 0})
+
+            response = await func(self, *args, **kwargs)
+            if isinstance(response, TextTokenCostResponse):
+                await asyncio.to_thread(
+                    cache.set, key, response.model_dump_json()
+                )
+            return response
+
+        return wrapper
+
+    def _get_coalescing_key(self, *args, **kwargs) -> str | None:
+        """
+        Calls with a temperature above 0 are often repeated on purpose to get
+        different samples, so they are only shared for models whose answers
+        barely depend on it (see _SHARE_CALLS_AT_ANY_TEMPERATURE) or when the
+        caller opts in with InFlightCallCoalescer.share_sampled_calls
+        """
+        if (
+            self.temperature != 0
+            and not self._SHARE_CALLS_AT_ANY_TEMPERATURE
+            and not InFlightCallCoalescer.sampled_calls_are_shared()
+        ):
+            return None
+        return InFlightCallCoalescer.make_key(
+            self.__class__.__name__,
+            self.MODEL_NAME,
+            self.temperature,
+            self.system_prompt,
+            args,
+            kwargs,
+        )
+
+    @_use_cached_response_if_cache_active
+    @AiModel._coalesce_identical_in_flight_calls
     @RequestLimitedModel._wait_till_request_capacity_available
     @TokenLimitedModel._wait_till_token_capacity_available
-    @RetryableModel._retry_according_to_model_allowed_tries
     @TokensIncurCost._wrap_in_cost_limiting_and_tracking
+    @RetryableModel._retry_according_to_model_allowed_tries
     @TimeLimitedModel._wrap_in_model_defined_timeout
     async def _invoke_with_request_cost_time_and_token_limits_and_retry(
         self, *args, **kwargs
@@ -82,3 +165,11 @@ class TraditionalOnlineLlm(
     def _initialize_rate_limiters(cls) -> None:
         cls._reinitialize_request_rate_limiter()
         cls._reinitialize_token_limiter()
+
+    @classmethod
+    def _adapt_rate_limiters_to_response_headers(
+        cls, headers: Mapping[str, str]
+    ) -> None:
+        limits = ProviderRateLimits.from_headers(headers)
+        cls._adapt_request_limiter_to_provider_limits(limits)
+        cls._adapt_token_limiter_to_provider_limits(limits)
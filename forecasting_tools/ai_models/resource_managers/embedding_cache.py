@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+
+from forecasting_tools.util import file_manipulation
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """
+    A persistent text -> vector cache for one embedding model.
+    Vectors are appended to a float32 file that is read through a memory map,
+    and an index file maps the hash of each text to its row in that file.
+    """
+
+    VECTORS_FILE_NAME = "vectors.f32"
+    INDEX_FILE_NAME = "index.json"
+
+    def __init__(self, cache_directory: str) -> None:
+        self.cache_directory = os.path.abspath(cache_directory)
+        self.__vectors_path = os.path.join(
+            self.cache_directory, self.VECTORS_FILE_NAME
+        )
+        self.__index_path = os.path.join(
+            self.cache_directory, self.INDEX_FILE_NAME
+        )
+        self.__lock = threading.Lock()
+        self.__row_of_text_hash: dict[str, int] | None = None
+        self.__embedding_size: int | None = None
+        self.__vectors: np.memmap | None = None
+
+    def get_vectors(self, texts: list[str]) -> list[np.ndarray | None]:
+        with self.__lock:
+            row_of_text_hash = self.__load_index()
+            rows = [row_of_text_hash.get(self.__hash(text)) for text in texts]
+            if all(row is None for row in rows):
+                return [None] * len(texts)
+            vectors = self.__load_vectors()
+            return [
+                np.array(vectors[row]) if row is not None else None
+                for row in rows
+            ]
+
+    def add_vectors(self, texts: list[str], vectors: np.ndarray) -> None:
+        assert len(texts) == len(vectors)
+        if len(texts) == 0:
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self.__lock:
+            row_of_text_hash = self.__load_index()
+            if self.__embedding_size is None:
+                self.__embedding_size = vectors.shape[1]
+            if vectors.shape[1] != self.__embedding_size:
+                raise ValueError(
+                    f"Embeddings of size {vectors.shape[1]} can't be added to a cache of size {self.__embedding_size}"
+                )
+
+            next_row = self.__count_rows_in_vectors_file()
+            file_manipulation.create_or_append_to_binary_file(
+                self.__vectors_path,
+                vectors.tobytes(),
+                truncate_to_size=next_row * vectors[0].nbytes,
+            )
+            if self.__count_rows_in_vectors_file() < next_row + len(texts):
+                logger.warning("Embeddings could not be written to the cache")
+                return
+            for offset, text in enumerate(texts):
+                row_of_text_hash[self.__hash(text)] = next_row + offset
+            self.__write_index()
+            self.__vectors = None
+
+    def __load_index(self) -> dict[str, int]:
+        if self.__row_of_text_hash is not None:
+            return self.__row_of_text_hash
+        self.__row_of_text_hash = {}
+        if not os.path.exists(self.__index_path):
+            return self.__row_of_text_hash
+
+        index: dict = file_manipulation.load_json_file(self.__index_path)  # type: ignore
+        self.__embedding_size = index["embedding_size"]
+        rows_in_vectors_file = self.__count_rows_in_vectors_file()
+        self.__row_of_text_hash = {
+            text_hash: row
+            for text_hash, row in index["rows"].items()
+            if row < rows_in_vectors_file
+        }
+        return self.__row_of_text_hash
+
+    def __write_index(self) -> None:
+        """
+        Written to a temporary file first so a crash can't leave a half written index
+        """
+        temporary_path = f"{self.__index_path}.tmp"
+        file_manipulation.create_or_overwrite_file(
+            temporary_path,
+            json.dumps(
+                {
+                    "embedding_size": self.__embedding_size,
+                    "rows": self.__row_of_text_hash,
+                }
+            ),
+        )
+        os.replace(temporary_path, self.__index_path)
+
+    def __load_vectors(self) -> np.memmap:
+        if self.__vectors is None:
+            assert self.__embedding_size is not None
+            self.__vectors = np.memmap(
+                self.__vectors_path,
+                dtype=np.float32,
+                mode="r",
+                shape=(
+                    self.__count_rows_in_vectors_file(),
+                    self.__embedding_size,
+                ),
+            )
+        return self.__vectors
+
+    def __count_rows_in_vectors_file(self) -> int:
+        """
+        Can be more than the rows in the index if a write was interrupted
+        """
+        if not os.path.exists(self.__vectors_path):
+            return 0
+        assert self.__embedding_size is not None
+        bytes_per_row = np.dtype(np.float32).itemsize * self.__embedding_size
+        return os.path.getsize(self.__vectors_path) // bytes_per_row
+
+    @staticmethod
+    def __hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
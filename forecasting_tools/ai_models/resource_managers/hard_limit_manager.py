@@ -23,6 +23,7 @@ class HardLimitManager:
         assert hard_limit >= 0
         self.hard_limit: Final[float] = hard_limit
         self._current_usage: float = 0
+        self._reserved_usage: float = 0
         self.__log_usage_when_called: bool = log_usage_when_called
         HardLimitManager._id_counter += 1
         self.id = HardLimitManager._id_counter
@@ -31,9 +32,13 @@ class HardLimitManager:
     def current_usage(self) -> float:
         return self._current_usage
 
+    @property
+    def reserved_usage(self) -> float:
+        return self._reserved_usage
+
     @property
     def amount_left(self) -> float:
-        return self.hard_limit - self._current_usage
+        return self.hard_limit - self._current_usage - self._reserved_usage
 
     @classmethod
     def get_active_cost_managers(cls) -> list[HardLimitManager]:
@@ -51,6 +56,13 @@ class HardLimitManager:
         cost_managers.remove(self)
         self._active_limit_managers.set(cost_managers)
 
+    @classmethod
+    def an_active_manager_has_a_limit(cls) -> bool:
+        return any(
+            cost_manager.hard_limit != 0
+            for cost_manager in cls._active_limit_managers.get()
+        )
+
     @classmethod
     def raise_error_if_limit_would_be_reached(
         cls, amount_to_check_room_for: float = 0
@@ -69,6 +81,31 @@ class HardLimitManager:
                     f"Usage amount {amount_to_check_room_for} would push current usage to {cost_manager.current_usage + amount_to_check_room_for} exceeding the hard limit of {cost_manager.hard_limit}"
                 )
 
+    @classmethod
+    def reserve_usage_in_parent_managers(
+        cls, amount: float
+    ) -> list[HardLimitManager]:
+        """
+        Holds back an estimate of usage for work that has started but not finished,
+        so that many concurrent tasks can't collectively overshoot the limit.
+        Returns the managers the reservation was made in so it can be released
+        (with release_reserved_usage) once the real usage has been recorded.
+        """
+        cls.raise_error_if_limit_would_be_reached(amount)
+        reserving_managers = cls._active_limit_managers.get().copy()
+        for cost_manager in reserving_managers:
+            cost_manager._reserved_usage += amount
+        return reserving_managers
+
+    @staticmethod
+    def release_reserved_usage(
+        reserving_managers: list[HardLimitManager], amount: float
+    ) -> None:
+        for cost_manager in reserving_managers:
+            cost_manager._reserved_usage = max(
+                cost_manager._reserved_usage - amount, 0
+            )
+
     @classmethod
     def increase_current_usage_in_parent_managers(cls, amount: float) -> None:
         if amount < 0:
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Coroutine, Generic, Iterator, TypeVar
+
+from pydantic import BaseModel
+
+from forecasting_tools.ai_models.resource_managers.monetary_cost_manager import (
+    MonetaryCostManager,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class _InFlightCall(Generic[T]):
+    def __init__(
+        self,
+        task: asyncio.Future[tuple[T, float]],
+        reserving_managers: list[MonetaryCostManager],
+        estimated_cost: float,
+    ) -> None:
+        self.task = task
+        self.reserving_managers = reserving_managers
+        self.estimated_cost = estimated_cost
+        self.number_of_waiters = 0
+        self.number_of_waiters_when_done: int | None = None
+
+
+class InFlightCallCoalescer:
+    """
+    Single-flight for model and search calls: while a call is running,
+    identical calls (same key) wait on it instead of making their own request.
+    A cache can't do this since none of the identical calls has finished yet.
+
+    The shared call runs outside the callers' cost managers and its cost is
+    split evenly between everyone who waited on it, each share being charged
+    to that caller's own MonetaryCostManagers. While it runs, its estimated
+    cost is reserved in the managers of the caller that started it, so many
+    concurrent calls can't collectively overshoot a limit. Joining a call
+    doesn't start a new request, so joiners only check their limits.
+
+    Only calls that are expected to give the same answer should be coalesced
+    by default (e.g. not LLM calls with a temperature above 0, since those are
+    usually repeated on purpose to get different samples). Callers that don't
+    need separate samples can opt in with share_sampled_calls:
+
+    with InFlightCallCoalescer.share_sampled_calls():
+        research = await Gpt4o(temperature=0.7).invoke(prompt)
+    """
+
+    _in_flight_calls: weakref.WeakKeyDictionary[
+        asyncio.AbstractEventLoop, dict[str, _InFlightCall]
+    ] = weakref.WeakKeyDictionary()
+    _sampled_calls_are_shared: ContextVar[bool] = ContextVar(
+        "_sampled_calls_are_shared", default=False
+    )
+
+    @classmethod
+    @contextmanager
+    def share_sampled_calls(cls) -> Iterator[None]:
+        """
+        Identical calls made inside this block are shared even if they would
+        give a different answer each time (e.g. a temperature above 0)
+        """
+        token = cls._sampled_calls_are_shared.set(True)
+        try:
+            yield
+        finally:
+            cls._sampled_calls_are_shared.reset(token)
+
+    @classmethod
+    def sampled_calls_are_shared(cls) -> bool:
+        return cls._sampled_calls_are_shared.get()
+
+    @classmethod
+    def make_key(cls, *parts_of_request: Any) -> str:
+        """
+        Every part must be json serializable (pydantic models are dumped first)
+        """
+        serialized_request = json.dumps(
+            parts_of_request, sort_keys=True, default=cls.__serialize_part
+        )
+        return hashlib.sha256(serialized_request.encode("utf-8")).hexdigest()
+
+    @classmethod
+    async def run(
+        cls,
+        key: str,
+        make_call: Callable[[], Coroutine[Any, Any, T]],
+        estimated_cost: float = 0,
+    ) -> T:
+        """
+        make_call is only called if no identical call is in flight. A call
+        that already finished (but isn't forgotten yet) is never joined.
+        estimated_cost is reserved in the caller's cost managers until the
+        call finishes if this caller is the one that starts it.
+        """
+        MonetaryCostManager.raise_error_if_limit_would_be_reached()
+        calls_of_loop = cls._in_flight_calls.setdefault(
+            asyncio.get_running_loop(), {}
+        )
+        in_flight_call = calls_of_loop.get(key)
+        if in_flight_call is None or in_flight_call.task.done():
+            reserving_managers = (
+                MonetaryCostManager.reserve_usage_in_parent_managers(
+                    estimated_cost
+                )
+            )
+            in_flight_call = _InFlightCall(
+                asyncio.ensure_future(
+                    cls.__run_call_and_capture_cost(make_call)
+                ),
+                reserving_managers,
+                estimated_cost,
+            )
+            calls_of_loop[key] = in_flight_call
+            in_flight_call.task.add_done_callback(
+                lambda _: cls.__finish_call(calls_of_loop, key, in_flight_call)
+            )
+        else:
+            logger.debug("Joining an identical call that is already running")
+
+        in_flight_call.number_of_waiters += 1
+        try:
+            result, cost = await asyncio.shield(in_flight_call.task)
+        except asyncio.CancelledError:
+            in_flight_call.number_of_waiters -= 1
+            if in_flight_call.number_of_waiters == 0:
+                in_flight_call.task.cancel()
+            raise
+        number_of_waiters_sharing_cost = (
+            in_flight_call.number_of_waiters_when_done
+            or in_flight_call.number_of_waiters
+        )
+        MonetaryCostManager.increase_current_usage_in_parent_managers(
+            cost / number_of_waiters_sharing_cost
+        )
+        return result
+
+    @staticmethod
+    async def __run_call_and_capture_cost(
+        make_call: Callable[[], Coroutine[Any, Any, T]]
+    ) -> tuple[T, float]:
+        """
+        Runs in its own task (and so its own copy of the context), so
+        replacing the active cost managers here doesn't affect any caller
+        """
+        MonetaryCostManager._active_limit_managers.set([])
+        with MonetaryCostManager() as cost_capturing_manager:
+            result = await make_call()
+        return result, cost_capturing_manager.current_usage
+
+    @staticmethod
+    def __finish_call(
+        calls_of_loop: dict[str, _InFlightCall],
+        key: str,
+        in_flight_call: _InFlightCall,
+    ) -> None:
+        """
+        The waiters are counted here since nobody can join once the call is
+        done, so everyone who waited gets an equal share of the cost
+        """
+        in_flight_call.number_of_waiters_when_done = (
+            in_flight_call.number_of_waiters
+        )
+        MonetaryCostManager.release_reserved_usage(
+            in_flight_call.reserving_managers, in_flight_call.estimated_cost
+        )
+        if calls_of_loop.get(key) is in_flight_call:
+            del calls_of_loop[key]
+
+    @staticmethod
+    def __serialize_part(part: Any) -> Any:
+        if isinstance(part, BaseModel):
+            return part.model_dump(mode="json")
+        return str(part)
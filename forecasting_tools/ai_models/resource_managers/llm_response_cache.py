@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+class LlmResponseCache:
+    """
+    An opt-in on-disk cache of model responses, for rerunning benchmarks and
+    tournaments without paying for (or waiting on) identical calls twice.
+    Use it as a context manager, the same way as MonetaryCostManager:
+
+    with LlmResponseCache("logs/llm_response_cache.sqlite"):
+        await bot.forecast_questions(questions)
+
+    Responses are keyed on the model, its settings, and the call's inputs.
+    Identical calls in one run (e.g. several samples of the same prompt at a
+    nonzero temperature) are told apart by the order they were made in, so a
+    rerun gets back the same set of samples rather than one sample repeated.
+
+    Entries older than ttl_seconds are ignored and the least recently used
+    entries are evicted once the cache grows past max_size_in_mb. Access times
+    of hits are kept in memory and only written when entries are evicted or
+    the cache is closed (which leaving the context manager does).
+
+    Reads and writes block on SQLite, so call them from a thread when on an
+    event loop (e.g. with asyncio.to_thread).
+    """
+
+    _active_caches: ContextVar[list[LlmResponseCache]] = ContextVar(
+        "_active_caches", default=[]
+    )
+
+    def __init__(
+        self,
+        cache_path: str = "logs/llm_response_cache.sqlite",
+        ttl_seconds: float | None = 60 * 60 * 24 * 30,
+        max_size_in_mb: float = 500,
+    ) -> None:
+        assert ttl_seconds is None or ttl_seconds > 0
+        assert max_size_in_mb > 0
+        self.cache_path = cache_path
+        self.ttl_seconds = ttl_seconds
+        self.max_size_in_bytes = int(max_size_in_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self.__lock = threading.Lock()
+        self.__times_each_key_was_requested: dict[str, int] = {}
+        self.__unsaved_access_times: dict[str, float] = {}
+        directory = os.path.dirname(cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.__connection = sqlite3.connect(
+            cache_path, check_same_thread=False
+        )
+        self.__connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self.__connection.execute(
+            "CREATE INDEX IF NOT EXISTS responses_by_last_access ON responses (last_accessed_at)"
+        )
+        self.__connection.commit()
+        (self.__size_in_bytes,) = self.__connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+
+    def __enter__(self) -> LlmResponseCache:
+        active_caches = self._active_caches.get().copy()
+        active_caches.append(self)
+        self._active_caches.set(active_caches)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:  # NOSONAR
+        active_caches = self._active_caches.get().copy()
+        active_caches.remove(self)
+        self._active_caches.set(active_caches)
+        logger.info(
+            f"LLM response cache at {self.cache_path} had {self.hits} hits and {self.misses} misses"
+        )
+        self.close()
+
+    @classmethod
+    def get_active_cache(cls) -> LlmResponseCache | None:
+        active_caches = cls._active_caches.get()
+        return active_caches[-1] if active_caches else None
+
+    def make_key(self, *parts_of_request: Any) -> str:
+        """
+        Every part must be json serializable (pydantic models are dumped first).
+        Repeats of the same request get their own keys (see class docstring)
+        """
+        serialized_request = json.dumps(
+            parts_of_request, sort_keys=True, default=self.__serialize_part
+        )
+        request_hash = hashlib.sha256(
+            serialized_request.encode("utf-8")
+        ).hexdigest()
+        with self.__lock:
+            repeat_number = self.__times_each_key_was_requested.get(
+                request_hash, 0
+            )
+            self.__times_each_key_was_requested[request_hash] = (
+                repeat_number + 1
+            )
+        return f"{request_hash}-{repeat_number}"
+
+    def get(self, key: str) -> str | None:
+        with self.__lock:
+            row = self.__connection.execute(
+                "SELECT value, size, created_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, size, created_at = row
+            now = time.time()
+            if (
+                self.ttl_seconds is not None
+                and now - created_at > self.ttl_seconds
+            ):
+                self.__connection.execute(
+                    "DELETE FROM responses WHERE key = ?", (key,)
+                )
+                self.__connection.commit()
+                self.__size_in_bytes -= size
+                self.misses += 1
+                return None
+            self.__unsaved_access_times[key] = now
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        size = len(value.encode("utf-8"))
+        if size > self.max_size_in_bytes:
+            logger.warning(
+                f"Not caching response of {size} bytes since it is larger than the whole cache"
+            )
+            return
+        now = time.time()
+        with self.__lock:
+            replaced_row = self.__connection.execute(
+                "SELECT size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            self.__connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self.__size_in_bytes += size - (
+                replaced_row[0] if replaced_row else 0
+            )
+            self.__evict_least_recently_used_entries_if_too_large()
+            self.__connection.commit()
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__connection.execute("DELETE FROM responses")
+            self.__connection.commit()
+            self.__size_in_bytes = 0
+            self.__times_each_key_was_requested.clear()
+            self.__unsaved_access_times.clear()
+
+    def close(self) -> None:
+        with self.__lock:
+            self.__save_access_times()
+            self.__connection.commit()
+            self.__connection.close()
+
+    @property
+    def size_in_bytes(self) -> int:
+        """
+        Summed once when the cache is opened and then kept up to date, so
+        other processes writing to the same file aren't counted until reopened
+        """
+        return self.__size_in_bytes
+
+    def __save_access_times(self) -> None:
+        if not self.__unsaved_access_times:
+            return
+        self.__connection.executemany(
+            "UPDATE responses SET last_accessed_at = ? WHERE key = ?",
+            [
+                (accessed_at, key)
+                for key, accessed_at in self.__unsaved_access_times.items()
+            ],
+        )
+        self.__unsaved_access_times.clear()
+
+    def __evict_least_recently_used_entries_if_too_large(self) -> None:
+        if self.__size_in_bytes <= self.max_size_in_bytes:
+            return
+        size_to_free = self.__size_in_bytes - self.max_size_in_bytes
+        self.__save_access_times()
+        keys_to_evict = []
+        rows = self.__connection.execute(
+            "SELECT key, size FROM responses ORDER BY last_accessed_at ASC"
+        )
+        for key, size in rows:
+            if size_to_free <= 0:
+                break
+            keys_to_evict.append((key,))
+            size_to_free -= size
+            self.__size_in_bytes -= size
+        self.__connection.executemany(
+            "DELETE FROM responses WHERE key = ?", keys_to_evict
+        )
+        logger.debug(
+            f"Evicted {len(keys_to_evict)} entries from the LLM response cache"
+        )
+
+    @staticmethod
+    def __serialize_part(part: Any) -> Any:
+        if isinstance(part, BaseModel):
+            return part.model_dump(mode="json")
+        return str(part)
@@ -10,10 +10,10 @@ class MonetaryCostManager(HardLimitManager):
     This class is a subclass of HardLimitManager that is specifically for monetary costs.
     Assume every cost is in USD
 
-    As of Aug 27 2024, the manager does not track predicted costs.
-    For instance if you run 50 coroutines that cost 10c, and your limit is $1,
-    all 50 will be let through (not 10).
-    The cost will not register until the coroutines finish.
+    Models reserve their predicted cost before each call and swap it for the
+    real cost once the call finishes. So if you run 50 coroutines that each
+    cost 10c, and your limit is $1, only about 10 will be let through.
+    Predictions are estimates, so the limit can still be overshot slightly.
     """
 
     def __enter__(self) -> MonetaryCostManager:
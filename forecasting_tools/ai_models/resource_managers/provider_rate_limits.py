@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import logging
+import re
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderRateLimits(BaseModel):
+    """
+    The rate limit budget a provider reports in its response headers.
+    Any value the provider did not send is None.
+
+    Supports:
+    - OpenAI style headers (x-ratelimit-limit-requests, x-ratelimit-reset-tokens, etc.)
+    - Anthropic style headers (anthropic-ratelimit-requests-limit, etc.)
+    - Generic headers (x-ratelimit-limit, x-ratelimit-remaining, x-ratelimit-reset)
+    - retry-after (seconds or an HTTP date)
+    """
+
+    request_limit: int | None = None
+    requests_remaining: int | None = None
+    seconds_till_requests_reset: float | None = None
+    token_limit: int | None = None
+    tokens_remaining: int | None = None
+    seconds_till_tokens_reset: float | None = None
+    retry_after_seconds: float | None = None
+
+    @classmethod
+    def from_headers(cls, headers: Mapping[str, str]) -> ProviderRateLimits:
+        lowercase_headers = {
+            key.lower(): value for key, value in headers.items()
+        }
+
+        def first_present(*names: str) -> str | None:
+            for name in names:
+                if name in lowercase_headers:
+                    return lowercase_headers[name]
+            return None
+
+        return ProviderRateLimits(
+            request_limit=cls._parse_int(
+                first_present(
+                    "x-ratelimit-limit-requests",
+                    "anthropic-ratelimit-requests-limit",
+                    "x-ratelimit-limit",
+                )
+            ),
+            requests_remaining=cls._parse_int(
+                first_present(
+                    "x-ratelimit-remaining-requests",
+                    "anthropic-ratelimit-requests-remaining",
+                    "x-ratelimit-remaining",
+                )
+            ),
+            seconds_till_requests_reset=cls._parse_seconds_till_reset(
+                first_present(
+                    "x-ratelimit-reset-requests",
+                    "anthropic-ratelimit-requests-reset",
+                    "x-ratelimit-reset",
+                )
+            ),
+            token_limit=cls._parse_int(
+                first_present(
+                    "x-ratelimit-limit-tokens",
+                    "anthropic-ratelimit-tokens-limit",
+                )
+            ),
+            tokens_remaining=cls._parse_int(
+                first_present(
+                    "x-ratelimit-remaining-tokens",
+                    "anthropic-ratelimit-tokens-remaining",
+                )
+            ),
+            seconds_till_tokens_reset=cls._parse_seconds_till_reset(
+                first_present(
+                    "x-ratelimit-reset-tokens",
+                    "anthropic-ratelimit-tokens-reset",
+                )
+            ),
+            retry_after_seconds=cls._parse_seconds_till_reset(
+                first_present("retry-after")
+            ),
+        )
+
+    @staticmethod
+    def _parse_int(value: str | None) -> int | None:
+        if value is None:
+            return None
+        try:
+            return int(float(value))
+        except ValueError:
+            logger.warning(f"Could not parse rate limit header value: {value}")
+            return None
+
+    @staticmethod
+    def _parse_seconds_till_reset(value: str | None) -> float | None:
+        """
+        Handles plain seconds ("20"), OpenAI durations ("6m0s", "20ms"),
+        RFC 3339 timestamps ("2024-01-01T00:00:00Z") and HTTP dates.
+        """
+        if value is None:
+            return None
+        value = value.strip()
+        try:
+            return max(float(value), 0)
+        except ValueError:
+            pass
+
+        duration_parts = re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", value)
+        if duration_parts and "".join(
+            number + unit for number, unit in duration_parts
+        ) == value.replace(" ", ""):
+            seconds_per_unit = {"h": 3600, "m": 60, "s": 1, "ms": 0.001}
+            return sum(
+                float(number) * seconds_per_unit[unit]
+                for number, unit in duration_parts
+            )
+
+        try:
+            reset_time = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            try:
+                reset_time = parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                logger.warning(f"Could not parse rate limit reset: {value}")
+                return None
+        if reset_time.tzinfo is None:
+            reset_time = reset_time.replace(tzinfo=timezone.utc)
+        seconds_till_reset = (
+            reset_time - datetime.now(timezone.utc)
+        ).total_seconds()
+        return max(seconds_till_reset, 0)
@@ -1,10 +1,12 @@
 import logging
-from datetime import datetime, timedelta
+import math
+import time
+from collections import deque
+from datetime import datetime
 
 logger = logging.getLogger(__name__)
 import asyncio
 from enum import Enum
-from typing import Final
 
 
 class LimitReachedResponse(Enum):
@@ -16,12 +18,6 @@ class ResourceUnavailableError(RuntimeError):
     """Raised when resources are unavailable and cannot continue execution."""
 
 
-class ResourceUseEntry:
-    def __init__(self, resources_used: int, time: datetime) -> None:
-        self.resources_used: int = resources_used
-        self.time: datetime = time
-
-
 class RefreshingBucketRateLimiter:
     """
     The refreshing bucket rate limiter is a way of limiting resource use over time.
@@ -44,34 +40,111 @@ class RefreshingBucketRateLimiter:
         capacity: float,
         refresh_rate: float,
         limit_reached_response: LimitReachedResponse = LimitReachedResponse.WAIT,
+        history_bucket_seconds: float = 1,
+        max_history_buckets: int = 3600,
     ) -> None:
         if capacity <= 0:
             raise ValueError("capacity must be greater than 0")
-        self.capacity: Final[float] = capacity
+        self.capacity: float = capacity
 
         if refresh_rate < 0:
             raise ValueError("refresh_rate must not be negative")
         elif refresh_rate == 0:
             logger.info("refresh_rate is 0, resources will not refresh")
-        self.refresh_rate: Final[float] = refresh_rate
+        self.refresh_rate: float = refresh_rate
 
         self.__limit_reached_response: LimitReachedResponse = (
             limit_reached_response
         )
         self.__available_resources: float = capacity
-        self.__resource_history: list[ResourceUseEntry] = []
-        self.__last_replenish_time: datetime = datetime.now()
-        self.__available_resource_lock = asyncio.Lock()
-        self.__resource_history_lock = asyncio.Lock()
+        if history_bucket_seconds <= 0:
+            raise ValueError("history_bucket_seconds must be greater than 0")
+        if max_history_buckets <= 0:
+            raise ValueError("max_history_buckets must be greater than 0")
+        self.__history_bucket_seconds: float = history_bucket_seconds
+        self.__bucket_in_history_slot: list[int | None] = [
+            None
+        ] * max_history_buckets
+        self.__resources_used_in_history_slot: list[float] = [
+            0
+        ] * max_history_buckets
+        self.__last_replenish_time: float = time.monotonic()
         self.__fill_the_bucket_mode = False
+        self.__waiters: deque[tuple[int, asyncio.Future[None]]] = deque()
+        self.__wakeup_handle: asyncio.TimerHandle | None = None
+        self.__paused_until: float = 0
 
     def refresh_and_then_get_available_resources(self) -> float:
-        asyncio.run(self._refresh_resource_count())
+        self._refresh_resource_count()
         return self._available_resources
 
     def zero_out_resources(self) -> None:
+        self._refresh_resource_count()
         self._available_resources = 0
-        asyncio.run(self.__update_fill_the_bucket_mode(resources_ran_out=True))
+        self.__fill_the_bucket_mode = True
+
+    def retune(self, capacity: float, refresh_rate: float) -> None:
+        """
+        Changes the capacity and refresh rate at runtime (e.g. to match the budget a provider reports)
+        A refresh rate of 0 is not allowed here, since anyone already waiting would never be woken up
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be greater than 0")
+        if refresh_rate <= 0:
+            raise ValueError("refresh_rate must be greater than 0")
+        if capacity == self.capacity and refresh_rate == self.refresh_rate:
+            return
+        self._refresh_resource_count()
+        logger.info(
+            f"Retuning rate limiter from capacity {self.capacity} and refresh rate {self.refresh_rate} to capacity {capacity} and refresh rate {refresh_rate}"
+        )
+        self.capacity = capacity
+        self.refresh_rate = refresh_rate
+        self._available_resources = min(self._available_resources, capacity)
+        self.__reschedule_if_anyone_is_waiting()
+
+    def settle_acquisition(
+        self, resources_reserved: float, resources_actually_used: float
+    ) -> None:
+        """
+        For when the true cost of an acquisition is only known afterwards.
+        Acquire an estimate up front, then settle it here: any overestimate is refunded
+        to the bucket and any underestimate is taken out of it (without waiting).
+        Either way the difference is recorded in the usage history.
+        """
+        difference = resources_actually_used - resources_reserved
+        if difference == 0:
+            return
+        self._refresh_resource_count()
+        if difference < 0:
+            self._available_resources = min(
+                self._available_resources - difference, self.capacity
+            )
+        else:
+            self._available_resources = max(
+                self._available_resources - difference, 0
+            )
+        self.__record_resource_use(difference)
+        self.__reschedule_if_anyone_is_waiting()
+
+    def lower_available_resources_to(self, resources_remaining: float) -> None:
+        """
+        Lets an outside source of truth (e.g. a provider's remaining budget) lower the available resources.
+        Never raises them, since requests still in flight may not be reflected yet.
+        """
+        self._refresh_resource_count()
+        if resources_remaining < self._available_resources:
+            self._available_resources = max(resources_remaining, 0)
+            self.__reschedule_if_anyone_is_waiting()
+
+    def pause_for(self, seconds: float) -> None:
+        """
+        Blocks all acquisitions for the given number of seconds (e.g. from a retry-after header)
+        """
+        self.__paused_until = max(
+            self.__paused_until, time.monotonic() + seconds
+        )
+        self.__reschedule_if_anyone_is_waiting()
 
     @property
     def _available_resources(self) -> float:
@@ -88,32 +161,66 @@ class RefreshingBucketRateLimiter:
     def calculate_resources_passed_into_acquire_in_time_range(
         self, start_time: datetime, end_time: datetime
     ) -> int:
-        resources_used = 0
-        for entry in self.__resource_history:
-            if start_time < entry.time < end_time:
-                resources_used += entry.resources_used
+        """
+        Use is counted per `history_bucket_seconds`, so the range is widened to
+        whole buckets. Refunds count against the bucket they happen in.
+        Only the last `max_history_buckets` buckets are remembered.
+        """
+        number_of_slots = len(self.__bucket_in_history_slot)
+        current_bucket = self.__get_history_bucket(time.time())
+        first_bucket = max(
+            self.__get_history_bucket(start_time.timestamp()),
+            current_bucket - number_of_slots + 1,
+        )
+        last_bucket = min(
+            self.__get_history_bucket(end_time.timestamp()), current_bucket
+        )
+        resources_used = sum(
+            self.__resources_used_in_history_slot[bucket % number_of_slots]
+            for bucket in range(first_bucket, last_bucket + 1)
+            if self.__bucket_in_history_slot[bucket % number_of_slots]
+            == bucket
+        )
+        return max(round(resources_used), 0)
 
-        return resources_used
+    def acquire_resources_if_available_now(
+        self, resources_being_consumed: int
+    ) -> bool:
+        """
+        Acquires the resources only if no waiting is needed (nobody is queued
+        and the bucket has enough). Returns whether they were acquired.
+        """
+        self._refresh_resource_count()
+        if not self.__can_be_granted_now(resources_being_consumed):
+            return False
+        self.__consume_resources(resources_being_consumed)
+        return True
 
     async def wait_till_able_to_acquire_resources(
         self, resources_being_consumed: int
     ) -> None:
+        """
+        Waiters are served in the order they arrive and each one is woken
+        exactly when the bucket has refilled enough for it (no polling).
+        """
         if resources_being_consumed > self.capacity:
             raise ValueError(
                 f"resources_being_consumed must be less than or equal to capacity. Capacity: {self.capacity}, resources_being_consumed: {resources_being_consumed}"
             )
 
-        resources_are_available: bool = (
-            await self._determine_if_resources_available(
-                resources_being_consumed
-            )
-        )
-        await self.__update_fill_the_bucket_mode(
-            resources_ran_out=(not resources_are_available)
+        self._refresh_resource_count()
+        if self.__can_be_granted_now(resources_being_consumed):
+            self.__consume_resources(resources_being_consumed)
+            return
+
+        resources_ran_out = (
+            resources_being_consumed > self._available_resources
         )
+        if resources_ran_out:
+            self.__fill_the_bucket_mode = True
 
         if (
-            not resources_are_available
+            (resources_ran_out or self.__is_paused())
             and self.__limit_reached_response
             == LimitReachedResponse.RAISE_EXCEPTION
         ):
@@ -121,70 +228,125 @@ class RefreshingBucketRateLimiter:
                 "Resources not available. Limit Reached Response is RAISE_EXCEPTION"
             )
 
-        if not resources_are_available and self.refresh_rate == 0:
+        if resources_ran_out and self.refresh_rate == 0:
             raise RuntimeError(
                 "Resources not available. Would have waited indefinitely. refresh_rate is 0"
             )
 
-        while not resources_are_available or self.__fill_the_bucket_mode:
-            seconds_to_sleep = await self.__calculate_seconds_to_sleep(
-                resources_being_consumed
-            )
-            await asyncio.sleep(seconds_to_sleep)
-            resources_are_available = (
-                await self._determine_if_resources_available(
-                    resources_being_consumed
+        waiter: asyncio.Future[None] = (
+            asyncio.get_running_loop().create_future()
+        )
+        self.__waiters.append((resources_being_consumed, waiter))
+        self.__schedule_next_wakeup()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if (
+                waiter.done()
+                and not waiter.cancelled()
+                and waiter.exception() is None
+            ):
+                self._refresh_resource_count()
+                self._available_resources = min(
+                    self._available_resources + resources_being_consumed,
+                    self.capacity,
                 )
-            )
-            await self.__update_fill_the_bucket_mode(
-                resources_ran_out=(not resources_are_available)
-            )
-
-        async with self.__available_resource_lock:
-            self._available_resources -= resources_being_consumed
-
-        await self.__add_resource_use_entry(resources_being_consumed)
+                self.__record_resource_use(-resources_being_consumed)
+            self.__grant_waiting_resources()
+            raise
+
+    def __can_be_granted_now(self, resources_being_consumed: int) -> bool:
+        return (
+            not self.__waiters
+            and not self.__fill_the_bucket_mode
+            and not self.__is_paused()
+            and resources_being_consumed <= self._available_resources
+        )
 
-    async def _determine_if_resources_available(
-        self, resources_being_consumed: int
-    ) -> bool:
-        await self._refresh_resource_count()
-        async with self.__available_resource_lock:
-            resources_are_available = (
-                resources_being_consumed <= self._available_resources
-            )
-            return resources_are_available
+    def __consume_resources(self, resources_being_consumed: int) -> None:
+        self._available_resources -= resources_being_consumed
+        self.__record_resource_use(resources_being_consumed)
+
+    def __record_resource_use(self, resources_used: float) -> None:
+        """
+        The history is a ring of buckets, so a slot is reused (and its old
+        bucket dropped) once the ring has gone all the way around
+        """
+        bucket = self.__get_history_bucket(time.time())
+        slot = bucket % len(self.__bucket_in_history_slot)
+        if self.__bucket_in_history_slot[slot] != bucket:
+            self.__bucket_in_history_slot[slot] = bucket
+            self.__resources_used_in_history_slot[slot] = 0
+        self.__resources_used_in_history_slot[slot] += resources_used
+
+    def __get_history_bucket(self, timestamp: float) -> int:
+        return math.floor(timestamp / self.__history_bucket_seconds)
+
+    def __grant_waiting_resources(self) -> None:
+        self._refresh_resource_count()
+        while self.__waiters:
+            resources_needed, waiter = self.__waiters[0]
+            if waiter.done():
+                self.__waiters.popleft()
+                continue
+            if resources_needed > self.capacity:
+                self.__waiters.popleft()
+                waiter.set_exception(
+                    ValueError(
+                        f"resources_being_consumed must be less than or equal to capacity. Capacity: {self.capacity}, resources_being_consumed: {resources_needed}"
+                    )
+                )
+                continue
+            if self.__is_paused():
+                break
+            if (
+                self.__fill_the_bucket_mode
+                or resources_needed > self._available_resources
+            ):
+                self.__fill_the_bucket_mode = True
+                break
+            self.__waiters.popleft()
+            self.__consume_resources(resources_needed)
+            waiter.set_result(None)
+        self.__schedule_next_wakeup()
+
+    def __is_paused(self) -> bool:
+        return time.monotonic() < self.__paused_until
+
+    def __reschedule_if_anyone_is_waiting(self) -> None:
+        if self.__waiters:
+            self.__schedule_next_wakeup()
+
+    def __schedule_next_wakeup(self) -> None:
+        if self.__wakeup_handle is not None:
+            self.__wakeup_handle.cancel()
+            self.__wakeup_handle = None
+        if not self.__waiters:
+            return
+        resources_needed, _ = self.__waiters[0]
+        seconds_to_sleep = self.__calculate_seconds_to_sleep(resources_needed)
+        self.__wakeup_handle = asyncio.get_running_loop().call_later(
+            seconds_to_sleep, self.__grant_waiting_resources
+        )
 
-    async def __update_fill_the_bucket_mode(
-        self, resources_ran_out: bool
-    ) -> None:
-        await self._refresh_resource_count()
+    def _refresh_resource_count(self) -> None:
+        current_time = time.monotonic()
+        seconds_since_last_replenish = (
+            current_time - self.__last_replenish_time
+        )
+        replenish_amount = seconds_since_last_replenish * self.refresh_rate
+        new_total = self._available_resources + replenish_amount
+        self._available_resources = min(new_total, self.capacity)
+        self.__last_replenish_time = current_time
         if self._available_resources >= self.capacity:
-            if resources_ran_out == True:
-                raise ValueError(
-                    "resources_ran_out should not be True when resources are available"
-                )
             self.__fill_the_bucket_mode = False
-        if resources_ran_out:
-            self.__fill_the_bucket_mode = True
 
-    async def _refresh_resource_count(self) -> None:
-        async with self.__available_resource_lock:
-            time_since_last_replenish: timedelta = (
-                datetime.now() - self.__last_replenish_time
-            )
-            seconds_since_last_replenish: float = (
-                time_since_last_replenish.total_seconds()
-            )
-            replenish_amount = seconds_since_last_replenish * self.refresh_rate
-            new_total = self._available_resources + replenish_amount
-            self._available_resources = min(new_total, self.capacity)
-            self.__last_replenish_time = datetime.now()
-
-    async def __calculate_seconds_to_sleep(
+    def __calculate_seconds_to_sleep(
         self, resources_being_consumed: int
     ) -> float:
-        if self.__fill_the_bucket_mode:
+        if self.__is_paused():
+            return self.__paused_until - time.monotonic()
+        elif self.__fill_the_bucket_mode:
             seconds_till_bucket_is_full = (
                 self.capacity - self._available_resources
             ) / self.refresh_rate
@@ -196,8 +358,3 @@ class RefreshingBucketRateLimiter:
             return seconds_till_resources_available
         else:
             return 0
-
-    async def __add_resource_use_entry(self, resource_amount: int) -> None:
-        async with self.__resource_history_lock:
-            new_entry = ResourceUseEntry(resource_amount, datetime.now())
-            self.__resource_history.append(new_entry)
@@ -3,15 +3,23 @@ import inspect
 import logging
 import os
 import time
+import weakref
 from abc import ABC, abstractmethod
+from contextlib import aclosing
 from datetime import datetime
-from typing import Any, Coroutine, cast
+from typing import Any, AsyncGenerator, Coroutine, TypeVar, cast
 
 from forecasting_tools.ai_models.ai_utils.ai_misc import clean_indents
 from forecasting_tools.ai_models.resource_managers.monetary_cost_manager import (
     MonetaryCostManager,
 )
+from forecasting_tools.forecasting.helpers.aggregation_strategies import (
+    AggregationStrategy,
+)
 from forecasting_tools.forecasting.helpers.metaculus_api import MetaculusApi
+from forecasting_tools.forecasting.helpers.prediction_dispersion import (
+    PredictionDispersion,
+)
 from forecasting_tools.forecasting.questions_and_reports.forecast_report import (
     ForecastReport,
     ReasonedPrediction,
@@ -33,12 +41,23 @@ from forecasting_tools.forecasting.questions_and_reports.questions import (
 from forecasting_tools.forecasting.questions_and_reports.report_organizer import (
     ReportOrganizer,
 )
-from forecasting_tools.util import async_batching
+from forecasting_tools.forecasting.sub_question_researchers.shared_sub_question_answers import (
+    SharedSubQuestionAnswers,
+)
+from forecasting_tools.util import async_batching, file_manipulation
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 class ForecastBot(ABC):
+    RESEARCH_VARIANT_FOCUSES: list[str] = [
+        "historical base rates and how often similar events have happened",
+        "the strongest reasons the question could resolve against current expectations",
+        "what key decision makers, experts and forecasting markets are saying",
+        "the latest news and how the situation has changed recently",
+    ]
 
     def __init__(
         self,
@@ -50,6 +69,12 @@ class ForecastBot(ABC):
         folder_to_save_reports_to: str | None = None,
         skip_previously_forecasted_questions: bool = False,
         skip_questions_that_error: bool = True,
+        max_concurrent_questions: int | None = 10,
+        max_concurrent_research_units: int | None = 20,
+        aggregation_strategy: str | AggregationStrategy | None = None,
+        early_stopping_dispersion_threshold: float | None = None,
+        predictions_per_wave: int = 2,
+        research_variants_per_question: int | None = None,
     ) -> None:
         assert (
             research_reports_per_question > 0
@@ -57,6 +82,23 @@ class ForecastBot(ABC):
         assert (
             predictions_per_research_report > 0
         ), "Must run at least one prediction"
+        assert (
+            max_concurrent_questions is None or max_concurrent_questions > 0
+        ), "Must allow at least one question to run at a time"
+        assert (
+            max_concurrent_research_units is None
+            or max_concurrent_research_units > 0
+        ), "Must allow at least one research unit to run at a time"
+        assert (
+            early_stopping_dispersion_threshold is None
+            or early_stopping_dispersion_threshold >= 0
+        ), "Dispersion threshold must not be negative"
+        assert (
+            predictions_per_wave > 0
+        ), "Must run at least one prediction per wave"
+        assert research_variants_per_question is None or (
+            0 < research_variants_per_question <= research_reports_per_question
+        ), "Research variants must be between 1 and the number of research reports"
         self.research_reports_per_question = research_reports_per_question
         self.predictions_per_research_report = predictions_per_research_report
         self.use_research_summary_to_forecast = (
@@ -68,6 +110,21 @@ class ForecastBot(ABC):
             skip_previously_forecasted_questions
         )
         self.skip_questions_that_error = skip_questions_that_error
+        self.max_concurrent_questions = max_concurrent_questions
+        self.max_concurrent_research_units = max_concurrent_research_units
+        self.aggregation_strategy = (
+            AggregationStrategy.get_strategy(aggregation_strategy)
+            if isinstance(aggregation_strategy, str)
+            else aggregation_strategy
+        )
+        self.early_stopping_dispersion_threshold = (
+            early_stopping_dispersion_threshold
+        )
+        self.predictions_per_wave = predictions_per_wave
+        self.research_variants_per_question = research_variants_per_question
+        self.__research_unit_semaphores: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, asyncio.Semaphore
+        ] = weakref.WeakKeyDictionary()
 
     def get_config(self) -> dict[str, str]:
         params = inspect.signature(self.__init__).parameters
@@ -104,31 +161,33 @@ class ForecastBot(ABC):
         self,
         questions: list[MetaculusQuestion],
     ) -> list[ForecastReport]:
-        if self.skip_previously_forecasted_questions:
-            unforecasted_questions = [
-                question
-                for question in questions
-                if not question.already_forecasted
-            ]
-            if len(questions) != len(unforecasted_questions):
-                logger.info(
-                    f"Skipping {len(questions) - len(unforecasted_questions)} previously forecasted questions"
-                )
-            questions = unforecasted_questions
-        reports: list[ForecastReport] = []
-        reports = await self._run_coroutines_and_error_if_configured(
-            [self._run_individual_question(question) for question in questions]
+        questions = self.__remove_previously_forecasted_questions(questions)
+        reports_in_question_order: list[ForecastReport | None] = [None] * len(
+            questions
         )
-        if self.folder_to_save_reports_to:
-            file_path = self.__create_file_path_to_save_to(questions)
-            print(file_path)
-            logger.info(f"Saving reports to {file_path}")
-            ForecastReport.save_object_list_to_file_path(reports, file_path)
-        if self.publish_reports_to_metaculus:
-            await self._run_coroutines_and_error_if_configured(
-                [report.publish_report_to_metaculus() for report in reports]
-            )
-        return reports
+        async with aclosing(
+            self._forecast_questions_as_completed(questions)
+        ) as completed_reports:
+            async for index, report in completed_reports:
+                reports_in_question_order[index] = report
+        return [
+            report for report in reports_in_question_order if report is not None
+        ]
+
+    async def forecast_questions_iter(
+        self,
+        questions: list[MetaculusQuestion],
+    ) -> AsyncGenerator[ForecastReport, None]:
+        """
+        Yields each report as soon as its question finishes (in order of completion, not question order).
+        Reports are published and saved as they come in, so a crash part way through a run keeps everything finished so far.
+        """
+        questions = self.__remove_previously_forecasted_questions(questions)
+        async with aclosing(
+            self._forecast_questions_as_completed(questions)
+        ) as completed_reports:
+            async for _, report in completed_reports:
+                yield report
 
     @abstractmethod
     async def run_research(self, question: MetaculusQuestion) -> str:
@@ -142,20 +201,50 @@ class ForecastBot(ABC):
     ) -> str:
         return f"{research[:2500]}..."
 
+    async def run_research_variant(
+        self, question: MetaculusQuestion, variant_index: int
+    ) -> str:
+        """
+        Used when research is shared between research reports (see
+        research_variants_per_question). By default the first variant runs
+        run_research as is and every other variant runs it on a copy of the
+        question whose background info asks it to focus on one of
+        RESEARCH_VARIANT_FOCUSES. Override to vary research another way.
+        """
+        if variant_index == 0:
+            return await self.run_research(question)
+        focus = self.RESEARCH_VARIANT_FOCUSES[
+            (variant_index - 1) % len(self.RESEARCH_VARIANT_FOCUSES)
+        ]
+        background_info = question.background_info or ""
+        focused_question = question.model_copy(
+            update={
+                "background_info": f"{background_info}\n\nResearch focus: pay particular attention to {focus}.".strip()
+            }
+        )
+        return await self.run_research(focused_question)
+
     async def _run_individual_question(
         self, question: MetaculusQuestion
     ) -> ForecastReport:
         with MonetaryCostManager() as cost_manager:
             start_time = time.time()
-            prediction_tasks = [
-                self._research_and_make_predictions(question)
-                for _ in range(self.research_reports_per_question)
-            ]
-            research_with_predictions_units = (
-                await self._run_coroutines_and_error_if_configured(
-                    prediction_tasks
+            if self.research_variants_per_question is None:
+                prediction_tasks = [
+                    self._run_research_unit_with_concurrency_limit(question)
+                    for _ in range(self.research_reports_per_question)
+                ]
+                research_with_predictions_units = (
+                    await self._run_coroutines_and_error_if_configured(
+                        prediction_tasks
+                    )
+                )
+            else:
+                research_with_predictions_units = (
+                    await self.__run_research_units_with_shared_research(
+                        question
+                    )
                 )
-            )
             if len(research_with_predictions_units) == 0:
                 raise ValueError("All research reports/predictions failed")
             report_type = ReportOrganizer.get_report_type_for_question_type(
@@ -166,14 +255,24 @@ class ForecastBot(ABC):
                 for research_prediction_collection in research_with_predictions_units
                 for reasoned_prediction in research_prediction_collection.predictions
             ]
-            aggregated_prediction = await report_type.aggregate_predictions(
-                all_predictions,
-                question,
+            aggregated_prediction = await self._aggregate_predictions(
+                all_predictions, question, report_type
             )
             end_time = time.time()
             time_spent_in_minutes = (end_time - start_time) / 60
             final_cost = cost_manager.current_usage
 
+        number_of_skipped_predictions = sum(
+            unit.number_of_skipped_predictions
+            for unit in research_with_predictions_units
+        )
+        other_notes = None
+        if number_of_skipped_predictions > 0:
+            other_notes = f"Early stopping skipped {number_of_skipped_predictions} of {len(research_with_predictions_units) * self.predictions_per_research_report} predictions"
+            logger.info(
+                f"{other_notes} for question '{question.question_text}'"
+            )
+
         unified_explanation = self._create_unified_explanation(
             question,
             research_with_predictions_units,
@@ -185,15 +284,168 @@ class ForecastBot(ABC):
             question=question,
             prediction=aggregated_prediction,
             explanation=unified_explanation,
+            other_notes=other_notes,
             price_estimate=final_cost,
             minutes_taken=time_spent_in_minutes,
         )
 
+    async def _forecast_questions_as_completed(
+        self, questions: list[MetaculusQuestion]
+    ) -> AsyncGenerator[tuple[int, ForecastReport], None]:
+        """
+        While running, each report is appended as one line to a .jsonl file
+        next to the report file, so a crash keeps the reports finished so far.
+        The usual .json report file is written once when the run ends.
+        """
+        file_path = None
+        if self.folder_to_save_reports_to:
+            file_path = self.__create_file_path_to_save_to(questions)
+            logger.info(f"Saving reports to {file_path}")
+        saved_reports: list[ForecastReport] = []
+
+        try:
+            async with aclosing(
+                async_batching.run_function_with_worker_pool_as_completed(
+                    self._run_individual_question_and_publish_if_configured,
+                    questions,
+                    self.max_concurrent_questions,
+                )
+            ) as completed_questions:
+                async for index, result in completed_questions:
+                    if isinstance(result, Exception):
+                        if not self.skip_questions_that_error:
+                            raise result
+                        logger.error(
+                            f"Error while forecasting question '{questions[index].question_text}': {result.__class__.__name__} Exception - {result}"
+                        )
+                        continue
+                    if file_path:
+                        saved_reports.append(result)
+                        await asyncio.to_thread(
+                            file_manipulation.add_to_jsonl_file,
+                            self.__get_in_progress_file_path(file_path),
+                            [result.to_json()],
+                        )
+                    yield index, result
+        finally:
+            if file_path and saved_reports:
+                await asyncio.to_thread(
+                    ForecastReport.save_object_list_to_file_path,
+                    saved_reports,
+                    file_path,
+                )
+
+    async def _run_individual_question_and_publish_if_configured(
+        self, question: MetaculusQuestion
+    ) -> ForecastReport:
+        report = await self._run_individual_question(question)
+        if self.publish_reports_to_metaculus:
+            try:
+                await report.publish_report_to_metaculus()
+            except Exception as e:
+                if not self.skip_questions_that_error:
+                    raise
+                logger.error(
+                    f"Error while publishing report for question '{question.question_text}': {e.__class__.__name__} Exception - {e}"
+                )
+        return report
+
+    async def _aggregate_predictions(
+        self,
+        predictions: list[Any],
+        question: MetaculusQuestion,
+        report_type: type[ForecastReport],
+    ) -> Any:
+        """
+        Uses the report type's default aggregation unless the bot was
+        configured with an aggregation strategy
+        """
+        if self.aggregation_strategy is None:
+            return await report_type.aggregate_predictions(
+                predictions, question
+            )
+        return self.aggregation_strategy.aggregate_predictions(
+            predictions, question
+        )
+
+    async def _run_research_unit_with_concurrency_limit(
+        self, question: MetaculusQuestion
+    ) -> ResearchWithPredictions:
+        return await self.__run_with_research_unit_limit(
+            self._research_and_make_predictions(question)
+        )
+
+    async def __run_research_units_with_shared_research(
+        self, question: MetaculusQuestion
+    ) -> list[ResearchWithPredictions]:
+        """
+        Researches research_variants_per_question variants and spreads the
+        research reports over them, so reports sharing a variant only make
+        predictions. Sub-questions asked by several variants are answered once.
+        """
+        assert self.research_variants_per_question is not None
+        with SharedSubQuestionAnswers():
+            research_tasks = [
+                self.__run_with_research_unit_limit(
+                    self.__research_variant_and_summarize(
+                        question, variant_index
+                    )
+                )
+                for variant_index in range(self.research_variants_per_question)
+            ]
+            researches_and_summaries: list[tuple[str, str]] = (
+                await self._run_coroutines_and_error_if_configured(
+                    research_tasks
+                )
+            )
+        if len(researches_and_summaries) == 0:
+            raise ValueError("All research variants failed")
+
+        prediction_tasks = [
+            self.__run_with_research_unit_limit(
+                self._make_predictions(
+                    question,
+                    *researches_and_summaries[
+                        report_index % len(researches_and_summaries)
+                    ],
+                )
+            )
+            for report_index in range(self.research_reports_per_question)
+        ]
+        return await self._run_coroutines_and_error_if_configured(
+            prediction_tasks
+        )
+
+    async def __research_variant_and_summarize(
+        self, question: MetaculusQuestion, variant_index: int
+    ) -> tuple[str, str]:
+        research = await self.run_research_variant(question, variant_index)
+        summary_report = await self.summarize_research(question, research)
+        return research, summary_report
+
+    async def __run_with_research_unit_limit(
+        self, coroutine: Coroutine[Any, Any, T]
+    ) -> T:
+        if self.max_concurrent_research_units is None:
+            return await coroutine
+        loop = asyncio.get_running_loop()
+        semaphore = self.__research_unit_semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrent_research_units)
+            self.__research_unit_semaphores[loop] = semaphore
+        async with semaphore:
+            return await coroutine
+
     async def _research_and_make_predictions(
         self, question: MetaculusQuestion
     ) -> ResearchWithPredictions:
         research = await self.run_research(question)
         summary_report = await self.summarize_research(question, research)
+        return await self._make_predictions(question, research, summary_report)
+
+    async def _make_predictions(
+        self, question: MetaculusQuestion, research: str, summary_report: str
+    ) -> ResearchWithPredictions:
         research_to_use = (
             research
             if self.use_research_summary_to_forecast
@@ -215,18 +467,39 @@ class ForecastBot(ABC):
         else:
             raise ValueError(f"Unknown question type: {type(question)}")
 
-        tasks = cast(
-            list[Coroutine[Any, Any, ReasonedPrediction[Any]]],
-            [
-                forecast_function(question, research_to_use)
-                for _ in range(self.predictions_per_research_report)
-            ],
-        )
-        reasoned_predictions, _ = (
-            async_batching.run_coroutines_while_removing_and_logging_exceptions(
-                tasks
+        reasoned_predictions: list[ReasonedPrediction[Any]] = []
+        number_of_attempted_predictions = 0
+        while (
+            number_of_attempted_predictions
+            < self.predictions_per_research_report
+        ):
+            wave_size = (
+                self.predictions_per_research_report
+                if self.early_stopping_dispersion_threshold is None
+                else min(
+                    self.predictions_per_wave,
+                    self.predictions_per_research_report
+                    - number_of_attempted_predictions,
+                )
             )
-        )
+            tasks = cast(
+                list[Coroutine[Any, Any, ReasonedPrediction[Any]]],
+                [
+                    forecast_function(question, research_to_use)
+                    for _ in range(wave_size)
+                ],
+            )
+            wave_predictions, _ = (
+                await async_batching.await_coroutines_while_removing_and_logging_exceptions(
+                    tasks
+                )
+            )
+            reasoned_predictions.extend(wave_predictions)
+            number_of_attempted_predictions += wave_size
+            if self.__predictions_agree_enough_to_stop(
+                reasoned_predictions, question
+            ):
+                break
         if len(reasoned_predictions) == 0:
             raise ValueError("All predictions failed")
 
@@ -234,20 +507,45 @@ class ForecastBot(ABC):
             research_report=research,
             summary_report=summary_report,
             predictions=reasoned_predictions,
+            number_of_skipped_predictions=self.predictions_per_research_report
+            - number_of_attempted_predictions,
         )
 
+    def __predictions_agree_enough_to_stop(
+        self,
+        reasoned_predictions: list[ReasonedPrediction[Any]],
+        question: MetaculusQuestion,
+    ) -> bool:
+        """
+        Early stopping needs at least two predictions, since a single
+        prediction always has no dispersion
+        """
+        if (
+            self.early_stopping_dispersion_threshold is None
+            or len(reasoned_predictions) < 2
+        ):
+            return False
+        dispersion = PredictionDispersion.calculate(
+            [
+                prediction.prediction_value
+                for prediction in reasoned_predictions
+            ],
+            question,
+        )
+        return dispersion <= self.early_stopping_dispersion_threshold
+
     async def _run_coroutines_and_error_if_configured(
         self, coroutines: list[Coroutine[Any, Any, Any]]
     ) -> list[Any]:
         if self.skip_questions_that_error:
             outputs, _ = (
-                async_batching.run_coroutines_while_removing_and_logging_exceptions(
+                await async_batching.await_coroutines_while_removing_and_logging_exceptions(
                     coroutines
                 )
             )
             return outputs
         else:
-            return await asyncio.gather(*coroutines)
+            return await async_batching.await_coroutines(coroutines)
 
     @abstractmethod
     async def _run_forecast_on_binary(
@@ -377,6 +675,24 @@ class ForecastBot(ABC):
             rationales.append(new_rationale)
         return "\n".join(rationales)
 
+    def __remove_previously_forecasted_questions(
+        self, questions: list[MetaculusQuestion]
+    ) -> list[MetaculusQuestion]:
+        if not self.skip_previously_forecasted_questions:
+            return questions
+        unforecasted_questions = [
+            question for question in questions if not question.already_forecasted
+        ]
+        if len(questions) != len(unforecasted_questions):
+            logger.info(
+                f"Skipping {len(questions) - len(unforecasted_questions)} previously forecasted questions"
+            )
+        return unforecasted_questions
+
+    @staticmethod
+    def __get_in_progress_file_path(file_path: str) -> str:
+        return f"{file_path.removesuffix('.json')}.jsonl"
+
     def __create_file_path_to_save_to(
             self, questions: list[MetaculusQuestion]
         ) -> str:
@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import logging
+from abc import ABC, abstractmethod
+from typing import Any
+
+import numpy as np
+
+from forecasting_tools.forecasting.questions_and_reports.multiple_choice_report import (
+    MultipleChoiceReport,
+    PredictedOption,
+    PredictedOptionList,
+)
+from forecasting_tools.forecasting.questions_and_reports.numeric_report import (
+    NumericDistribution,
+    NumericReport,
+)
+from forecasting_tools.forecasting.questions_and_reports.questions import (
+    BinaryQuestion,
+    MetaculusQuestion,
+    MultipleChoiceQuestion,
+    NumericQuestion,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AggregationStrategy(ABC):
+    """
+    Combines the predictions made for one question into a single prediction.
+
+    Every question type is turned into a (predictions, ...) array of
+    probabilities (binary: one probability per prediction, multiple choice:
+    one per option, numeric: one per cdf point) that the strategy reduces
+    along the first axis. Strategies treat each column on its own, which
+    keeps numeric cdfs increasing. Multiple choice results are renormalized.
+
+    Strategies are registered by name so bots can pick one in their config.
+    """
+
+    _registered_strategies: dict[str, AggregationStrategy] = {}
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __str__(self) -> str:
+        return self.name
+
+    @classmethod
+    def register(cls, strategy: AggregationStrategy) -> AggregationStrategy:
+        cls._registered_strategies[strategy.name] = strategy
+        return strategy
+
+    @classmethod
+    def get_strategy(cls, name: str) -> AggregationStrategy:
+        if name not in cls._registered_strategies:
+            raise ValueError(
+                f"Unknown aggregation strategy '{name}'. Registered strategies are: {cls.get_registered_strategy_names()}"
+            )
+        return cls._registered_strategies[name]
+
+    @classmethod
+    def get_registered_strategy_names(cls) -> list[str]:
+        return list(cls._registered_strategies.keys())
+
+    @abstractmethod
+    def aggregate_probabilities(self, probabilities: np.ndarray) -> np.ndarray:
+        """
+        Reduces the first axis (one row per prediction) of the probabilities
+        """
+
+    def aggregate_predictions(
+        self, predictions: list[Any], question: MetaculusQuestion
+    ) -> Any:
+        assert predictions, "No predictions to aggregate"
+        if isinstance(question, BinaryQuestion):
+            return self.__aggregate_binary_predictions(predictions)
+        elif isinstance(question, MultipleChoiceQuestion):
+            return self.__aggregate_multiple_choice_predictions(predictions)
+        elif isinstance(question, NumericQuestion):
+            return self.__aggregate_numeric_predictions(predictions, question)
+        else:
+            raise ValueError(
+                f"Aggregation strategies do not support {type(question)}"
+            )
+
+    def __aggregate_binary_predictions(
+        self, predictions: list[float]
+    ) -> float:
+        probabilities = np.asarray(predictions, dtype=float)
+        assert np.all(
+            (0 <= probabilities) & (probabilities <= 1)
+        ), "Predictions must be between 0 and 1"
+        aggregated = self.aggregate_probabilities(probabilities)
+        return float(np.clip(aggregated, 0, 1))
+
+    def __aggregate_multiple_choice_predictions(
+        self, predictions: list[PredictedOptionList]
+    ) -> PredictedOptionList:
+        option_names, probabilities = MultipleChoiceReport.stack_probabilities(
+            predictions
+        )
+        aggregated = self.aggregate_probabilities(probabilities)
+        aggregated = aggregated / aggregated.sum()
+        return PredictedOptionList(
+            predicted_options=[
+                PredictedOption(
+                    option_name=option_name, probability=probability
+                )
+                for option_name, probability in zip(
+                    option_names, aggregated.tolist()
+                )
+            ]
+        )
+
+    def __aggregate_numeric_predictions(
+        self, predictions: list[NumericDistribution], question: NumericQuestion
+    ) -> NumericDistribution:
+        x_axis, cdf_probabilities = NumericReport.stack_cdf_probabilities(
+            predictions
+        )
+        aggregated = np.clip(
+            self.aggregate_probabilities(cdf_probabilities), 0, 1
+        )
+        return NumericReport.make_distribution_from_cdf(
+            x_axis, aggregated, question
+        )
+
+
+class MeanAggregationStrategy(AggregationStrategy):
+
+    def __init__(self, name: str = "mean") -> None:
+        super().__init__(name)
+
+    def aggregate_probabilities(self, probabilities: np.ndarray) -> np.ndarray:
+        return probabilities.mean(axis=0)
+
+
+class MedianAggregationStrategy(AggregationStrategy):
+
+    def __init__(self, name: str = "median") -> None:
+        super().__init__(name)
+
+    def aggregate_probabilities(self, probabilities: np.ndarray) -> np.ndarray:
+        return np.median(probabilities, axis=0)
+
+
+class TrimmedMeanAggregationStrategy(AggregationStrategy):
+    """
+    Drops the most extreme predictions on each side before averaging
+    """
+
+    def __init__(
+        self, trim_proportion: float = 0.1, name: str = "trimmed_mean"
+    ) -> None:
+        assert 0 <= trim_proportion < 0.5
+        super().__init__(name)
+        self.trim_proportion = trim_proportion
+
+    def aggregate_probabilities(self, probabilities: np.ndarray) -> np.ndarray:
+        number_to_trim = int(len(probabilities) * self.trim_proportion)
+        sorted_probabilities = np.sort(probabilities, axis=0)
+        return sorted_probabilities[
+            number_to_trim : len(probabilities) - number_to_trim
+        ].mean(axis=0)
+
+
+class LogPoolAggregationStrategy(AggregationStrategy):
+    """
+    Geometric mean of the probabilities, which for multiple choice questions
+    (once renormalized) is a logarithmic opinion pool. A single prediction
+    that gives an option almost no chance pulls that option down a lot.
+    """
+
+    def __init__(
+        self, min_probability: float = 1e-4, name: str = "log_pool"
+    ) -> None:
+        assert 0 < min_probability < 1
+        super().__init__(name)
+        self.min_probability = min_probability
+
+    def aggregate_probabilities(self, probabilities: np.ndarray) -> np.ndarray:
+        clipped = np.clip(probabilities, self.min_probability, 1)
+        return np.exp(np.log(clipped).mean(axis=0))
+
+
+class ExtremizedLogOddsAggregationStrategy(AggregationStrategy):
+    """
+    Averages the log odds of the predictions and multiplies the average by an
+    extremizing factor. Forecasts made from overlapping information tend to
+    be underconfident when averaged, and extremizing corrects for that.
+    For multiple choice and numeric questions each option or cdf point is
+    treated as its own binary question.
+    """
+
+    def __init__(
+        self,
+        extremizing_factor: float = 1.5,
+        min_probability: float = 1e-4,
+        name: str = "extremized_log_odds",
+    ) -> None:
+        assert extremizing_factor > 0
+        assert 0 < min_probability < 0.5
+        super().__init__(name)
+        self.extremizing_factor = extremizing_factor
+        self.min_probability = min_probability
+
+    def aggregate_probabilities(self, probabilities: np.ndarray) -> np.ndarray:
+        clipped = np.clip(
+            probabilities, self.min_probability, 1 - self.min_probability
+        )
+        mean_log_odds = np.log(clipped / (1 - clipped)).mean(axis=0)
+        return 1 / (1 + np.exp(-self.extremizing_factor * mean_log_odds))
+
+
+class PerformanceWeightedAggregationStrategy(AggregationStrategy):
+    """
+    Weighted mean where each prediction slot (the order predictions are made
+    in) has a weight, e.g. from how well each forecaster did in a benchmark.
+    Falls back to an unweighted mean if the number of predictions does not
+    match the number of weights (e.g. because some predictions failed).
+    """
+
+    def __init__(
+        self, weights: list[float], name: str = "performance_weighted"
+    ) -> None:
+        assert len(weights) > 0, "At least one weight is needed"
+        assert all(weight >= 0 for weight in weights)
+        assert sum(weights) > 0, "At least one weight must be positive"
+        super().__init__(name)
+        self.weights = np.asarray(weights, dtype=float)
+
+    @classmethod
+    def from_inversed_expected_log_scores(
+        cls,
+        inversed_expected_log_scores: list[float],
+        name: str = "performance_weighted",
+    ) -> PerformanceWeightedAggregationStrategy:
+        """
+        Weighs each forecaster by the inverse of its average inversed
+        expected log score (lower scores are better)
+        """
+        scores = np.asarray(inversed_expected_log_scores, dtype=float)
+        assert np.all(scores > 0), "Scores must be positive"
+        return cls((1 / scores).tolist(), name)
+
+    def aggregate_probabilities(self, probabilities: np.ndarray) -> np.ndarray:
+        if len(probabilities) != len(self.weights):
+            logger.warning(
+                f"Got {len(probabilities)} predictions for {len(self.weights)} weights. Using an unweighted mean instead"
+            )
+            return probabilities.mean(axis=0)
+        return np.average(probabilities, axis=0, weights=self.weights)
+
+
+AggregationStrategy.register(MeanAggregationStrategy())
+AggregationStrategy.register(MedianAggregationStrategy())
+AggregationStrategy.register(TrimmedMeanAggregationStrategy())
+AggregationStrategy.register(LogPoolAggregationStrategy())
+AggregationStrategy.register(ExtremizedLogOddsAggregationStrategy())
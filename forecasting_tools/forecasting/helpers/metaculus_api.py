@@ -10,7 +10,6 @@ import re
 from datetime import datetime, timedelta
 from typing import Any, Literal, TypeVar
 
-import requests
 import typeguard
 from pydantic import BaseModel
 
@@ -21,6 +20,7 @@ from forecasting_tools.forecasting.questions_and_reports.questions import (
     MultipleChoiceQuestion,
     NumericQuestion,
 )
+from forecasting_tools.util.http_session_pool import HttpSessionPool
 from forecasting_tools.util.misc import raise_for_status_with_additional_info
 
 logger = logging.getLogger(__name__)
@@ -49,7 +49,7 @@ class MetaculusApi:
 
     @classmethod
     def post_question_comment(cls, post_id: int, comment_text: str) -> None:
-        response = requests.post(
+        response = HttpSessionPool.get_sync_session().post(
             f"{cls.API_BASE_URL}/comments/create/",
             json={
                 "on_post": post_id,
@@ -125,7 +125,7 @@ class MetaculusApi:
     def get_question_by_post_id(cls, post_id: int) -> MetaculusQuestion:
         logger.info(f"Retrieving question details for question {post_id}")
         url = f"{cls.API_BASE_URL}/posts/{post_id}/"
-        response = requests.get(
+        response = HttpSessionPool.get_sync_session().get(
             url,
             **cls._get_auth_headers(),  # type: ignore
         )
@@ -210,7 +210,7 @@ class MetaculusApi:
         cls, question_id: int, forecast_payload: dict
     ) -> None:
         url = f"{cls.API_BASE_URL}/questions/forecast/"
-        response = requests.post(
+        response = HttpSessionPool.get_sync_session().post(
             url,
             json=[
                 {
@@ -233,7 +233,7 @@ class MetaculusApi:
             or num_requested <= cls.MAX_QUESTIONS_FROM_QUESTION_API_PER_REQUEST
         ), "You cannot get more than 100 questions at a time"
         url = f"{cls.API_BASE_URL}/posts/"
-        response = requests.get(url, params=params, **cls._get_auth_headers())  # type: ignore
+        response = HttpSessionPool.get_sync_session().get(url, params=params, **cls._get_auth_headers())  # type: ignore
         raise_for_status_with_additional_info(response)
         data = json.loads(response.content)
         results = data["results"]
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+
+from forecasting_tools.forecasting.questions_and_reports.multiple_choice_report import (
+    MultipleChoiceReport,
+)
+from forecasting_tools.forecasting.questions_and_reports.numeric_report import (
+    NumericReport,
+)
+from forecasting_tools.forecasting.questions_and_reports.questions import (
+    BinaryQuestion,
+    MetaculusQuestion,
+    MultipleChoiceQuestion,
+    NumericQuestion,
+)
+
+
+class PredictionDispersion:
+    """
+    Measures how much predictions for one question disagree. The dispersion
+    is the largest standard deviation of any probability across predictions
+    (the probability itself for binary questions, each option for multiple
+    choice, and each cdf point for numeric), so one threshold works for
+    every question type.
+    """
+
+    @classmethod
+    def calculate(
+        cls, predictions: list[Any], question: MetaculusQuestion
+    ) -> float:
+        assert predictions, "No predictions to measure"
+        probabilities = cls.__stack_probabilities(predictions, question)
+        if len(probabilities) < 2:
+            return 0.0
+        return float(np.max(np.std(probabilities, axis=0)))
+
+    @classmethod
+    def __stack_probabilities(
+        cls, predictions: list[Any], question: MetaculusQuestion
+    ) -> np.ndarray:
+        if isinstance(question, BinaryQuestion):
+            return np.asarray(predictions, dtype=float)
+        elif isinstance(question, MultipleChoiceQuestion):
+            _, probabilities = MultipleChoiceReport.stack_probabilities(
+                predictions
+            )
+            return probabilities
+        elif isinstance(question, NumericQuestion):
+            _, cdf_probabilities = NumericReport.stack_cdf_probabilities(
+                predictions
+            )
+            return cdf_probabilities
+        else:
+            raise ValueError(
+                f"Dispersion can't be calculated for {type(question)}"
+            )
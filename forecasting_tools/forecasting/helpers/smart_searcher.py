@@ -46,6 +46,7 @@ class SmartSearcher(OutputsText, AiModel):
             include_text=True,
             include_highlights=True,
             num_results=num_sites_per_search,
+            cache_results=True,
         )
         self.llm = BasicLlm(temperature=temperature)
         self.include_works_cited_list = include_works_cited_list
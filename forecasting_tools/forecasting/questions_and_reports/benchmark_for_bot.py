@@ -1,13 +1,13 @@
 from datetime import datetime
 
-import typeguard
+import numpy as np
 from pydantic import BaseModel, Field
 
 from forecasting_tools.forecasting.questions_and_reports.binary_report import (
     BinaryReport,
 )
 from forecasting_tools.forecasting.questions_and_reports.forecast_report import (
-    ForecastReport,
+    ScoreType,
 )
 from forecasting_tools.forecasting.questions_and_reports.multiple_choice_report import (
     MultipleChoiceReport,
@@ -15,6 +15,10 @@ from forecasting_tools.forecasting.questions_and_reports.multiple_choice_report
 from forecasting_tools.forecasting.questions_and_reports.numeric_report import (
     NumericReport,
 )
+from forecasting_tools.forecasting.questions_and_reports.report_scorer import (
+    ReportScorer,
+    ScoreSummary,
+)
 from forecasting_tools.util.jsonable import Jsonable
 
 
@@ -31,10 +35,15 @@ class BenchmarkForBot(BaseModel, Jsonable):
 
     @property
     def average_inverse_expected_log_score(self) -> float:
-        reports = typeguard.check_type(
-            self.forecast_reports,
-            list[ForecastReport],
-        )
-        return ForecastReport.calculate_average_inverse_expected_log_score(
-            reports
-        )
+        scores = ReportScorer.calculate_scores(self.forecast_reports)[
+            ScoreType.INVERSED_EXPECTED_LOG_SCORE
+        ]
+        assert len(scores) > 0, "There are no reports to score"
+        assert not np.isnan(
+            scores
+        ).any(), "All reports need a community prediction to be scored"
+        return float(scores.mean())
+
+    @property
+    def score_summaries(self) -> dict[ScoreType, ScoreSummary]:
+        return ReportScorer.summarize_scores(self.forecast_reports)
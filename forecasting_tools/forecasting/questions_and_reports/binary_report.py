@@ -8,6 +8,7 @@ from pydantic import AliasChoices, Field, field_validator
 from forecasting_tools.forecasting.helpers.metaculus_api import MetaculusApi
 from forecasting_tools.forecasting.questions_and_reports.forecast_report import (
     ForecastReport,
+    ScoreType,
 )
 from forecasting_tools.forecasting.questions_and_reports.questions import (
     BinaryQuestion,
@@ -68,6 +69,39 @@ class BinaryReport(ForecastReport):
             return None
         return abs(self.prediction - self.community_prediction)
 
+    @classmethod
+    def calculate_scores_of_reports(
+        cls, reports: list[BinaryReport]
+    ) -> dict[ScoreType, np.ndarray]:
+        predictions = np.array(
+            [report.prediction for report in reports], dtype=float
+        )
+        community_predictions = np.array(
+            [
+                (
+                    report.community_prediction
+                    if report.community_prediction is not None
+                    else np.nan
+                )
+                for report in reports
+            ],
+            dtype=float,
+        )
+        c = community_predictions
+        p = predictions
+        with np.errstate(divide="ignore", invalid="ignore"):
+            inversed_expected_log_scores = -1 * (
+                c * np.log2(p) + (1 - c) * np.log2(1 - p)
+            )
+        return {
+            ScoreType.INVERSED_EXPECTED_LOG_SCORE: inversed_expected_log_scores,
+            ScoreType.EXPECTED_BRIER_SCORE: c * (1 - p) ** 2 + (1 - c) * p**2,
+            ScoreType.EXPECTED_BASELINE_SCORE: cls._calculate_expected_baseline_scores(
+                inversed_expected_log_scores, 2
+            ),
+            ScoreType.DEVIATION_POINTS: np.abs(p - c),
+        }
+
     @staticmethod
     def calculate_average_deviation_points(
         reports: list[BinaryReport],
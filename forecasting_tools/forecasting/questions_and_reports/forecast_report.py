@@ -2,8 +2,10 @@ from __future__ import annotations
 
 import logging
 from abc import ABC, abstractmethod
+from enum import Enum
 from typing import Any, Generic, TypeVar
 
+import numpy as np
 from pydantic import BaseModel, field_validator
 
 from forecasting_tools.forecasting.questions_and_reports.questions import (
@@ -18,6 +20,18 @@ logger = logging.getLogger(__name__)
 T = TypeVar("T")
 
 
+class ScoreType(Enum):
+    """
+    Scores of a forecast when the community prediction is assumed to be
+    the true probability (so questions don't need to be resolved yet)
+    """
+
+    INVERSED_EXPECTED_LOG_SCORE = "inversed_expected_log_score"
+    EXPECTED_BRIER_SCORE = "expected_brier_score"
+    EXPECTED_BASELINE_SCORE = "expected_baseline_score"
+    DEVIATION_POINTS = "deviation_points"
+
+
 class ReasonedPrediction(BaseModel, Generic[T]):
     prediction_value: T
     reasoning: str
@@ -27,6 +41,7 @@ class ResearchWithPredictions(BaseModel, Generic[T]):
     research_report: str
     summary_report: str
     predictions: list[ReasonedPrediction[T]]
+    number_of_skipped_predictions: int = 0
 
 
 class ForecastReport(BaseModel, Jsonable, ABC):
@@ -93,6 +108,31 @@ class ForecastReport(BaseModel, Jsonable, ABC):
         )
         return average_deviation_score
 
+    @classmethod
+    def calculate_scores_of_reports(
+        cls, reports: list[Any]
+    ) -> dict[ScoreType, np.ndarray]:
+        """
+        Scores a list of reports of this class at once using numpy arrays.
+        Each array has one score per report (NaN if the report has no
+        community prediction). See report_scorer.py to score mixed lists.
+        """
+        raise NotImplementedError("Not implemented")
+
+    @staticmethod
+    def _calculate_expected_baseline_scores(
+        inversed_expected_log_scores: np.ndarray,
+        number_of_outcomes: np.ndarray | int,
+    ) -> np.ndarray:
+        """
+        Baseline score (100 * (1 + log(p) / log(number of outcomes))) expected
+        under the community prediction. 0 is as good as a uniform forecast
+        and 100 is a certain and correct forecast.
+        """
+        return 100 * (
+            1 - inversed_expected_log_scores / np.log2(number_of_outcomes)
+        )
+
     @classmethod
     @abstractmethod
     async def aggregate_predictions(
@@ -1,8 +1,12 @@
+from __future__ import annotations
+
+import numpy as np
 from pydantic import BaseModel, Field
 
 from forecasting_tools.forecasting.helpers.metaculus_api import MetaculusApi
 from forecasting_tools.forecasting.questions_and_reports.forecast_report import (
     ForecastReport,
+    ScoreType,
 )
 from forecasting_tools.forecasting.questions_and_reports.questions import (
     MultipleChoiceQuestion,
@@ -24,11 +28,80 @@ class MultipleChoiceReport(ForecastReport):
 
     @property
     def inversed_expected_log_score(self) -> float | None:
-        raise NotImplementedError("Not implemented")
+        if self.community_prediction is None:
+            return None
+        scores = self.calculate_scores_of_reports([self])
+        return float(scores[ScoreType.INVERSED_EXPECTED_LOG_SCORE][0])
 
     @property
     def community_prediction(self) -> PredictedOptionList | None:
-        raise NotImplementedError("Not implemented")
+        community_probabilities = (
+            self.question.community_prediction_at_access_time
+        )
+        if community_probabilities is None:
+            return None
+        return PredictedOptionList(
+            predicted_options=[
+                PredictedOption(option_name=option, probability=probability)
+                for option, probability in zip(
+                    self.question.options, community_probabilities
+                )
+            ]
+        )
+
+    @classmethod
+    def calculate_scores_of_reports(
+        cls, reports: list[MultipleChoiceReport]
+    ) -> dict[ScoreType, np.ndarray]:
+        """
+        Questions can have different numbers of options, so probabilities are
+        put in (reports, most options) matrices padded with zeros
+        """
+        max_options = max(
+            (len(report.question.options) for report in reports), default=0
+        )
+        predictions = np.zeros((len(reports), max_options))
+        community_predictions = np.zeros((len(reports), max_options))
+        number_of_options = np.zeros(len(reports))
+        for row, report in enumerate(reports):
+            options = report.question.options
+            probability_of_option = {
+                option.option_name: option.probability
+                for option in report.prediction.predicted_options
+            }
+            predictions[row, : len(options)] = [
+                probability_of_option.get(option, 0.0) for option in options
+            ]
+            community_probabilities = (
+                report.question.community_prediction_at_access_time
+            )
+            if community_probabilities is None:
+                community_predictions[row] = np.nan
+            else:
+                community_predictions[row, : len(options)] = (
+                    community_probabilities
+                )
+            number_of_options[row] = len(options)
+
+        c = community_predictions
+        p = predictions
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_of_predictions = np.where(c != 0, np.log2(p), 0)
+            inversed_expected_log_scores = -1 * np.sum(
+                c * log_of_predictions, axis=1
+            )
+            expected_brier_scores = np.sum(p**2 - 2 * c * p, axis=1) + 1
+            deviation_points = (
+                np.sum(np.abs(p - c), axis=1) / number_of_options
+            )
+        return {
+            ScoreType.INVERSED_EXPECTED_LOG_SCORE: inversed_expected_log_scores,
+            ScoreType.EXPECTED_BRIER_SCORE: expected_brier_scores,
+            ScoreType.EXPECTED_BASELINE_SCORE: cls._calculate_expected_baseline_scores(
+                inversed_expected_log_scores, number_of_options
+            ),
+            ScoreType.DEVIATION_POINTS: deviation_points,
+        }
 
     async def publish_report_to_metaculus(self) -> None:
         if self.question.id_of_question is None:
@@ -50,46 +123,50 @@ class MultipleChoiceReport(ForecastReport):
         predictions: list[PredictedOptionList],
         question: MultipleChoiceQuestion,
     ) -> PredictedOptionList:
-        first_list_option_names = [
-            pred_option.option_name
-            for pred_option in predictions[0].predicted_options
-        ]
+        """
+        Averages each option's probability. Other ways to aggregate are in
+        aggregation_strategies (e.g. MedianAggregationStrategy).
+        """
+        from forecasting_tools.forecasting.helpers.aggregation_strategies import (  # Imported here since aggregation_strategies imports this file
+            MeanAggregationStrategy,
+        )
 
-        # Check for predicted option consistency
-        for option_list in predictions:
-            current_option_names = {
-                option.option_name for option in option_list.predicted_options
-            }
-            assert current_option_names == set(
-                first_list_option_names
-            ), "All predictions must have the same option names"
+        return MeanAggregationStrategy().aggregate_predictions(
+            predictions, question
+        )
+
+    @classmethod
+    def stack_probabilities(
+        cls, predictions: list[PredictedOptionList]
+    ) -> tuple[list[str], np.ndarray]:
+        """
+        Returns the option names (in the order of the first prediction) and a
+        (predictions, options) matrix of probabilities
+        """
+        assert predictions, "No predictions to aggregate"
+        option_names = [
+            option.option_name for option in predictions[0].predicted_options
+        ]
+        index_of_option = {name: i for i, name in enumerate(option_names)}
+        probabilities = np.full((len(predictions), len(option_names)), np.nan)
+        for row, option_list in enumerate(predictions):
             assert len(option_list.predicted_options) == len(
-                first_list_option_names
+                option_names
             ), "All predictions must have the same number of options"
             for option in option_list.predicted_options:
                 assert (
-                    0 <= option.probability <= 1
-                ), "Predictions must be between 0 and 1"
-
-        new_predicted_options: list[PredictedOption] = []
-        for current_option_name in first_list_option_names:
-            probabilities_of_current_option = [
-                option.probability
-                for option_list in predictions
-                for option in option_list.predicted_options
-                if option.option_name == current_option_name
-            ]
-
-            average_probability = sum(probabilities_of_current_option) / len(
-                probabilities_of_current_option
-            )
-            new_predicted_options.append(
-                PredictedOption(
-                    option_name=current_option_name,
-                    probability=average_probability,
+                    option.option_name in index_of_option
+                ), "All predictions must have the same option names"
+                probabilities[row, index_of_option[option.option_name]] = (
+                    option.probability
                 )
-            )
-        return PredictedOptionList(predicted_options=new_predicted_options)
+        assert not np.isnan(
+            probabilities
+        ).any(), "All predictions must have the same option names"
+        assert np.all(
+            (0 <= probabilities) & (probabilities <= 1)
+        ), "Predictions must be between 0 and 1"
+        return option_names, probabilities
 
     @classmethod
     def make_readable_prediction(cls, prediction: PredictedOptionList) -> str:
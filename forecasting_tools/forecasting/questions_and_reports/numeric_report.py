@@ -1,13 +1,16 @@
 from __future__ import annotations
 
+import functools
 import logging
+from typing import ClassVar
 
 import numpy as np
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, PrivateAttr, field_validator
 
 from forecasting_tools.forecasting.helpers.metaculus_api import MetaculusApi
 from forecasting_tools.forecasting.questions_and_reports.forecast_report import (
     ForecastReport,
+    ScoreType,
 )
 from forecasting_tools.forecasting.questions_and_reports.questions import (
     NumericQuestion,
@@ -34,6 +37,9 @@ class NumericDistribution(BaseModel):
     upper_bound: float
     lower_bound: float
     zero_point: float | None
+    _cached_cdf_probabilities: tuple[tuple, np.ndarray] | None = PrivateAttr(
+        default=None
+    )
 
     @property
     def inversed_expected_log_score(self) -> float | None:
@@ -70,38 +76,103 @@ class NumericDistribution(BaseModel):
         """
         Turns a list of percentiles into a full distribution with 201 points
         cdf stands for 'continuous distribution function'
+        Use cdf_x_axis and cdf_probabilities when Percentile objects aren't needed
         """
-        # TODO: This function needs to be cleaned up and made more readable
+        percentiles = [
+            Percentile(value=value, percentile=percentile)
+            for value, percentile in zip(
+                self.cdf_x_axis.tolist(), self.cdf_probabilities.tolist()
+            )
+        ]
+        assert len(percentiles) == 201
+        return percentiles
 
-        percentiles = self.declared_percentiles
-        open_upper_bound = self.open_upper_bound
-        open_lower_bound = self.open_lower_bound
-        upper_bound = self.upper_bound
-        lower_bound = self.lower_bound
-        zero_point = self.zero_point
+    @property
+    def cdf_x_axis(self) -> np.ndarray:
+        """
+        The 201 values the cdf is evaluated at (log scaled if there is a zero point)
+        """
+        return self._generate_cdf_locations(
+            self.lower_bound, self.upper_bound, self.zero_point
+        )
 
-        # Convert to dict so I don't have to rewrite this whole function
+    @property
+    def cdf_probabilities(self) -> np.ndarray:
+        """
+        The cumulative probability at each value of cdf_x_axis.
+        Cached (and read only) until a field of the distribution changes
+        """
+        fields_of_cdf = (
+            tuple(
+                (percentile.value, percentile.percentile)
+                for percentile in self.declared_percentiles
+            ),
+            self.open_upper_bound,
+            self.open_lower_bound,
+            self.upper_bound,
+            self.lower_bound,
+            self.zero_point,
+        )
+        if (
+            self._cached_cdf_probabilities is not None
+            and self._cached_cdf_probabilities[0] == fields_of_cdf
+        ):
+            return self._cached_cdf_probabilities[1]
+
+        known_values, known_percentiles = self.__get_cdf_anchor_points()
+        probabilities = np.interp(
+            self.cdf_x_axis, known_values, known_percentiles
+        )
+        probabilities.setflags(write=False)
+        self._cached_cdf_probabilities = (fields_of_cdf, probabilities)
+        return probabilities
+
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def _generate_cdf_locations(
+        range_min: float, range_max: float, zero_point: float | None
+    ) -> np.ndarray:
+        """
+        Cached per set of bounds, so the returned array is read only
+        """
+        unit_interval = np.linspace(0, 1, 201)
+        if zero_point is None:
+            locations = range_min + (range_max - range_min) * unit_interval
+        else:
+            deriv_ratio = (range_max - zero_point) / (range_min - zero_point)
+            locations = range_min + (range_max - range_min) * (
+                deriv_ratio**unit_interval - 1
+            ) / (deriv_ratio - 1)
+        locations.setflags(write=False)
+        return locations
+
+    def __get_cdf_anchor_points(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the (value, percentile) points that the cdf is interpolated
+        between, sorted by value. These are the declared percentiles moved off
+        of closed bounds, plus points for the bounds themselves.
+        """
         percentile_values: dict[float, float] = {
             percentile.percentile * 100: percentile.value
-            for percentile in percentiles
+            for percentile in self.declared_percentiles
         }
 
         percentile_max = max(float(key) for key in percentile_values.keys())
         percentile_min = min(float(key) for key in percentile_values.keys())
-        range_min = lower_bound
-        range_max = upper_bound
+        range_min = self.lower_bound
+        range_max = self.upper_bound
         range_size = abs(range_max - range_min)
         buffer = 1 if range_size > 100 else 0.01 * range_size
 
         # Adjust any values that are exactly at the bounds
         for percentile, value in list(percentile_values.items()):
-            if not open_lower_bound and value <= range_min + buffer:
+            if not self.open_lower_bound and value <= range_min + buffer:
                 percentile_values[percentile] = range_min + buffer
-            if not open_upper_bound and value >= range_max - buffer:
+            if not self.open_upper_bound and value >= range_max - buffer:
                 percentile_values[percentile] = range_max - buffer
 
         # Set cdf values outside range
-        if open_upper_bound:
+        if self.open_upper_bound:
             if range_max > percentile_values[percentile_max]:
                 percentile_values[
                     int(100 - (0.5 * (100 - percentile_max)))
@@ -109,88 +180,21 @@ class NumericDistribution(BaseModel):
         else:
             percentile_values[100] = range_max
 
-        # Set cdf values outside range
-        if open_lower_bound:
+        if self.open_lower_bound:
             if range_min < percentile_values[percentile_min]:
                 percentile_values[int(0.5 * percentile_min)] = range_min
         else:
             percentile_values[0] = range_min
 
-        sorted_percentile_values = dict(sorted(percentile_values.items()))
-
-        # Normalize percentile keys
-        normalized_percentile_values = {}
-        for key, value in sorted_percentile_values.items():
-            percentile = float(key) / 100
-            normalized_percentile_values[percentile] = value
-
-        value_percentiles = {
-            value: key for key, value in normalized_percentile_values.items()
+        # If two percentiles share a value, the higher percentile is used
+        percentile_of_value = {
+            value: float(percentile) / 100
+            for percentile, value in sorted(percentile_values.items())
         }
-
-        # function for log scaled questions
-        def generate_cdf_locations(
-            range_min: float, range_max: float, zero_point: float | None
-        ) -> list[float]:
-            if zero_point is None:
-                scale = lambda x: range_min + (range_max - range_min) * x
-            else:
-                deriv_ratio = (range_max - zero_point) / (
-                    range_min - zero_point
-                )
-                scale = lambda x: range_min + (range_max - range_min) * (
-                    deriv_ratio**x - 1
-                ) / (deriv_ratio - 1)
-            return [scale(x) for x in np.linspace(0, 1, 201)]
-
-        cdf_xaxis = generate_cdf_locations(range_min, range_max, zero_point)
-
-        def linear_interpolation(
-            x_values: list[float], xy_pairs: dict[float, float]
-        ) -> list[float]:
-            # Sort the xy_pairs by x-values
-            sorted_pairs = sorted(xy_pairs.items())
-
-            # Extract sorted x and y values
-            known_x = [pair[0] for pair in sorted_pairs]
-            known_y = [pair[1] for pair in sorted_pairs]
-
-            # Initialize the result list
-            y_values = []
-
-            for x in x_values:
-                # Check if x is exactly in the known x values
-                if x in known_x:
-                    y_values.append(known_y[known_x.index(x)])
-                else:
-                    # Find the indices of the two nearest known x-values
-                    i = 0
-                    while i < len(known_x) and known_x[i] < x:
-                        i += 1
-                    # If x is outside the range of known x-values, use the nearest endpoint
-                    if i == 0:
-                        y_values.append(known_y[0])
-                    elif i == len(known_x):
-                        y_values.append(known_y[-1])
-                    else:
-                        # Perform linear interpolation
-                        x0, x1 = known_x[i - 1], known_x[i]
-                        y0, y1 = known_y[i - 1], known_y[i]
-
-                        # Linear interpolation formula
-                        y = y0 + (x - x0) * (y1 - y0) / (x1 - x0)
-                        y_values.append(y)
-
-            return y_values
-
-        continuous_cdf = linear_interpolation(cdf_xaxis, value_percentiles)
-
-        percentiles = [
-            Percentile(value=value, percentile=percentile)
-            for value, percentile in zip(cdf_xaxis, continuous_cdf)
-        ]
-        assert len(percentiles) == 201
-        return percentiles
+        sorted_values = sorted(percentile_of_value)
+        return np.array(sorted_values), np.array(
+            [percentile_of_value[value] for value in sorted_values]
+        )
 
     def get_representative_percentiles(
         self, num_percentiles: int = 5
@@ -221,40 +225,111 @@ class NumericDistribution(BaseModel):
 class NumericReport(ForecastReport):
     question: NumericQuestion
     prediction: NumericDistribution
+    MIN_PROBABILITY_MASS_FOR_SCORING: ClassVar[float] = 1e-6
+
+    @property
+    def inversed_expected_log_score(self) -> float | None:
+        if self.community_prediction is None:
+            return None
+        scores = self.calculate_scores_of_reports([self])
+        return float(scores[ScoreType.INVERSED_EXPECTED_LOG_SCORE][0])
+
+    @property
+    def community_prediction(self) -> list[float] | None:
+        """
+        The community cdf at the values of prediction.cdf_x_axis
+        """
+        return self.question.community_prediction_at_access_time
+
+    @classmethod
+    def calculate_scores_of_reports(
+        cls, reports: list[NumericReport]
+    ) -> dict[ScoreType, np.ndarray]:
+        """
+        The log and baseline scores use the probability mass in each of the
+        202 bins of the cdf (200 between its points plus the 2 out of bounds
+        tails). The brier score is the average brier score of the 201 binary
+        questions "Is the value below x?" for each point x of the cdf.
+        """
+        number_of_points = 201  # Points in each cdf
+        predicted_cdfs = np.zeros((len(reports), number_of_points))
+        community_cdfs = np.full((len(reports), number_of_points), np.nan)
+        for row, report in enumerate(reports):
+            predicted_cdfs[row] = report.prediction.cdf_probabilities
+            if report.community_prediction is not None:
+                community_cdfs[row] = report.community_prediction
+
+        predicted_masses = np.maximum(
+            np.diff(predicted_cdfs, axis=1, prepend=0, append=1),
+            cls.MIN_PROBABILITY_MASS_FOR_SCORING,
+        )
+        community_masses = np.diff(community_cdfs, axis=1, prepend=0, append=1)
+        inversed_expected_log_scores = -1 * np.sum(
+            np.where(
+                community_masses != 0,
+                community_masses * np.log2(predicted_masses),
+                0,
+            ),
+            axis=1,
+        )
+        p = predicted_cdfs
+        c = community_cdfs
+        return {
+            ScoreType.INVERSED_EXPECTED_LOG_SCORE: inversed_expected_log_scores,
+            ScoreType.EXPECTED_BRIER_SCORE: np.mean(
+                p**2 - 2 * p * c + c, axis=1
+            ),
+            ScoreType.EXPECTED_BASELINE_SCORE: cls._calculate_expected_baseline_scores(
+                inversed_expected_log_scores, number_of_points + 1
+            ),
+            ScoreType.DEVIATION_POINTS: np.mean(np.abs(p - c), axis=1),
+        }
 
     @classmethod
     async def aggregate_predictions(
         cls, predictions: list[NumericDistribution], question: NumericQuestion
     ) -> NumericDistribution:
-        assert predictions, "No predictions to aggregate"
-        cdfs = [prediction.cdf for prediction in predictions]
-        all_percentiles_of_cdf: list[list[float]] = []
-        all_values_of_cdf: list[list[float]] = []
-        x_axis: list[float] = [percentile.value for percentile in cdfs[0]]
-        for cdf in cdfs:
-            all_percentiles_of_cdf.append(
-                [percentile.percentile for percentile in cdf]
-            )
-            all_values_of_cdf.append([percentile.value for percentile in cdf])
+        x_axis, all_cdf_probabilities = cls.stack_cdf_probabilities(
+            predictions
+        )
+        median_probabilities = np.median(all_cdf_probabilities, axis=0)
+        return cls.make_distribution_from_cdf(
+            x_axis, median_probabilities, question
+        )
 
-        for cdf in cdfs:
-            for i in range(len(cdf)):
-                if cdf[i].value != x_axis[i]:
-                    raise ValueError("X axis between cdfs is not the same")
+    @classmethod
+    def stack_cdf_probabilities(
+        cls, predictions: list[NumericDistribution]
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the shared cdf x axis and a (predictions, cdf points) matrix
+        of cdf probabilities
+        """
+        assert predictions, "No predictions to aggregate"
+        x_axis = predictions[0].cdf_x_axis
+        for prediction in predictions:
+            if not np.array_equal(prediction.cdf_x_axis, x_axis):
+                raise ValueError("X axis between cdfs is not the same")
+        all_cdf_probabilities = np.stack(
+            [prediction.cdf_probabilities for prediction in predictions]
+        )
+        return x_axis, all_cdf_probabilities
 
-        median_percentile_list: list[float] = np.median(
-            np.array(all_percentiles_of_cdf), axis=0
-        ).tolist()
-        median_cdf = [
+    @classmethod
+    def make_distribution_from_cdf(
+        cls,
+        x_axis: np.ndarray,
+        cdf_probabilities: np.ndarray,
+        question: NumericQuestion,
+    ) -> NumericDistribution:
+        cdf = [
             Percentile(value=value, percentile=percentile)
-            for value, percentile in zip(x_axis, median_percentile_list)
+            for value, percentile in zip(
+                x_axis.tolist(), cdf_probabilities.tolist()
+            )
         ]
-
-        if not predictions:
-            raise ValueError("No predictions to aggregate")
-
         return NumericDistribution(
-            declared_percentiles=median_cdf,
+            declared_percentiles=cdf,
             open_upper_bound=question.open_upper_bound,
             open_lower_bound=question.open_lower_bound,
             upper_bound=question.upper_bound,
@@ -275,9 +350,7 @@ class NumericReport(ForecastReport):
     async def publish_report_to_metaculus(self) -> None:
         if self.question.id_of_question is None:
             raise ValueError("Question ID is None")
-        cdf_probabilities = [
-            percentile.percentile for percentile in self.prediction.cdf
-        ]
+        cdf_probabilities = self.prediction.cdf_probabilities.tolist()
         MetaculusApi.post_numeric_question_prediction(
             self.question.id_of_question, cdf_probabilities
         )
@@ -131,6 +131,20 @@ class MetaculusQuestion(BaseModel, Jsonable):
 
         raise ValueError(f"Unable to parse date: {date_value}")
 
+    @classmethod
+    def _get_community_forecast_values_from_api_json(
+        cls, api_json: dict
+    ) -> list[float] | None:
+        """
+        Option probabilities for multiple choice questions and the 201 point
+        cdf for numeric questions
+        """
+        try:
+            forecast_values = api_json["question"]["aggregations"]["recency_weighted"]["latest"]["forecast_values"]  # type: ignore
+            return [float(value) for value in forecast_values]
+        except (KeyError, TypeError):
+            return None
+
     @classmethod
     def get_api_type_name(cls) -> str:
         raise NotImplementedError(
@@ -256,6 +270,7 @@ class NumericQuestion(MetaculusQuestion, BoundedQuestionMixin):
     open_upper_bound: bool
     open_lower_bound: bool
     zero_point: float | None = None
+    community_prediction_at_access_time: list[float] | None = None
 
     @classmethod
     def from_metaculus_api_json(cls, api_json: dict) -> NumericQuestion:
@@ -276,6 +291,9 @@ class NumericQuestion(MetaculusQuestion, BoundedQuestionMixin):
             open_upper_bound=open_upper_bound,
             open_lower_bound=open_lower_bound,
             zero_point=zero_point,
+            community_prediction_at_access_time=cls._get_community_forecast_values_from_api_json(
+                api_json
+            ),
             **normal_metaculus_question.model_dump(),
         )
 
@@ -286,12 +304,16 @@ class NumericQuestion(MetaculusQuestion, BoundedQuestionMixin):
 
 class MultipleChoiceQuestion(MetaculusQuestion):
     options: list[str]
+    community_prediction_at_access_time: list[float] | None = None
 
     @classmethod
     def from_metaculus_api_json(cls, api_json: dict) -> MultipleChoiceQuestion:
         normal_metaculus_question = super().from_metaculus_api_json(api_json)
         return MultipleChoiceQuestion(
             options=api_json["question"]["options"],  # type: ignore
+            community_prediction_at_access_time=cls._get_community_forecast_values_from_api_json(
+                api_json
+            ),
             **normal_metaculus_question.model_dump(),
         )
 
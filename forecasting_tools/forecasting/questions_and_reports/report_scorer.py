@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from typing import Sequence
+
+import numpy as np
+from pydantic import BaseModel
+
+from forecasting_tools.forecasting.questions_and_reports.forecast_report import (
+    ForecastReport,
+    ScoreType,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ScoreSummary(BaseModel):
+    score_type: ScoreType
+    average: float
+    lower_bound: float
+    upper_bound: float
+    confidence_level: float
+    number_of_scored_reports: int
+
+
+class ReportScorer:
+    """
+    Scores many reports at once. Reports are grouped by report type, each
+    group is turned into numpy arrays and scored with one vectorized call
+    (see calculate_scores_of_reports on each report type), and the scores are
+    put back in the order of the reports given.
+    """
+
+    CONFIDENCE_LEVEL = 0.95
+    NUMBER_OF_BOOTSTRAP_RESAMPLES = 1000
+    RESAMPLES_PER_CHUNK = 100  # Limits memory use for large lists
+
+    @classmethod
+    def calculate_scores(
+        cls, reports: Sequence[ForecastReport]
+    ) -> dict[ScoreType, np.ndarray]:
+        """
+        Returns one score per report for each score type (NaN for reports
+        without a community prediction)
+        """
+        scores = {
+            score_type: np.full(len(reports), np.nan)
+            for score_type in ScoreType
+        }
+        indexes_of_report_type: dict[type[ForecastReport], list[int]] = (
+            defaultdict(list)
+        )
+        for index, report in enumerate(reports):
+            indexes_of_report_type[type(report)].append(index)
+
+        for report_type, indexes in indexes_of_report_type.items():
+            scores_of_type = report_type.calculate_scores_of_reports(
+                [reports[index] for index in indexes]
+            )
+            for score_type, type_scores in scores_of_type.items():
+                scores[score_type][indexes] = type_scores
+        return scores
+
+    @classmethod
+    def summarize_scores(
+        cls,
+        reports: Sequence[ForecastReport],
+        confidence_level: float = CONFIDENCE_LEVEL,
+        number_of_resamples: int = NUMBER_OF_BOOTSTRAP_RESAMPLES,
+        seed: int = 0,
+    ) -> dict[ScoreType, ScoreSummary]:
+        """
+        Averages each score over the reports that have a community prediction,
+        with a bootstrapped confidence interval for the average
+        """
+        summaries: dict[ScoreType, ScoreSummary] = {}
+        for score_type, scores in cls.calculate_scores(reports).items():
+            scored = scores[~np.isnan(scores)]
+            if len(scored) < len(scores):
+                logger.debug(
+                    f"{len(scores) - len(scored)} of {len(scores)} reports could not be scored for {score_type.value}"
+                )
+            lower_bound, upper_bound = (
+                cls.calculate_bootstrap_confidence_interval(
+                    scored, confidence_level, number_of_resamples, seed
+                )
+            )
+            summaries[score_type] = ScoreSummary(
+                score_type=score_type,
+                average=float(scored.mean()) if len(scored) > 0 else np.nan,
+                lower_bound=lower_bound,
+                upper_bound=upper_bound,
+                confidence_level=confidence_level,
+                number_of_scored_reports=len(scored),
+            )
+        return summaries
+
+    @classmethod
+    def calculate_bootstrap_confidence_interval(
+        cls,
+        scores: np.ndarray,
+        confidence_level: float = CONFIDENCE_LEVEL,
+        number_of_resamples: int = NUMBER_OF_BOOTSTRAP_RESAMPLES,
+        seed: int = 0,
+    ) -> tuple[float, float]:
+        """
+        Percentile bootstrap interval for the mean of the scores
+        """
+        assert 0 < confidence_level < 1
+        assert number_of_resamples > 0
+        if len(scores) == 0:
+            return np.nan, np.nan
+
+        random_generator = np.random.default_rng(seed)
+        resampled_means: list[np.ndarray] = []
+        for chunk_start in range(
+            0, number_of_resamples, cls.RESAMPLES_PER_CHUNK
+        ):
+            chunk_size = min(
+                cls.RESAMPLES_PER_CHUNK, number_of_resamples - chunk_start
+            )
+            resampled_indexes = random_generator.integers(
+                0, len(scores), size=(chunk_size, len(scores))
+            )
+            resampled_means.append(scores[resampled_indexes].mean(axis=1))
+
+        tail_probability = (1 - confidence_level) / 2
+        lower_bound, upper_bound = np.quantile(
+            np.concatenate(resampled_means),
+            [tail_probability, 1 - tail_probability],
+        )
+        return float(lower_bound), float(upper_bound)
@@ -1,22 +1,29 @@
 import asyncio
 import logging
-import os
-import random
+from typing import Callable
 
 import numpy as np
-import requests
-from openai import OpenAI
-from sklearn.metrics.pairwise import cosine_similarity
 
 from forecasting_tools.ai_models.ai_utils.ai_misc import clean_indents
+from forecasting_tools.ai_models.embedding_providers import (
+    EmbeddingProvider,
+    FallbackEmbeddingProvider,
+    HuggingFaceApiEmbeddingProvider,
+    OpenAiEmbeddingProvider,
+)
 from forecasting_tools.forecasting.helpers.configured_llms import BasicLlm
 from forecasting_tools.forecasting.helpers.smart_searcher import SmartSearcher
-from forecasting_tools.util.misc import raise_for_status_with_additional_info
+from forecasting_tools.util.random_projection_lsh import RandomProjectionLsh
 
 logger = logging.getLogger(__name__)
 
 
 class Deduplicator:
+    EMBEDDING_PROVIDER: EmbeddingProvider = FallbackEmbeddingProvider(
+        [HuggingFaceApiEmbeddingProvider(), OpenAiEmbeddingProvider()]
+    )
+    EXACT_SIMILARITY_SEARCH_LIMIT = 500
+    LLM_BATCH_SIZE = 8  # Roughly what GPT can handle well
 
     @classmethod
     async def deduplicate_list_in_batches(
@@ -24,38 +31,162 @@ class Deduplicator:
         items_to_deduplicate: list[str],
         prompt_context: str,
         initial_semantic_threshold: float = 0.85,
+        ambiguity_threshold: float = 0.65,
     ) -> list[str]:
-        semantic_deduplicated_items = (
-            await cls.__deduplicate_list_using_semantic_similarity(
-                items_to_deduplicate, initial_semantic_threshold
-            )
+        """
+        Items more similar than initial_semantic_threshold to an earlier item
+        are dropped without asking an LLM. The remaining items are clustered by
+        pairs more similar than ambiguity_threshold, and only these ambiguous
+        clusters are sent to the LLM (so the number of LLM calls grows with
+        the number of ambiguous clusters, not the size of the list).
+        """
+        unique_items = list(dict.fromkeys(items_to_deduplicate))
+        if len(unique_items) == 0:
+            return []
+        embeddings = await cls.__get_normalized_embeddings(unique_items)
+        first_indexes, second_indexes, similarities = cls.__find_similar_pairs(
+            embeddings, ambiguity_threshold
         )
-        shuffled_items = semantic_deduplicated_items.copy()
-        random.shuffle(shuffled_items)
-
-        batch_size = 8  # Roughly what GPT can handle well
-        batches = [
-            shuffled_items[i : i + batch_size]
-            for i in range(0, len(shuffled_items), batch_size)
-        ]
+        is_certain_duplicate = similarities > initial_semantic_threshold
+        kept_indexes = cls.__keep_items_not_similar_to_earlier_items(
+            len(unique_items),
+            first_indexes[is_certain_duplicate],
+            second_indexes[is_certain_duplicate],
+        )
+        similar_pairs = list(zip(first_indexes, second_indexes))
+        clusters = cls.__cluster_items(kept_indexes, similar_pairs)
 
-        batch_tasks = [
-            cls.__deduplicate_list_in_batch(batch, prompt_context)
-            for batch in batches
+        most_similar_first = np.argsort(-similarities, kind="stable")
+        similar_pairs_by_similarity = [
+            (int(similar_pairs[i][0]), int(similar_pairs[i][1]))
+            for i in most_similar_first
         ]
-        deduplicated_batches = await asyncio.gather(*batch_tasks)
-        deduplicated_batches_flattened = [
-            item for sublist in deduplicated_batches for item in sublist
+        ambiguous_clusters = [
+            cluster for cluster in clusters if len(cluster) > 1
         ]
-
-        final_deduplicated_list = await cls.__deduplicate_list_in_batch(
-            deduplicated_batches_flattened, prompt_context
+        deduplicated_clusters = await asyncio.gather(
+            *[
+                cls.__deduplicate_cluster(
+                    cluster,
+                    unique_items,
+                    similar_pairs_by_similarity,
+                    prompt_context,
+                )
+                for cluster in ambiguous_clusters
+            ]
         )
+        logger.info(
+            f"Sent {len(ambiguous_clusters)} ambiguous clusters of {len(kept_indexes)} semantically unique items to the LLM"
+        )
+
+        items_without_similar_items = {
+            unique_items[cluster[0]]
+            for cluster in clusters
+            if len(cluster) == 1
+        }
+        items_kept_by_llm = {
+            unique_items[index]
+            for cluster in deduplicated_clusters
+            for index in cluster
+        }
+        final_deduplicated_list = [
+            item
+            for item in unique_items
+            if item in items_without_similar_items or item in items_kept_by_llm
+        ]
         cls.__log_deduplication_results(
             items_to_deduplicate, final_deduplicated_list
         )
         return final_deduplicated_list
 
+    @classmethod
+    async def __deduplicate_cluster(
+        cls,
+        cluster: list[int],
+        items: list[str],
+        similar_pairs_by_similarity: list[tuple[int, int]],
+        prompt_context: str,
+    ) -> list[int]:
+        """
+        Returns the indexes of the cluster that the LLM kept.
+        Clusters too big for one LLM call are split into batches of their most
+        similar items, and the survivors of all batches get another pass (so
+        duplicates that landed in different batches are compared). Passes
+        stop once the survivors fit in one batch or a pass removes nothing.
+        """
+        if len(cluster) == 1:
+            return cluster
+        if len(cluster) <= cls.LLM_BATCH_SIZE:
+            cluster_items = [items[index] for index in cluster]
+            kept_items = await cls.__deduplicate_list_in_batch(
+                cluster_items, prompt_context
+            )
+            return [index for index in cluster if items[index] in kept_items]
+
+        batches = cls.__split_into_batches_of_most_similar_items(
+            cluster, similar_pairs_by_similarity
+        )
+        deduplicated_batches = await asyncio.gather(
+            *[
+                cls.__deduplicate_cluster(
+                    batch, items, similar_pairs_by_similarity, prompt_context
+                )
+                for batch in batches
+            ]
+        )
+        kept_indexes = {
+            index for batch in deduplicated_batches for index in batch
+        }
+        survivors = [index for index in cluster if index in kept_indexes]
+        if len(survivors) == len(cluster):
+            return survivors
+        return await cls.__deduplicate_cluster(
+            survivors, items, similar_pairs_by_similarity, prompt_context
+        )
+
+    @classmethod
+    def __split_into_batches_of_most_similar_items(
+        cls,
+        cluster: list[int],
+        similar_pairs_by_similarity: list[tuple[int, int]],
+    ) -> list[list[int]]:
+        """
+        Joins the most similar pairs first (like __cluster_items), but never
+        lets a group grow past the batch size. Small groups are then packed
+        together so no batch is wasted on a single item.
+        """
+        parent_of = {index: index for index in cluster}
+        size_of = {index: 1 for index in cluster}
+
+        def find_root(index: int) -> int:
+            while parent_of[index] != index:
+                parent_of[index] = parent_of[parent_of[index]]
+                index = parent_of[index]
+            return index
+
+        for first, second in similar_pairs_by_similarity:
+            if first not in parent_of or second not in parent_of:
+                continue
+            first_root, second_root = find_root(first), find_root(second)
+            combined_size = size_of[first_root] + size_of[second_root]
+            if (
+                first_root != second_root
+                and combined_size <= cls.LLM_BATCH_SIZE
+            ):
+                parent_of[second_root] = first_root
+                size_of[first_root] = combined_size
+
+        groups: dict[int, list[int]] = {}
+        for index in cluster:
+            groups.setdefault(find_root(index), []).append(index)
+
+        batches: list[list[int]] = [[]]
+        for group in groups.values():
+            if len(batches[-1]) + len(group) > cls.LLM_BATCH_SIZE:
+                batches.append([])
+            batches[-1].extend(group)
+        return batches
+
     @classmethod
     async def __deduplicate_list_in_batch(
         cls, items_to_deduplicate: list[str], prompt_context: str
@@ -117,6 +248,34 @@ class Deduplicator:
         items: list[str],
         use_internet_search: bool = False,
         threshold_for_initial_semantic_check: float = 0.85,
+        check_items_in_parallel: bool = False,
+    ) -> list[str]:
+        """
+        Keeps each item that is not a duplicate of an earlier kept item.
+        check_items_in_parallel gives the same result in fewer round trips,
+        at the cost of more LLM calls (see __deduplicate_in_speculative_waves)
+        """
+        if check_items_in_parallel:
+            deduplicated_items = await cls.__deduplicate_in_speculative_waves(
+                items,
+                use_internet_search,
+                threshold_for_initial_semantic_check,
+            )
+        else:
+            deduplicated_items = await cls.__deduplicate_sequentially(
+                items,
+                use_internet_search,
+                threshold_for_initial_semantic_check,
+            )
+        cls.__log_deduplication_results(items, deduplicated_items)
+        return deduplicated_items
+
+    @classmethod
+    async def __deduplicate_sequentially(
+        cls,
+        items: list[str],
+        use_internet_search: bool,
+        threshold_for_initial_semantic_check: float,
     ) -> list[str]:
         deduplicated_items: list[str] = []
         for item in items:
@@ -128,9 +287,93 @@ class Deduplicator:
             )
             if not is_duplicate:
                 deduplicated_items.append(item)
-        cls.__log_deduplication_results(items, deduplicated_items)
         return deduplicated_items
 
+    @classmethod
+    async def __deduplicate_in_speculative_waves(
+        cls,
+        items: list[str],
+        use_internet_search: bool,
+        threshold_for_initial_semantic_check: float,
+    ) -> list[str]:
+        """
+        Each wave first checks every undecided item (concurrently) against all
+        earlier items that are kept or still undecided. If an item is not a
+        duplicate of that superset, it can't be a duplicate of the earlier
+        items that end up kept, so it is kept.
+        A reconciliation pass then checks the remaining undecided items against
+        only the earlier items that are kept (including ones kept this wave).
+        Being a duplicate of that subset means it is a duplicate of the final
+        set too, so it is dropped. If no earlier item is undecided, the subset
+        is the final set and the item is decided either way.
+        Undecided items are checked again in the next wave.
+        """
+        is_kept: list[bool | None] = [None] * len(items)
+        number_of_waves = 0
+        while None in is_kept:
+            optimistic_results = await cls.__check_undecided_items(
+                items,
+                is_kept,
+                lambda kept: kept is not False,
+                use_internet_search,
+                threshold_for_initial_semantic_check,
+            )
+            for index, is_duplicate in optimistic_results.items():
+                if not is_duplicate:
+                    is_kept[index] = True
+
+            reconciliation_results = await cls.__check_undecided_items(
+                items,
+                is_kept,
+                lambda kept: kept is True,
+                use_internet_search,
+                threshold_for_initial_semantic_check,
+            )
+            first_undecided_index = next(iter(reconciliation_results), None)
+            for index, is_duplicate in reconciliation_results.items():
+                if is_duplicate:
+                    is_kept[index] = False
+                elif index == first_undecided_index:
+                    is_kept[index] = True
+            number_of_waves += 1
+
+        logger.info(
+            f"Checked {len(items)} items for duplicates in {number_of_waves} waves"
+        )
+        return [item for item, kept in zip(items, is_kept) if kept]
+
+    @classmethod
+    async def __check_undecided_items(
+        cls,
+        items: list[str],
+        is_kept: list[bool | None],
+        should_compare_to: Callable[[bool | None], bool],
+        use_internet_search: bool,
+        threshold_for_initial_semantic_check: float,
+    ) -> dict[int, bool]:
+        """
+        Checks (concurrently) whether each undecided item is a duplicate of the
+        earlier items whose kept status passes should_compare_to
+        """
+        undecided_indexes = [
+            index for index, kept in enumerate(is_kept) if kept is None
+        ]
+        duplicate_checks = [
+            cls.determine_if_item_is_duplicate(
+                items[index],
+                [
+                    items[earlier_index]
+                    for earlier_index in range(index)
+                    if should_compare_to(is_kept[earlier_index])
+                ],
+                use_internet_search,
+                threshold_for_initial_semantic_check,
+            )
+            for index in undecided_indexes
+        ]
+        duplicate_results = await asyncio.gather(*duplicate_checks)
+        return dict(zip(undecided_indexes, duplicate_results))
+
     @classmethod
     async def determine_if_item_is_duplicate(
         cls,
@@ -147,7 +390,7 @@ class Deduplicator:
             return True
 
         is_semantically_duplicate = (
-            cls.__determine_if_text_is_duplicate_semantically(
+            await cls.__determine_if_text_is_duplicate_semantically(
                 item, list_to_check, threshold_for_initial_semantic_check
             )
         )
@@ -184,24 +427,85 @@ class Deduplicator:
         return is_duplicate
 
     @classmethod
-    async def __deduplicate_list_using_semantic_similarity(
-        cls, items: list[str], threshold: float
-    ) -> list[str]:
-        deduplicated_items: list[str] = []
-        for item in items:
-            is_duplicate = cls.__determine_if_text_is_duplicate_semantically(
-                item, deduplicated_items, threshold
+    def __find_similar_pairs(
+        cls, embeddings: np.ndarray, min_similarity: float
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns (first_indexes, second_indexes, similarities) of all pairs with
+        first < second and a cosine similarity above min_similarity.
+        Small lists compare every pair. Larger lists only compare the candidate
+        pairs of an LSH index, which can rarely miss a similar pair.
+        """
+        if len(embeddings) <= cls.EXACT_SIMILARITY_SEARCH_LIMIT:
+            first_indexes, second_indexes = np.triu_indices(
+                len(embeddings), k=1
             )
-            if not is_duplicate:
-                deduplicated_items.append(item)
-
-        logger.info(
-            f"Deduplicated {len(items)} items to {len(deduplicated_items)} items using semantic similarity"
+        else:
+            first_indexes, second_indexes = (
+                RandomProjectionLsh().find_candidate_pairs(embeddings)
+            )
+        similarities = np.einsum(
+            "ij,ij->i", embeddings[first_indexes], embeddings[second_indexes]
         )
-        return deduplicated_items
+        is_similar = similarities > min_similarity
+        return (
+            first_indexes[is_similar],
+            second_indexes[is_similar],
+            similarities[is_similar],
+        )
+
+    @classmethod
+    def __keep_items_not_similar_to_earlier_items(
+        cls,
+        number_of_items: int,
+        first_indexes: np.ndarray,
+        second_indexes: np.ndarray,
+    ) -> list[int]:
+        earlier_similar_items: dict[int, list[int]] = {}
+        for first, second in zip(first_indexes, second_indexes):
+            earlier_similar_items.setdefault(int(second), []).append(
+                int(first)
+            )
+
+        kept_indexes: list[int] = []
+        is_kept = [False] * number_of_items
+        for index in range(number_of_items):
+            if any(
+                is_kept[earlier_index]
+                for earlier_index in earlier_similar_items.get(index, [])
+            ):
+                continue
+            is_kept[index] = True
+            kept_indexes.append(index)
+        return kept_indexes
+
+    @classmethod
+    def __cluster_items(
+        cls, indexes: list[int], similar_pairs: list[tuple[int, int]]
+    ) -> list[list[int]]:
+        """
+        Groups the indexes into connected components of the similar pairs
+        (pairs that include an index not in indexes are ignored)
+        """
+        parent_of = {index: index for index in indexes}
+
+        def find_root(index: int) -> int:
+            while parent_of[index] != index:
+                parent_of[index] = parent_of[parent_of[index]]
+                index = parent_of[index]
+            return index
+
+        for first, second in similar_pairs:
+            if first in parent_of and second in parent_of:
+                parent_of[find_root(int(second))] = find_root(int(first))
+
+        clusters: dict[int, list[int]] = {}
+        for index in indexes:
+            clusters.setdefault(find_root(index), []).append(index)
+        return list(clusters.values())
 
     @classmethod
-    def __determine_if_text_is_duplicate_semantically(
+    async def __determine_if_text_is_duplicate_semantically(
         cls,
         text: str,
         list_to_compare_to: list[str],
@@ -211,67 +515,21 @@ class Deduplicator:
         0.85 is good for an item like "1999 Moldovan referendum: description..."
         0.938 is good for a short item like "1999 Moldovan referendum"
         """
-        texts_to_get_embeddings_for = [text] + list_to_compare_to
-        try:
-            embeddings = cls.__get_embeddings_using_huggingface(
-                texts_to_get_embeddings_for
-            )
-        except Exception as e:
-            logger.warning(
-                f"Could not get embeddings using huggingface. Instead now getting embeddings with OpenAI. Error: {e}"
-            )
-            embeddings = cls.__get_embeddings_using_openai(
-                texts_to_get_embeddings_for
-            )
-
-        text_embedding = embeddings[0]
-        list_embeddings = embeddings[1:]
-
-        for list_embedding in list_embeddings:
-            similarity = cosine_similarity(
-                np.array([text_embedding]), np.array([list_embedding])
-            )[0][0]
-            if similarity > semantic_similarity_threshold:
-                return True
-        return False
-
-    @classmethod
-    def __get_embeddings_using_openai(
-        cls, texts: list[str]
-    ) -> list[list[float]]:
-        # TODO: Track costs from this in llm cost tracker
-        api_key = os.getenv("OPENAI_API_KEY")
-        assert api_key is not None, "OPENAI_API_KEY is not set"
-        client = OpenAI(api_key=api_key)
-
-        def query(texts: list[str]) -> list[list[float]]:
-            response = client.embeddings.create(
-                model="text-embedding-3-small", input=texts
-            )
-            return [embedding.embedding for embedding in response.data]
-
-        return query(texts)
+        embeddings = await cls.__get_normalized_embeddings(
+            [text] + list_to_compare_to
+        )
+        similarities = embeddings[1:] @ embeddings[0]
+        return bool(similarities.max() > semantic_similarity_threshold)
 
     @classmethod
-    def __get_embeddings_using_huggingface(
-        cls, texts: list[str]
-    ) -> list[list[float]]:
-        model_id = "sentence-transformers/all-MiniLM-L6-v2"
-        api_url = f"https://api-inference.huggingface.co/pipeline/feature-extraction/{model_id}"
-        api_key = os.getenv("HUGGINGFACE_API_KEY")
-        assert api_key is not None, "HUGGINGFACE_API_KEY is not set"
-        headers = {"Authorization": f"Bearer {api_key}"}
-
-        def query(texts: list[str]) -> list[list[float]]:
-            response = requests.post(
-                api_url,
-                headers=headers,
-                json={"inputs": texts, "options": {"wait_for_model": True}},
-            )
-            raise_for_status_with_additional_info(response)
-            return response.json()
-
-        return query(texts)
+    async def __get_normalized_embeddings(cls, texts: list[str]) -> np.ndarray:
+        """
+        Returns a (len(texts), embedding_size) matrix of unit length rows
+        (so dot products are cosine similarities)
+        """
+        matrix = await cls.EMBEDDING_PROVIDER.embed(texts)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, np.finfo(np.float32).tiny)
 
     @classmethod
     def __log_deduplication_results(
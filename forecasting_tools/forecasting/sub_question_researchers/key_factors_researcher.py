@@ -111,7 +111,7 @@ class KeyFactorsResearcher:
             for question in questions
         ]
         key_factors, _ = (
-            async_batching.run_coroutines_while_removing_and_logging_exceptions(
+            await async_batching.await_coroutines_while_removing_and_logging_exceptions(
                 key_factor_tasks
             )
         )
@@ -206,7 +206,7 @@ class KeyFactorsResearcher:
             for factor in key_factors
         ]
         scored_factors, _ = (
-            async_batching.run_coroutines_while_removing_and_logging_exceptions(
+            await async_batching.await_coroutines_while_removing_and_logging_exceptions(
                 scoring_coroutines
             )
         )
@@ -255,7 +255,7 @@ class NicheListResearcher:
         ]
         ask_ai_coroutines = regular_calls + internet_calls
         non_errored_responses, _ = (
-            async_batching.run_coroutines_while_removing_and_logging_exceptions(
+            await async_batching.await_coroutines_while_removing_and_logging_exceptions(
                 ask_ai_coroutines
             )
         )
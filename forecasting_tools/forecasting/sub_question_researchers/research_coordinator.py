@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import logging
+from typing import Any, Coroutine
 
 from forecasting_tools.ai_models.ai_utils.ai_misc import (
     clean_indents,
@@ -23,6 +24,9 @@ from forecasting_tools.forecasting.sub_question_researchers.question_responder i
 from forecasting_tools.forecasting.sub_question_researchers.question_router import (
     QuestionRouter,
 )
+from forecasting_tools.forecasting.sub_question_researchers.shared_sub_question_answers import (
+    SharedSubQuestionAnswers,
+)
 from forecasting_tools.util import async_batching
 
 logger = logging.getLogger(__name__)
@@ -73,7 +77,7 @@ class ResearchCoordinator:
             for question in base_rate_questions
         ]
         base_rate_reports, _ = (
-            async_batching.run_coroutines_while_removing_and_logging_exceptions(
+            await async_batching.await_coroutines_while_removing_and_logging_exceptions(
                 base_rate_tasks
             )
         )
@@ -311,26 +315,17 @@ class ResearchCoordinator:
         responder_type: type[QuestionResponder] | None = None,
     ) -> list[str]:
         question_router = QuestionRouter()
-        if responder_type is None:
-            answering_question_coroutines = [
-                question_router.answer_question_with_markdown_using_routing(
-                    question,
-                    end_published_date=self.question.open_time
-                )
-                for question in questions
-            ]
-        else:
-            answering_question_coroutines = [
-                responder_type(question).respond_with_markdown(end_published_date=self.question.open_time)
-                for question in questions
-            ]
-        exception_handled_coroutines = (
-            async_batching.wrap_coroutines_to_return_not_raise_exceptions(
-                answering_question_coroutines
+        shared_answers = SharedSubQuestionAnswers.get_active()
+        answering_question_coroutines = [
+            self.__answer_question(
+                question, responder_type, question_router, shared_answers
             )
-        )
+            for question in questions
+        ]
         unverified_answers: list[str | Exception] = (
-            async_batching.run_coroutines(exception_handled_coroutines)
+            await async_batching.await_coroutines_and_return_exceptions(
+                answering_question_coroutines
+            )
         )
         verified_answers = []
         for question, answer in zip(questions, unverified_answers):
@@ -352,6 +347,31 @@ class ResearchCoordinator:
         )
         return verified_answers
 
+    async def __answer_question(
+        self,
+        question: str,
+        responder_type: type[QuestionResponder] | None,
+        question_router: QuestionRouter,
+        shared_answers: SharedSubQuestionAnswers | None,
+    ) -> str:
+        def answer_question() -> Coroutine[Any, Any, str]:
+            if responder_type is None:
+                return question_router.answer_question_with_markdown_using_routing(
+                    question, end_published_date=self.question.open_time
+                )
+            return responder_type(question).respond_with_markdown(
+                end_published_date=self.question.open_time
+            )
+
+        if shared_answers is None:
+            return await answer_question()
+        return await shared_answers.get_or_create_answer(
+            answer_question,
+            question,
+            responder_type.__name__ if responder_type else "QuestionRouter",
+            str(self.question.open_time),
+        )
+
     async def summarize_full_research_report(
         self, research_as_markdown: str
     ) -> str:
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+from contextvars import ContextVar, Token
+from typing import Any, Callable, Coroutine
+
+logger = logging.getLogger(__name__)
+
+
+class SharedSubQuestionAnswers:
+    """
+    Lets research runs for the same question answer each sub-question once.
+    Use it as a context manager around the research runs:
+
+    with SharedSubQuestionAnswers():
+        await asyncio.gather(*[coordinator.generate_background_markdown(5) for coordinator in coordinators])
+
+    The first run to ask a sub-question starts answering it, and later runs
+    asking the same sub-question (ignoring case and whitespace) wait on that
+    same answer instead of searching again.
+    """
+
+    _active_shared_answers: ContextVar[SharedSubQuestionAnswers | None] = (
+        ContextVar("_active_shared_answers", default=None)
+    )
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.__answer_tasks: dict[tuple[str, ...], asyncio.Future[str]] = {}
+        self.__context_token: Token | None = None
+
+    def __enter__(self) -> SharedSubQuestionAnswers:
+        self.__context_token = self._active_shared_answers.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:  # NOSONAR
+        assert self.__context_token is not None
+        self._active_shared_answers.reset(self.__context_token)
+        self.__context_token = None
+        if self.hits > 0:
+            logger.info(
+                f"Reused {self.hits} sub-question answers ({self.misses} were answered)"
+            )
+
+    @classmethod
+    def get_active(cls) -> SharedSubQuestionAnswers | None:
+        return cls._active_shared_answers.get()
+
+    async def get_or_create_answer(
+        self,
+        answer_question: Callable[[], Coroutine[Any, Any, str]],
+        question: str,
+        *other_key_parts: str,
+    ) -> str:
+        """
+        answer_question is only called if no answer to the question was
+        started yet. The other key parts (e.g. the responder used) must also
+        match for an answer to be shared.
+        """
+        key = (self.__normalize(question), *other_key_parts)
+        answer_task = self.__answer_tasks.get(key)
+        if answer_task is None:
+            answer_task = asyncio.ensure_future(answer_question())
+            self.__answer_tasks[key] = answer_task
+            self.misses += 1
+        else:
+            self.hits += 1
+        return await asyncio.shield(answer_task)
+
+    @staticmethod
+    def __normalize(question: str) -> str:
+        return re.sub(r"\s+", " ", question).strip().casefold()
@@ -1,6 +1,6 @@
 import asyncio
 import logging
-from typing import Any, Callable, Coroutine, TypeVar
+from typing import Any, AsyncGenerator, Callable, Coroutine, TypeVar
 
 import nest_asyncio
 from aiolimiter import AsyncLimiter
@@ -99,17 +99,92 @@ def wrap_coroutines_with_limit_timeout_and_returning_exceptions(
 
 
 def run_coroutines(coroutines: list[Coroutine[Any, Any, T]]) -> list[T]:
-    async def run_coroutines(
-        coroutines: list[Coroutine[Any, Any, T]]
-    ) -> list[T]:
-        tasks = []
-        for coroutine in coroutines:
-            tasks.append(loop.create_task(coroutine))
-        results = await asyncio.gather(*tasks)
-        return results
-
+    """
+    Synchronous entry point for running a batch of coroutines.
+    From inside an already running event loop use `await_coroutines` instead,
+    since this re-enters the loop and blocks every other task until the batch finishes.
+    """
     loop = asyncio.get_event_loop()
-    return loop.run_until_complete(run_coroutines(coroutines))
+    return loop.run_until_complete(await_coroutines(coroutines))
+
+
+async def await_coroutines(
+    coroutines: list[Coroutine[Any, Any, T]],
+) -> list[T]:
+    """
+    Runs the coroutines concurrently on the current event loop and returns their results in order.
+    Like a TaskGroup, the first exception cancels the remaining tasks and is then raised.
+    """
+    tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+async def await_coroutines_and_return_exceptions(
+    coroutines: list[Coroutine[Any, Any, T]],
+) -> list[T | Exception]:
+    """
+    Runs the coroutines concurrently and returns exceptions in place of results rather than raising them.
+    """
+    return await await_coroutines(
+        wrap_coroutines_to_return_not_raise_exceptions(coroutines)
+    )
+
+
+async def run_function_with_worker_pool_as_completed(
+    async_function: Callable[[T2], Coroutine[Any, Any, T]],
+    inputs: list[T2],
+    max_concurrent: int | None = None,
+) -> AsyncGenerator[tuple[int, T | Exception], None]:
+    """
+    Runs `async_function` on each input using at most `max_concurrent` workers (no limit if None).
+    Yields (index of input, result) pairs as soon as each one finishes. Exceptions are yielded rather than raised.
+    Anything that stops a worker outright (e.g. a CancelledError from inside `async_function`) is raised by the generator instead of leaving it waiting.
+    Closing the generator early cancels any work still in flight, so use `contextlib.aclosing` if you might break out.
+    """
+    if max_concurrent is not None:
+        assert max_concurrent > 0, "max_concurrent must be positive"
+    number_of_workers = (
+        len(inputs)
+        if max_concurrent is None
+        else min(max_concurrent, len(inputs))
+    )
+    remaining_inputs = iter(enumerate(inputs))
+    completed: asyncio.Queue[tuple[int, T | Exception] | BaseException] = (
+        asyncio.Queue()
+    )
+
+    async def worker() -> None:
+        try:
+            for index, input in remaining_inputs:
+                try:
+                    result = await async_function(input)
+                except Exception as e:
+                    result = e
+                completed.put_nowait((index, result))
+        except BaseException as e:
+            completed.put_nowait(e)
+            raise
+
+    workers = [
+        asyncio.ensure_future(worker()) for _ in range(number_of_workers)
+    ]
+    try:
+        for _ in range(len(inputs)):
+            completed_item = await completed.get()
+            if isinstance(completed_item, BaseException):
+                raise completed_item
+            yield completed_item
+    finally:
+        for worker_task in workers:
+            worker_task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
 
 
 def run_coroutines_while_removing_and_logging_exceptions(
@@ -121,35 +196,61 @@ def run_coroutines_while_removing_and_logging_exceptions(
     Runs a list of coroutines and returns only the results (and their corresponding inputs) that did not raise an exception.
     A list of "None" is returned as the corresponding input if no matching_inputs are provided.
     A default log message is given on the case of an exception. You can switch out this with a custom function if desired.
+    From inside an already running event loop use `await_coroutines_while_removing_and_logging_exceptions` instead.
     """
-    if matching_inputs is None:
-        modified_inputs = [None] * len(coroutines)
-    elif not isinstance(matching_inputs, list):
-        modified_inputs = [matching_inputs] * len(coroutines)
-    else:
-        modified_inputs = matching_inputs
+    loop = asyncio.get_event_loop()
+    return loop.run_until_complete(
+        await_coroutines_while_removing_and_logging_exceptions(
+            coroutines, matching_inputs, action_on_exception
+        )
+    )
 
-    assert len(modified_inputs) == len(
-        coroutines
-    ), "The number of inputs must match the number of coroutines"
 
-    exception_wrapped_coroutines = (
-        wrap_coroutines_to_return_not_raise_exceptions(coroutines)
-    )
-    results = run_coroutines(exception_wrapped_coroutines)
+async def await_coroutines_while_removing_and_logging_exceptions(
+    coroutines: list[Coroutine[Any, Any, T]],
+    matching_inputs: list[T2] | T2 = None,
+    action_on_exception: Callable[[Exception, T2], None] | None = None,
+) -> tuple[list[T], list[T2]]:
+    """
+    Awaitable version of `run_coroutines_while_removing_and_logging_exceptions`.
+    Returns only the results (and their corresponding inputs) that did not raise an exception.
+    """
+    modified_inputs = _pair_inputs_with_coroutines(coroutines, matching_inputs)
+    coroutine_names = [coroutine.cr_code.co_name for coroutine in coroutines]
+    results = await await_coroutines_and_return_exceptions(coroutines)
 
     results_that_did_not_error: list[T] = []
     inputs_that_did_not_error: list[T2] = []
-    for input, result, coroutine in zip(modified_inputs, results, coroutines):
+    for input, result, coroutine_name in zip(
+        modified_inputs, results, coroutine_names
+    ):
         if isinstance(result, Exception):
             error = result
             if action_on_exception is None:
-                action_on_exception = lambda error, _, coroutine=coroutine: logger.error(
-                    f"Error while running coroutine '{coroutine.cr_code.co_name}': {error.__class__.__name__} Exception - {error}"
+                logger.error(
+                    f"Error while running coroutine '{coroutine_name}': {error.__class__.__name__} Exception - {error}"
                 )
-            action_on_exception(error, input)  # type: ignore - Linter improperly thinks that input can't be of type 'None' even if None is assigned to Generic type. It works if the default value for inputs is set to an int
+            else:
+                action_on_exception(error, input)  # type: ignore - Linter improperly thinks that input can't be of type 'None' even if None is assigned to Generic type. It works if the default value for inputs is set to an int
         else:
             results_that_did_not_error.append(result)
             inputs_that_did_not_error.append(input)  # type: ignore - Linter improperly thinks that input can't be of type 'None' even if None is assigned to Generic type. It works if the default value for inputs is set to an int
 
     return results_that_did_not_error, inputs_that_did_not_error
+
+
+def _pair_inputs_with_coroutines(
+    coroutines: list[Coroutine[Any, Any, T]],
+    matching_inputs: list[T2] | T2 = None,
+) -> list[T2 | None]:
+    if matching_inputs is None:
+        modified_inputs = [None] * len(coroutines)
+    elif not isinstance(matching_inputs, list):
+        modified_inputs = [matching_inputs] * len(coroutines)
+    else:
+        modified_inputs = matching_inputs
+
+    assert len(modified_inputs) == len(
+        coroutines
+    ), "The number of inputs must match the number of coroutines"
+    return modified_inputs
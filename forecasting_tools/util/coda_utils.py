@@ -4,8 +4,7 @@ logger = logging.getLogger(__name__)
 import os
 from typing import Any
 
-import requests
-
+from forecasting_tools.util.http_session_pool import HttpSessionPool
 from forecasting_tools.util.misc import raise_for_status_with_additional_info
 
 
@@ -69,7 +68,9 @@ class CodaTable:
         uri = f"https://coda.io/apis/v1/docs/{self.doc_id}/tables/{self.table_id}/rows"
         logger.info(f"Attempting to insert {len(json_payload)} rows into")
         full_payload = {"rows": json_payload, "keyColumns": key_columns}
-        response = requests.post(uri, headers=headers, json=full_payload)
+        response = HttpSessionPool.get_sync_session().post(
+            uri, headers=headers, json=full_payload
+        )
         logger.info(f"Got response back - {response}")
         raise_for_status_with_additional_info(response)
         return response
@@ -118,8 +118,8 @@ def write_json_file(file_path_in_package: str, input: list[dict]) -> None:
 
 
 def add_to_jsonl_file(file_path_in_package: str, input: list[dict]) -> None:
-    json_strings = [json.dumps(item) for item in input]
-    jsonl_string = "\n".join(json_strings)
+    json_strings = [json.dumps(item) + "\n" for item in input]
+    jsonl_string = "".join(json_strings)
     create_or_append_to_file(file_path_in_package, jsonl_string)
 
 
@@ -145,6 +145,24 @@ def create_or_append_to_file(file_path_in_package: str, text: str) -> None:
         file.write(text)
 
 
+@skip_if_file_writing_not_allowed
+def create_or_append_to_binary_file(
+    file_path_in_package: str,
+    data: bytes,
+    truncate_to_size: int | None = None,
+) -> None:
+    """
+    This function appends bytes to a file, and creates the file if it does not exist
+    If truncate_to_size is given, anything past that size is cut off before appending
+    """
+    full_file_path = get_absolute_path(file_path_in_package)
+    os.makedirs(os.path.dirname(full_file_path), exist_ok=True)
+    with open(full_file_path, "ab") as file:
+        if truncate_to_size is not None:
+            file.truncate(truncate_to_size)
+        file.write(data)
+
+
 @skip_if_file_writing_not_allowed
 def log_to_file(
     file_path_in_package: str, text: str, type: str = "DEBUG"
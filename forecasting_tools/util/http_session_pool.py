@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import asyncio
+import atexit
+import logging
+import threading
+import weakref
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+
+class HttpSessionPool:
+    """
+    Shared HTTP sessions so repeated calls to the same hosts reuse open
+    connections (no new DNS lookup or TLS handshake per call).
+
+    aiohttp sessions can only be used on the event loop they were made on,
+    so there is one per loop. Since nest_asyncio makes asyncio.run reuse the
+    thread's loop, a session usually lives for the whole process and is closed
+    at exit (or explicitly with close_async_session).
+    The requests session (for synchronous clients) is shared by all threads.
+    """
+
+    MAX_CONNECTIONS_PER_HOST = 20
+    MAX_CONNECTIONS = 100
+    KEEP_ALIVE_TIMEOUT_IN_SECONDS = 30
+
+    _async_sessions: weakref.WeakKeyDictionary[
+        asyncio.AbstractEventLoop, aiohttp.ClientSession
+    ] = weakref.WeakKeyDictionary()
+    _sync_session: requests.Session | None = None
+    _sync_session_lock = threading.Lock()
+
+    @classmethod
+    async def get_async_session(cls) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        existing_session = cls._async_sessions.get(loop)
+        if existing_session is not None and not existing_session.closed:
+            return existing_session
+
+        connector = aiohttp.TCPConnector(
+            limit=cls.MAX_CONNECTIONS,
+            limit_per_host=cls.MAX_CONNECTIONS_PER_HOST,
+            keepalive_timeout=cls.KEEP_ALIVE_TIMEOUT_IN_SECONDS,
+        )
+        session = aiohttp.ClientSession(connector=connector)
+        cls._async_sessions[loop] = session
+        return session
+
+    @classmethod
+    async def close_async_session(cls) -> None:
+        loop = asyncio.get_running_loop()
+        session = cls._async_sessions.pop(loop, None)
+        if session is not None:
+            await session.close()
+
+    @classmethod
+    def get_sync_session(cls) -> requests.Session:
+        with cls._sync_session_lock:
+            if cls._sync_session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=cls.MAX_CONNECTIONS_PER_HOST,
+                    pool_maxsize=cls.MAX_CONNECTIONS_PER_HOST,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                cls._sync_session = session
+            return cls._sync_session
+
+    @classmethod
+    def _close_async_sessions_of_idle_loops(cls) -> None:
+        for loop, session in list(cls._async_sessions.items()):
+            if session.closed or loop.is_closed() or loop.is_running():
+                continue
+            loop.run_until_complete(session.close())
+        cls._async_sessions.clear()
+
+
+atexit.register(HttpSessionPool._close_async_sessions_of_idle_loops)
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LruCacheWithTtl(Generic[K, V]):
+    """
+    An in memory cache that drops entries once they are older than their ttl
+    and evicts the least recently used entry once it holds max_entries.
+    """
+
+    def __init__(
+        self, max_entries: int = 1000, ttl_seconds: float | None = 3600
+    ) -> None:
+        assert max_entries > 0
+        assert ttl_seconds is None or ttl_seconds > 0
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.__entries: OrderedDict[K, tuple[V, float | None]] = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, key: K) -> V | None:
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                return None
+            value, expiry_time = entry
+            if expiry_time is not None and time.monotonic() > expiry_time:
+                del self.__entries[key]
+                return None
+            self.__entries.move_to_end(key)
+            return value
+
+    def set(self, key: K, value: V, ttl_seconds: float | None = None) -> None:
+        """
+        ttl_seconds overrides the cache's default ttl for this entry
+        """
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        expiry_time = time.monotonic() + ttl if ttl is not None else None
+        with self.__lock:
+            self.__entries[key] = (value, expiry_time)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.max_entries:
+                self.__entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries.clear()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
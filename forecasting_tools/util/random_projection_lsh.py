@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import itertools
+from collections import defaultdict
+
+import numpy as np
+
+
+class RandomProjectionLsh:
+    """
+    Locality sensitive hashing for cosine similarity. Each table hashes a
+    vector to the signs of its projections onto a few random hyperplanes, so
+    similar vectors tend to land in the same bucket of at least one table.
+    Only pairs that share a bucket need to be compared, instead of all pairs.
+    """
+
+    def __init__(
+        self, num_tables: int = 16, bits_per_table: int = 6, seed: int = 0
+    ) -> None:
+        assert num_tables > 0
+        assert 0 < bits_per_table < 63
+        self.num_tables = num_tables
+        self.bits_per_table = bits_per_table
+        self.seed = seed
+
+    def find_candidate_pairs(
+        self, vectors: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the indexes (first, second) of every pair of rows that share a
+        bucket in any table, with first < second
+        """
+        number_of_vectors, embedding_size = vectors.shape
+        hyperplanes = np.random.default_rng(self.seed).standard_normal(
+            (embedding_size, self.num_tables * self.bits_per_table)
+        )
+        signs = (vectors @ hyperplanes > 0).reshape(
+            number_of_vectors, self.num_tables, self.bits_per_table
+        )
+        bucket_codes = signs @ (1 << np.arange(self.bits_per_table))
+
+        candidate_pairs: set[tuple[int, int]] = set()
+        for table in range(self.num_tables):
+            buckets: dict[int, list[int]] = defaultdict(list)
+            for index, code in enumerate(bucket_codes[:, table]):
+                buckets[int(code)].append(index)
+            for members in buckets.values():
+                candidate_pairs.update(itertools.combinations(members, 2))
+
+        if len(candidate_pairs) == 0:
+            empty = np.zeros(0, dtype=int)
+            return empty, empty
+        pairs = np.array(sorted(candidate_pairs), dtype=int)
+        return pairs[:, 0], pairs[:, 1]
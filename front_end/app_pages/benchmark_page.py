@@ -1,11 +1,18 @@
 import textwrap
 
 import dotenv
+import numpy as np
 import streamlit as st
 
 from forecasting_tools.forecasting.questions_and_reports.binary_report import (
     BinaryReport,
 )
+from forecasting_tools.forecasting.questions_and_reports.forecast_report import (
+    ScoreType,
+)
+from forecasting_tools.forecasting.questions_and_reports.report_scorer import (
+    ReportScorer,
+)
 from front_end.helpers.app_page import AppPage
 from front_end.helpers.report_displayer import ReportDisplayer
 
@@ -83,18 +90,19 @@ class BenchmarkPage(AppPage):
     def __display_stats_for_report_type(
         cls, reports: list[BinaryReport], title: str
     ) -> None:
-        average_expected_log_score = (
-            BinaryReport.calculate_average_inverse_expected_log_score(reports)
-        )
-        average_deviation = BinaryReport.calculate_average_deviation_points(
-            reports
-        )
+        summaries = ReportScorer.summarize_scores(reports)
+        log_score = summaries[ScoreType.INVERSED_EXPECTED_LOG_SCORE]
+        brier_score = summaries[ScoreType.EXPECTED_BRIER_SCORE]
+        baseline_score = summaries[ScoreType.EXPECTED_BASELINE_SCORE]
+        deviation = summaries[ScoreType.DEVIATION_POINTS]
         st.markdown(
             f"""
             #### {title}
             - Number of Questions: {len(reports)}
-            - Expected Log Score (lower is better): {average_expected_log_score:.4f}
-            - Average Deviation: On average, there is a {average_deviation:.2%} percentage point difference between community and bot
+            - Expected Log Score (lower is better): {log_score.average:.4f} (95% CI: {log_score.lower_bound:.4f} to {log_score.upper_bound:.4f})
+            - Expected Brier Score (lower is better): {brier_score.average:.4f} (95% CI: {brier_score.lower_bound:.4f} to {brier_score.upper_bound:.4f})
+            - Expected Baseline Score (higher is better): {baseline_score.average:.2f} (95% CI: {baseline_score.lower_bound:.2f} to {baseline_score.upper_bound:.2f})
+            - Average Deviation: On average, there is a {deviation.average:.2%} percentage point difference between community and bot
             """
         )
 
@@ -134,21 +142,13 @@ class BenchmarkPage(AppPage):
         cls, report_list: list[BinaryReport], title: str
     ) -> None:
         st.subheader(title)
-        sorted_reports = sorted(
-            report_list,
-            key=lambda r: (
-                r.inversed_expected_log_score
-                if r.inversed_expected_log_score is not None
-                else -1
-            ),
-            reverse=True,
-        )
-        for report in sorted_reports:
-            deviation = (
-                report.inversed_expected_log_score
-                if report.inversed_expected_log_score is not None
-                else -1
-            )
+        log_scores = ReportScorer.calculate_scores(report_list)[
+            ScoreType.INVERSED_EXPECTED_LOG_SCORE
+        ]
+        log_scores = np.nan_to_num(log_scores, nan=-1)
+        for index in np.argsort(-log_scores, kind="stable"):
+            report = report_list[index]
+            deviation = log_scores[index]
             st.write(
                 ReportDisplayer.clean_markdown(
                     f"- **Δ:** {deviation:.4f} | **🤖:** {report.prediction:.2%} | **👥:** {report.community_prediction:.2%} | **Question:** {report.question.question_text}"